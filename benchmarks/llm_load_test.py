@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+LLM load test against the offline mock DeepSeek server
+Drives LLMQueryTool, CachedLLMClient, SubAgentSystem and RAGPipelineTool at a
+fixed concurrency and reports throughput, latency percentiles, failures and
+cache hit rates (client-side caches and DeepSeek's prompt prefix cache)
+
+Usage: python benchmarks/llm_load_test.py --requests 200 --concurrency 16 --stream
+       python benchmarks/llm_load_test.py --targets llm cached --rate-limit-rate 0.05
+       python benchmarks/llm_load_test.py --base-url http://127.0.0.1:8900/v1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(REPO_ROOT))
+
+import config.api_keys as api_keys
+from benchmarks.mock_deepseek_server import MockDeepSeekServer, add_server_arguments, build_config
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.latency_stats import LatencyTracker
+from tools.llm_query_tool import LLMQueryTool
+from tools.prompt_layout import PrefixCacheStats
+from tools.request_scheduler import RequestScheduler
+from tools.retry_policy import RetryPolicy
+
+TARGETS = ("llm", "cached", "subagent", "rag")
+
+MOCK_API_KEY = "sk-mock-load-test-000000000000"
+
+# Long enough to span several 64-token cache units, so repeated calls share a cached prefix
+SYSTEM_PROMPT = ("You are Deanna, a concise assistant for a developer CLI. "
+                 "Answer in plain text, keep code blocks minimal, and say when you are unsure. ") * 6
+
+TOPICS = ("sqlite indexes", "async retries", "prompt caching", "vector search", "rate limiting",
+          "http keep-alive", "token budgets", "circuit breakers", "json schemas", "fim completion")
+
+
+def _prompt(index: int, unique: int) -> str:
+    return f"Explain {TOPICS[index % unique % len(TOPICS)]} (variant {index % unique})."
+
+
+async def run_load(label: str, call: Callable[[int], Awaitable[bool]], requests: int,
+                   concurrency: int) -> Dict[str, Any]:
+    """Run call(0..requests-1) with at most concurrency in flight"""
+    tracker = LatencyTracker(max_samples=requests)
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one(index: int):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                ok = await call(index)
+            except Exception:
+                ok = False
+            tracker.record((time.perf_counter() - started) * 1000)
+            failures += 0 if ok else 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+    return {
+        "target": label,
+        "requests": requests,
+        "failures": failures,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / max(elapsed, 1e-9),
+        **tracker.summary()
+    }
+
+
+class LoadTestHarness:
+    """Builds the real tools against one mock-backed client registry"""
+
+    def __init__(self, registry: DeepSeekClientRegistry, base_url: str, work_dir: str,
+                 stream: bool = False, unique_prompts: int = 10):
+        self.registry = registry
+        self.base_url = base_url
+        self.work_dir = work_dir
+        self.stream = stream
+        self.unique_prompts = unique_prompts
+        # Short backoff so injected 429/5xx cost milliseconds rather than seconds
+        self.retry_policy = RetryPolicy(max_retries=3, base_delay=0.05, max_delay=1.0)
+
+    def make_llm_tool(self) -> LLMQueryTool:
+        tool = LLMQueryTool(api_key=MOCK_API_KEY, base_url=self.base_url, retry_policy=self.retry_policy)
+        tool.cache_stats = PrefixCacheStats()
+        tool.client_registry = self.registry
+        tool.openai_client = self.registry.get_client(MOCK_API_KEY, self.base_url).with_options(max_retries=0)
+        tool._initialize_providers()
+        return tool
+
+    async def bench_llm(self, requests: int, concurrency: int) -> Dict[str, Any]:
+        tool = self.make_llm_tool()
+
+        async def call(index: int) -> bool:
+            response = await tool.execute(mode="stream" if self.stream else "chat",
+                                          prompt=_prompt(index, self.unique_prompts),
+                                          system_message=SYSTEM_PROMPT, use_history=False,
+                                          call_site="load_test")
+            return response.success
+
+        result = await run_load("llm", call, requests, concurrency)
+        result["prefix_cache_hit_rate"] = tool.get_cache_statistics()["hit_rate"]
+        return result
+
+    async def bench_cached(self, requests: int, concurrency: int) -> Dict[str, Any]:
+        from tools.prompt_caching_system import CachedLLMClient
+
+        tool = self.make_llm_tool()
+        client = CachedLLMClient(tool, {"db_path": os.path.join(self.work_dir, "prompt_cache.db")})
+
+        async def call(index: int) -> bool:
+            response = await client.generate_response(_prompt(index, self.unique_prompts),
+                                                      parameters={"system_message": SYSTEM_PROMPT})
+            return isinstance(response, str) and bool(response)
+
+        result = await run_load("cached", call, requests, concurrency)
+        result["response_cache_hit_rate"] = client.get_cache_stats()["memory_cache"]["hit_rate"]
+        result["prefix_cache_hit_rate"] = tool.get_cache_statistics()["hit_rate"]
+        return result
+
+    async def bench_subagent(self, requests: int, concurrency: int) -> Dict[str, Any]:
+        from tools.sub_agent_architecture import SubAgentSystem
+
+        tool = self.make_llm_tool()
+        system = SubAgentSystem(tool)
+
+        async def call(index: int) -> bool:
+            result = await system.generate_code_with_analysis(_prompt(index, self.unique_prompts))
+            return result["overall_success"]
+
+        result = await run_load("subagent", call, requests, concurrency)
+        result["prefix_cache_hit_rate"] = tool.get_cache_statistics()["hit_rate"]
+        return result
+
+    async def bench_rag(self, requests: int, concurrency: int) -> Dict[str, Any]:
+        from tools.rag_pipeline_tool import RAGPipelineTool
+
+        # Its own LLMQueryTool reads the configured key; it is swapped out before any call
+        configured_key, api_keys.DEEPSEEK_API_KEY = api_keys.DEEPSEEK_API_KEY, MOCK_API_KEY
+        try:
+            rag = RAGPipelineTool(sql_db_path=os.path.join(self.work_dir, "rag.db"))
+        finally:
+            api_keys.DEEPSEEK_API_KEY = configured_key
+        await rag.sql_tool._initialize_database()
+        rag.llm_tool = self.make_llm_tool()
+
+        async def call(index: int) -> bool:
+            response = await rag.execute(operation="rag_query", query=_prompt(index, self.unique_prompts),
+                                         session_id=f"load-{index % concurrency}")
+            return response.success
+
+        try:
+            result = await run_load("rag", call, requests, concurrency)
+        finally:
+            await rag.sql_tool.pool.close()
+        result["prefix_cache_hit_rate"] = rag.llm_tool.get_cache_statistics()["hit_rate"]
+        return result
+
+    async def run(self, targets: List[str], requests: int, concurrency: int) -> List[Dict[str, Any]]:
+        results = []
+        for target in targets:
+            results.append(await getattr(self, f"bench_{target}")(requests, concurrency))
+        return results
+
+
+def _report(results: List[Dict[str, Any]]):
+    print(f"{'target':<10} {'reqs':>6} {'fail':>5} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'p99 ms':>9} {'prefix hit':>11} {'resp hit':>9}")
+    for r in results:
+        response_hit = r.get("response_cache_hit_rate")
+        print(f"{r['target']:<10} {r['requests']:>6} {r['failures']:>5} {r['throughput_rps']:>8.1f} "
+              f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} "
+              f"{r['prefix_cache_hit_rate']:>11.1%} {'-' if response_hit is None else f'{response_hit:.1%}':>9}")
+
+
+async def _main(args: argparse.Namespace):
+    server = None
+    transport = None
+    base_url = args.base_url
+    if base_url is None:
+        server = MockDeepSeekServer(build_config(args))
+        if args.http:
+            base_url = await server.start(port=0)
+        else:
+            transport = server.transport()
+            base_url = "http://mock-deepseek/v1"
+
+    registry = DeepSeekClientRegistry(
+        max_concurrency=args.max_in_flight,
+        default_model_concurrency=args.max_in_flight,
+        transport=transport,
+        scheduler=RequestScheduler(requests_per_minute=args.rpm, tokens_per_minute=args.tpm)
+    )
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            harness = LoadTestHarness(registry, base_url, work_dir, stream=args.stream,
+                                      unique_prompts=args.unique_prompts)
+            results = await harness.run(args.targets, args.requests, args.concurrency)
+    finally:
+        await registry.close()
+        if server is not None:
+            await server.stop()
+
+    if args.json:
+        print(json.dumps({"results": results,
+                          "server": server.get_statistics() if server else None,
+                          "retries": harness.retry_policy.get_metrics(),
+                          "pool": registry.get_metrics()}, indent=2, default=str))
+        return
+    _report(results)
+    if server is not None:
+        stats = server.get_statistics()
+        print(f"\nserver: {stats['requests']} requests, {stats['rate_limited']} x 429, "
+              f"{stats['server_errors']} x 5xx, prompt cache hit rate {stats['prompt_cache_hit_rate']:.1%}")
+    print(f"retries: {harness.retry_policy.get_metrics()['retries']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM load test against a mock DeepSeek API")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--requests", type=int, default=100, help="calls per target")
+    parser.add_argument("--concurrency", type=int, default=8, help="callers in flight per target")
+    parser.add_argument("--unique-prompts", type=int, default=10, help="distinct prompts cycled through")
+    parser.add_argument("--stream", action="store_true", help="stream LLMQueryTool responses")
+    parser.add_argument("--max-in-flight", type=int, default=16, help="client pool concurrency cap")
+    parser.add_argument("--rpm", type=float, default=60_000, help="client-side requests per minute")
+    parser.add_argument("--tpm", type=float, default=50_000_000, help="client-side tokens per minute")
+    parser.add_argument("--http", action="store_true", help="serve the mock over a local socket instead of in-process")
+    parser.add_argument("--base-url", default=None, help="use an already running server instead of the mock")
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    add_server_arguments(parser)
+    asyncio.run(_main(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+DeannaMemoryManager write throughput benchmark
+Compares connect-per-call writes with the persistent connection and bulk APIs
+
+Usage: python benchmarks/memory_manager_benchmark.py --rows 5000
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(REPO_ROOT))
+
+# memory_manager logs to data/ relative to the working directory
+os.chdir(REPO_ROOT)
+
+from data.memory_manager import DeannaMemoryManager, INSERT_MEMORY_ENTRY_SQL
+
+
+def _entries(count: int, prefix: str):
+    return [
+        {
+            'category': 'benchmark',
+            'content': f'{prefix} memory entry {i}',
+            'importance': i % 10,
+            'tags': 'benchmark'
+        }
+        for i in range(count)
+    ]
+
+
+def _report(label: str, rows: int, elapsed: float):
+    print(f"{label:<36} {rows:>8} rows {elapsed:>9.3f}s {rows / max(elapsed, 1e-9):>12,.0f} rows/s")
+
+
+def bench_connect_per_call(manager: DeannaMemoryManager, entries):
+    """Baseline: open and close a connection for every write"""
+    start = time.perf_counter()
+    for entry in entries:
+        conn = sqlite3.connect(manager.db_path)
+        conn.execute(INSERT_MEMORY_ENTRY_SQL, (
+            entry['category'],
+            entry['content'],
+            hashlib.md5(entry['content'].encode()).hexdigest(),
+            entry['importance'],
+            entry['tags'],
+            datetime.now().isoformat()
+        ))
+        conn.commit()
+        conn.close()
+    return time.perf_counter() - start
+
+
+def bench_persistent(manager: DeannaMemoryManager, entries):
+    start = time.perf_counter()
+    for entry in entries:
+        manager.store_memory_entry(entry['category'], entry['content'], entry['importance'], entry['tags'])
+    return time.perf_counter() - start
+
+
+def bench_bulk(manager: DeannaMemoryManager, entries):
+    start = time.perf_counter()
+    manager.store_memory_entries_bulk(entries)
+    return time.perf_counter() - start
+
+
+def bench_log_access(manager: DeannaMemoryManager, count: int):
+    start = time.perf_counter()
+    for i in range(count):
+        manager.log_access(i % 100 + 1, 'read', 'bench')
+    return time.perf_counter() - start
+
+
+def bench_log_access_bulk(manager: DeannaMemoryManager, count: int):
+    start = time.perf_counter()
+    manager.log_access_bulk([
+        {'memory_id': i % 100 + 1, 'access_type': 'read', 'session_id': 'bench'}
+        for i in range(count)
+    ])
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DeannaMemoryManager throughput benchmark")
+    parser.add_argument("--rows", type=int, default=2000, help="Rows written per scenario")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        manager = DeannaMemoryManager(data_dir=tmp_dir)
+        try:
+            _report("memory: connect per call", args.rows,
+                    bench_connect_per_call(manager, _entries(args.rows, "baseline")))
+            _report("memory: persistent connection", args.rows,
+                    bench_persistent(manager, _entries(args.rows, "persistent")))
+            _report("memory: store_memory_entries_bulk", args.rows,
+                    bench_bulk(manager, _entries(args.rows, "bulk")))
+            _report("access: log_access", args.rows, bench_log_access(manager, args.rows))
+            _report("access: log_access_bulk", args.rows, bench_log_access_bulk(manager, args.rows))
+        finally:
+            manager.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Offline DeepSeek/OpenAI-compatible mock server
+Serves /chat/completions and /completions (under any base path such as /v1 or
+/beta) with configurable latency, streaming cadence, 429/5xx injection and
+usage reporting that includes DeepSeek's prompt_cache_hit/miss_tokens
+
+In-process: DeepSeekClientRegistry(transport=MockDeepSeekServer().transport())
+Over HTTP:  python benchmarks/mock_deepseek_server.py --port 8900
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(REPO_ROOT))
+
+from tools.token_counter import get_token_counter
+
+# DeepSeek's context cache stores prompt prefixes in 64-token units
+CACHE_UNIT_TOKENS = 64
+CHARS_PER_TOKEN = 4
+
+FILLER_WORDS = ("the", "cache", "returns", "a", "value", "for", "each", "request",
+                "and", "keeps", "latency", "low", "while", "tokens", "stream", "in")
+
+
+@dataclass
+class MockServerConfig:
+    """Latency, streaming and fault settings; all times in milliseconds"""
+    latency_ms: float = 200.0
+    latency_jitter_ms: float = 50.0
+    latency_distribution: str = "lognormal"  # "fixed", "uniform" or "lognormal"
+    first_chunk_ms: float = 150.0
+    chunk_interval_ms: float = 20.0
+    completion_tokens: int = 48
+    tokens_per_chunk: int = 2
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    retry_after: float = 0.05
+    seed: Optional[int] = None
+
+
+class MockDeepSeekServer:
+    """Deterministic-enough stand-in for the DeepSeek API"""
+
+    def __init__(self, config: Optional[MockServerConfig] = None):
+        self.config = config or MockServerConfig()
+        self.rng = random.Random(self.config.seed)
+        self.token_counter = get_token_counter()
+        self._cached_prefixes = set()
+        self._runner = None
+        self.stats = {"requests": 0, "streamed": 0, "rate_limited": 0, "server_errors": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0,
+                      "prompt_cache_hit_tokens": 0, "prompt_cache_miss_tokens": 0}
+        self.requests_by_path: Dict[str, int] = {}
+
+    def _sample_latency(self, mean_ms: float) -> float:
+        config = self.config
+        if config.latency_distribution == "fixed" or mean_ms <= 0:
+            value = mean_ms
+        elif config.latency_distribution == "uniform":
+            value = self.rng.uniform(mean_ms - config.latency_jitter_ms, mean_ms + config.latency_jitter_ms)
+        else:
+            # Lognormal with the configured mean and standard deviation: a long right tail like real APIs
+            sigma = math.sqrt(math.log1p((config.latency_jitter_ms / mean_ms) ** 2))
+            mu = math.log(mean_ms) - sigma ** 2 / 2
+            value = self.rng.lognormvariate(mu, sigma)
+        return max(value, 0.0) / 1000
+
+    def _prompt_text(self, body: Dict[str, Any]) -> str:
+        if "messages" in body:
+            return "\n".join(f"{m.get('role', '')}: {m.get('content') or ''}" for m in body["messages"])
+        return str(body.get("prompt", ""))
+
+    def _cache_usage(self, prompt: str) -> Tuple[int, int]:
+        """Hit tokens are the longest previously seen 64-token-aligned prefix"""
+        unit = CACHE_UNIT_TOKENS * CHARS_PER_TOKEN
+        hit_chars = 0
+        for end in range(unit, len(prompt) + 1, unit):
+            digest = hashlib.sha1(prompt[:end].encode()).hexdigest()
+            if digest in self._cached_prefixes:
+                hit_chars = end
+            else:
+                self._cached_prefixes.add(digest)
+        prompt_tokens = self.token_counter.count(prompt)
+        hit_tokens = min(self.token_counter.count(prompt[:hit_chars]), prompt_tokens) if hit_chars else 0
+        return hit_tokens, prompt_tokens - hit_tokens
+
+    def _completion_text(self, prompt: str, max_tokens: int) -> List[str]:
+        """Completion tokens derived from the prompt, so equal prompts get equal answers"""
+        words = min(self.config.completion_tokens, max_tokens or self.config.completion_tokens)
+        offset = int(hashlib.sha1(prompt.encode()).hexdigest()[:8], 16)
+        return [(" " if i else "") + FILLER_WORDS[(offset + i) % len(FILLER_WORDS)] for i in range(words)]
+
+    def _usage(self, prompt: str, completion_tokens: int) -> Dict[str, int]:
+        hit, miss = self._cache_usage(prompt)
+        usage = {"prompt_tokens": hit + miss, "completion_tokens": completion_tokens,
+                 "total_tokens": hit + miss + completion_tokens,
+                 "prompt_cache_hit_tokens": hit, "prompt_cache_miss_tokens": miss}
+        for key in ("prompt_tokens", "completion_tokens", "prompt_cache_hit_tokens", "prompt_cache_miss_tokens"):
+            self.stats[key] += usage[key]
+        return usage
+
+    def _fault(self) -> Optional[Tuple[int, Dict[str, str], Dict[str, Any]]]:
+        roll = self.rng.random()
+        if roll < self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return 429, {"Retry-After": str(self.config.retry_after)}, {
+                "error": {"message": "Rate limit reached", "type": "rate_limit_error", "code": "rate_limit"}}
+        if roll < self.config.rate_limit_rate + self.config.server_error_rate:
+            self.stats["server_errors"] += 1
+            status = self.rng.choice((500, 502, 503))
+            return status, {}, {"error": {"message": "Server busy", "type": "server_error", "code": status}}
+        return None
+
+    async def handle(self, method: str, path: str, body: Dict[str, Any]
+                     ) -> Tuple[int, Dict[str, str], Any]:
+        """Returns (status, headers, payload); payload is a dict or an SSE byte iterator"""
+        self.stats["requests"] += 1
+        endpoint = next((suffix for suffix in ("/chat/completions", "/completions", "/models")
+                         if path.rstrip("/").endswith(suffix)), path)
+        self.requests_by_path[endpoint] = self.requests_by_path.get(endpoint, 0) + 1
+
+        if method == "GET" and endpoint == "/models":
+            return 200, {}, {"object": "list", "data": [{"id": m, "object": "model", "owned_by": "deepseek"}
+                                                        for m in ("deepseek-chat", "deepseek-coder", "deepseek-reasoner")]}
+        if method != "POST" or endpoint not in ("/chat/completions", "/completions"):
+            return 404, {}, {"error": {"message": f"Unknown endpoint {method} {path}", "type": "invalid_request_error"}}
+
+        fault = self._fault()
+        if fault is not None:
+            await asyncio.sleep(self._sample_latency(self.config.latency_ms) / 4)
+            return fault
+
+        model = body.get("model", "deepseek-chat")
+        prompt = self._prompt_text(body)
+        tokens = self._completion_text(prompt, body.get("max_tokens") or 0)
+        usage = self._usage(prompt, len(tokens))
+        chat = endpoint == "/chat/completions"
+
+        if body.get("stream"):
+            self.stats["streamed"] += 1
+            include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+            return 200, {"Content-Type": "text/event-stream"}, self._stream(model, chat, tokens, usage, include_usage)
+
+        await asyncio.sleep(self._sample_latency(self.config.latency_ms))
+        text = "".join(tokens)
+        if chat:
+            choice = {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+        else:
+            choice = {"index": 0, "text": text, "finish_reason": "stop", "logprobs": None}
+        return 200, {}, {"id": f"mock-{self.stats['requests']}", "created": int(time.time()), "model": model,
+                         "object": "chat.completion" if chat else "text_completion",
+                         "choices": [choice], "usage": usage}
+
+    async def _stream(self, model: str, chat: bool, tokens: List[str], usage: Dict[str, int],
+                      include_usage: bool) -> AsyncIterator[bytes]:
+        def event(choices: List[Dict[str, Any]], chunk_usage: Optional[Dict[str, int]] = None) -> bytes:
+            chunk = {"id": "mock-stream", "object": "chat.completion.chunk" if chat else "text_completion",
+                     "created": int(time.time()), "model": model, "choices": choices}
+            if chunk_usage is not None:
+                chunk["usage"] = chunk_usage
+            return f"data: {json.dumps(chunk)}\n\n".encode()
+
+        def choice(text: str, finish_reason: Optional[str] = None) -> Dict[str, Any]:
+            if chat:
+                return {"index": 0, "delta": {"content": text}, "finish_reason": finish_reason}
+            return {"index": 0, "text": text, "finish_reason": finish_reason, "logprobs": None}
+
+        await asyncio.sleep(self._sample_latency(self.config.first_chunk_ms))
+        if chat:
+            yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        step = max(self.config.tokens_per_chunk, 1)
+        for start in range(0, len(tokens), step):
+            if start:
+                await asyncio.sleep(self.config.chunk_interval_ms / 1000)
+            yield event([choice("".join(tokens[start:start + step]))])
+        yield event([choice("", "stop")])
+        if include_usage:
+            yield event([], usage)
+        yield b"data: [DONE]\n\n"
+
+    def transport(self) -> httpx.MockTransport:
+        """In-process httpx transport; no sockets involved"""
+        async def handler(request: httpx.Request) -> httpx.Response:
+            body = json.loads(request.content) if request.content else {}
+            status, headers, payload = await self.handle(request.method, request.url.path, body)
+            if isinstance(payload, dict):
+                return httpx.Response(status, headers=headers, json=payload)
+            return httpx.Response(status, headers=headers, content=payload)
+
+        return httpx.MockTransport(handler)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8900) -> str:
+        """Serve over HTTP with aiohttp; returns the base URL"""
+        from aiohttp import web
+
+        async def handler(request: web.Request) -> web.StreamResponse:
+            body = await request.json() if request.can_read_body else {}
+            status, headers, payload = await self.handle(request.method, request.path, body)
+            if isinstance(payload, dict):
+                return web.json_response(payload, status=status, headers=headers)
+            response = web.StreamResponse(status=status, headers=headers)
+            await response.prepare(request)
+            async for chunk in payload:
+                await response.write(chunk)
+            await response.write_eof()
+            return response
+
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", handler)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1] if self._runner.addresses else port
+        return f"http://{host}:{bound_port}/v1"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def get_statistics(self) -> Dict[str, Any]:
+        cached = self.stats["prompt_cache_hit_tokens"]
+        total = cached + self.stats["prompt_cache_miss_tokens"]
+        return {**self.stats, "by_path": dict(self.requests_by_path),
+                "prompt_cache_hit_rate": cached / total if total else 0.0}
+
+
+def build_config(args: argparse.Namespace) -> MockServerConfig:
+    return MockServerConfig(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        latency_distribution=args.distribution,
+        first_chunk_ms=args.first_chunk_ms,
+        chunk_interval_ms=args.chunk_interval_ms,
+        completion_tokens=args.completion_tokens,
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        seed=args.seed
+    )
+
+
+def add_server_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="mean non-streaming latency")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="latency standard deviation / half-range")
+    parser.add_argument("--distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--first-chunk-ms", type=float, default=150.0, help="time to first streamed chunk")
+    parser.add_argument("--chunk-interval-ms", type=float, default=20.0, help="gap between streamed chunks")
+    parser.add_argument("--completion-tokens", type=int, default=48)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="fraction answered with 5xx")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+async def _serve(args: argparse.Namespace):
+    server = MockDeepSeekServer(build_config(args))
+    base_url = await server.start(args.host, args.port)
+    print(f"Mock DeepSeek API listening on {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+        print(json.dumps(server.get_statistics(), indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline DeepSeek-compatible mock server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_server_arguments(parser)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,11 @@ import sqlite3
 import os
 import hashlib
 import pickle
+import threading
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterator, List, Any, Optional, Tuple
 import numpy as np
 from pathlib import Path
 import logging
@@ -26,12 +29,351 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Statements are module constants so every call passes the identical SQL
+# text and hits sqlite3's per-connection prepared-statement cache
+INSERT_MEMORY_ENTRY_SQL = '''
+    INSERT OR REPLACE INTO memory_entries 
+    (category, content, embedding_hash, importance, tags, last_accessed)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_CHAT_HISTORY_SQL = '''
+    INSERT INTO chat_history 
+    (session_id, user_input, deanna_response, context_hash, emotion_score, tags)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_DEEPSEEK_CACHE_SQL = '''
+    INSERT OR REPLACE INTO deepseek_cache 
+    (prompt_hash, response, model_used, tokens_used, cost, context_length)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+SELECT_CACHED_RESPONSE_SQL = 'SELECT response FROM deepseek_cache WHERE prompt_hash = ?'
+
+INSERT_EMBEDDING_SQL = '''
+    INSERT OR REPLACE INTO embeddings 
+    (content_hash, vector_row, dimension, model_used)
+    VALUES (?, ?, ?, ?)
+'''
+
+UPDATE_MEMORY_EMBEDDING_HASH_SQL = '''
+    UPDATE memory_entries 
+    SET embedding_hash = ? 
+    WHERE content = ?
+'''
+
+SELECT_EMBEDDING_ROW_SQL = 'SELECT vector_row FROM embeddings WHERE content_hash = ?'
+
+SELECT_EMBEDDING_SLOT_SQL = 'SELECT vector_row, dimension FROM embeddings WHERE content_hash = ?'
+
+INSERT_ACCESS_LOG_SQL = '''
+    INSERT INTO access_logs (memory_id, access_type, session_id, metadata)
+    VALUES (?, ?, ?, ?)
+'''
+
+UPDATE_MEMORY_ACCESS_SQL = '''
+    UPDATE memory_entries 
+    SET access_count = access_count + 1, last_accessed = ?
+    WHERE id = ?
+'''
+
+class SQLiteConnectionManager:
+    """Hands out one long-lived WAL connection per thread"""
+    
+    def __init__(self, db_path: Path, cached_statements: int = 256, busy_timeout_ms: int = 5000):
+        self.db_path = Path(db_path)
+        self.cached_statements = cached_statements
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+    
+    def get_connection(self) -> sqlite3.Connection:
+        """Get (or lazily open) the calling thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # check_same_thread=False only so close_all() can close connections
+            # opened by other threads; each connection is still used by one thread
+            conn = sqlite3.connect(
+                str(self.db_path),
+                cached_statements=self.cached_statements,
+                check_same_thread=False
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA temp_store=MEMORY')
+            conn.execute(f'PRAGMA busy_timeout={int(self.busy_timeout_ms)}')
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+    
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Run statements in one transaction, committing on success"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        try:
+            yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+    
+    def close_all(self):
+        """Close every connection opened by this manager"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to close connection: {e}")
+        self._local = threading.local()
+
+class EmbeddingLRUCache:
+    """Byte-bounded LRU cache of embedding vectors"""
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "rejected": 0
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self._entries
+    
+    def get(self, content_hash: str) -> Optional[np.ndarray]:
+        """Return a cached vector and mark it most recently used"""
+        with self._lock:
+            vector = self._entries.get(content_hash)
+            if vector is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(content_hash)
+            self.stats["hits"] += 1
+            return vector
+    
+    def put(self, content_hash: str, vector: np.ndarray):
+        """Cache a vector, evicting least recently used ones to stay in budget"""
+        vector = np.asarray(vector)
+        size = vector.nbytes
+        with self._lock:
+            previous = self._entries.pop(content_hash, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes
+            
+            if size > self.max_bytes:
+                self.stats["rejected"] += 1
+                return
+            
+            while self._entries and self.current_bytes + size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.stats["evictions"] += 1
+            
+            self._entries[content_hash] = vector
+            self.current_bytes += size
+    
+    __setitem__ = put
+    
+    def clear(self):
+        """Drop all cached vectors"""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+    
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache size and hit/miss/eviction counters"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "size_bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+        }
+
+class MemmapVectorStore:
+    """Float32 matrix on disk, read through np.memmap
+    
+    Row i of the matrix lives at byte offset i * dimension * 4 of a single
+    file, so opening the store only stats the file; the hash -> row mapping
+    lives in the embeddings table. New hashes append a row, replaced ones
+    are overwritten in place.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.meta_path = self.path.with_suffix('.json')
+        self.dimension: Optional[int] = None
+        self._rows = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+        
+        if self.meta_path.exists():
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                self.dimension = json.load(f)['dimension']
+        
+        if self.dimension and self.path.exists():
+            row_bytes = self.dimension * 4
+            size = self.path.stat().st_size
+            self._rows = size // row_bytes
+            if size % row_bytes:
+                # Drop a row torn by a crash mid-append
+                with open(self.path, 'r+b') as f:
+                    f.truncate(self._rows * row_bytes)
+    
+    def __len__(self) -> int:
+        return self._rows
+    
+    def _set_dimension(self, dimension: int):
+        self.dimension = dimension
+        with open(self.meta_path, 'w', encoding='utf-8') as f:
+            json.dump({'dimension': dimension, 'dtype': 'float32'}, f)
+    
+    def append_many(self, vectors: List[np.ndarray]) -> List[int]:
+        """Append vectors and return their row numbers"""
+        if not vectors:
+            return []
+        
+        matrix = np.stack([np.asarray(v, dtype=np.float32).ravel() for v in vectors])
+        with self._lock:
+            if self.dimension is None:
+                self._set_dimension(matrix.shape[1])
+            elif matrix.shape[1] != self.dimension:
+                raise ValueError(f"Embedding dimension {matrix.shape[1]} does not match store dimension {self.dimension}")
+            
+            first_row = self._rows
+            with open(self.path, 'ab') as f:
+                f.write(np.ascontiguousarray(matrix).tobytes())
+            self._rows += matrix.shape[0]
+            # Remapped lazily on the next read
+            self._mmap = None
+        return list(range(first_row, first_row + matrix.shape[0]))
+    
+    def append(self, vector: np.ndarray) -> int:
+        """Append one vector and return its row number"""
+        return self.append_many([vector])[0]
+    
+    def write(self, row: int, vector: np.ndarray):
+        """Overwrite an existing row in place"""
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        with self._lock:
+            if vector.shape[0] != self.dimension:
+                raise ValueError(f"Embedding dimension {vector.shape[0]} does not match store dimension {self.dimension}")
+            if not 0 <= row < self._rows:
+                raise IndexError(f"Row {row} is outside the store ({self._rows} rows)")
+            # Shared mapping, so the read-only view sees the new values
+            writable = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(self._rows, self.dimension))
+            writable[row] = vector
+            writable.flush()
+            del writable
+    
+    @property
+    def matrix(self) -> np.ndarray:
+        """Read-only memory-mapped view of all rows"""
+        if not self._rows:
+            return np.empty((0, self.dimension or 0), dtype=np.float32)
+        mmap = self._mmap
+        if mmap is None or mmap.shape[0] != self._rows:
+            mmap = np.memmap(self.path, dtype=np.float32, mode='r', shape=(self._rows, self.dimension))
+            self._mmap = mmap
+        return mmap
+    
+    def get(self, row: int) -> np.ndarray:
+        """Copy one row out of the mapping"""
+        return np.array(self.matrix[row])
+    
+    def get_many(self, rows: List[int]) -> np.ndarray:
+        """Gather rows into a contiguous in-memory matrix"""
+        return np.asarray(self.matrix[np.asarray(rows, dtype=np.int64)])
+
+class MemoryVectorIndex:
+    """Maps embedding hashes to vector-store rows and scores them in chunks
+    
+    Vectors stay in the memory-mapped store; a search holds at most
+    chunk_rows of them in RAM at once, plus one float32 score per entry.
+    """
+    
+    def __init__(self, store: MemmapVectorStore, chunk_rows: int = 4096):
+        self.store = store
+        self.chunk_rows = max(1, chunk_rows)
+        self.hashes: List[str] = []
+        self.rows: List[int] = []
+        self.position_of: Dict[str, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self.hashes)
+    
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self.position_of
+    
+    @property
+    def dimension(self) -> Optional[int]:
+        return self.store.dimension
+    
+    def upsert(self, content_hash: str, row: int):
+        """Point a hash at a vector-store row"""
+        position = self.position_of.get(content_hash)
+        if position is None:
+            self.position_of[content_hash] = len(self.hashes)
+            self.hashes.append(content_hash)
+            self.rows.append(row)
+        else:
+            self.rows[position] = row
+    
+    def upsert_many(self, content_hashes: List[str], rows: List[int]):
+        """Point a batch of hashes at their rows"""
+        for content_hash, row in zip(content_hashes, rows):
+            self.upsert(content_hash, row)
+    
+    def top_k(self, query_vector: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        """Return the k most cosine-similar hashes, best first"""
+        if not self.hashes or k <= 0:
+            return []
+        
+        query = np.asarray(query_vector, dtype=np.float32).ravel()
+        if query.shape[0] != self.dimension:
+            raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.dimension}")
+        norm = np.linalg.norm(query)
+        if norm > 0:
+            query = query / norm
+        
+        rows = np.asarray(self.rows, dtype=np.int64)
+        scores = np.empty(rows.shape[0], dtype=np.float32)
+        for start in range(0, rows.shape[0], self.chunk_rows):
+            chunk = self.store.get_many(rows[start:start + self.chunk_rows])
+            norms = np.linalg.norm(chunk, axis=1)
+            norms[norms == 0] = 1.0
+            scores[start:start + chunk.shape[0]] = (chunk @ query) / norms
+        
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.hashes[i], float(scores[i])) for i in top]
+
 class DeannaMemoryManager:
     """Comprehensive memory manager for Deanna persona"""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data",
+                 embedding_function: Optional[Callable[[str], np.ndarray]] = None,
+                 embedding_cache_max_bytes: int = 64 * 1024 * 1024):
     
         self.data_dir = Path(data_dir)
+        self.embedding_function = embedding_function
         self.data_dir.mkdir(exist_ok=True)
         
         # Initialize subdirectories
@@ -46,22 +388,31 @@ class DeannaMemoryManager:
         
         # Initialize database
         self.db_path = self.data_dir / "deanna_memory.db"
+        self.db = SQLiteConnectionManager(self.db_path)
         self.init_database()
         
         # Load Deanna memory
         self.deanna_memory = self.load_deanna_memory()
         
         # Initialize embedding cache
-        self.embedding_cache = {}
+        self.embedding_cache = EmbeddingLRUCache(max_bytes=embedding_cache_max_bytes)
+        self.vector_store = MemmapVectorStore(self.embeddings_dir / "vectors.f32")
+        self.migrate_legacy_embeddings()
         self.load_embedding_cache()
         
+        # Vector index for semantic search, built on first use
+        self.vector_index: Optional[MemoryVectorIndex] = None
+        
         logger.info("DeannaMemoryManager initialized successfully")
     
     def init_database(self) -> Any:
         """Initialize SQLite database with all required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+        with self.db.transaction() as cursor:
+            self._create_tables(cursor)
+        logger.info("Database initialized with all tables")
+    
+    def _create_tables(self, cursor: sqlite3.Cursor):
+        """Create tables and indexes if they do not exist"""
         # Core memory table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS memory_entries (
@@ -111,7 +462,8 @@ class DeannaMemoryManager:
             CREATE TABLE IF NOT EXISTS embeddings (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 content_hash TEXT UNIQUE NOT NULL,
-                vector_data BLOB NOT NULL,
+                vector_data BLOB,
+                vector_row INTEGER,
                 dimension INTEGER,
                 model_used TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -148,11 +500,34 @@ class DeannaMemoryManager:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_memory_tags ON memory_entries(tags)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_chat_session ON chat_history(session_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_cache_hash ON deepseek_cache(prompt_hash)')
+        self._upgrade_embeddings_table(cursor)
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_embeddings_hash ON embeddings(content_hash)')
+    
+    def _upgrade_embeddings_table(self, cursor: sqlite3.Cursor):
+        """Rebuild pre-vector-store embeddings tables with a vector_row column"""
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(embeddings)')}
+        if 'vector_row' in columns:
+            return
         
-        conn.commit()
-        conn.close()
-        logger.info("Database initialized with all tables")
+        # SQLite cannot relax NOT NULL on vector_data in place, so copy across
+        cursor.execute('''
+            CREATE TABLE embeddings_upgraded (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content_hash TEXT UNIQUE NOT NULL,
+                vector_data BLOB,
+                vector_row INTEGER,
+                dimension INTEGER,
+                model_used TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO embeddings_upgraded (id, content_hash, vector_data, dimension, model_used, created_at)
+            SELECT id, content_hash, vector_data, dimension, model_used, created_at FROM embeddings
+        ''')
+        cursor.execute('DROP TABLE embeddings')
+        cursor.execute('ALTER TABLE embeddings_upgraded RENAME TO embeddings')
+        logger.info("Upgraded embeddings table for the memory-mapped vector store")
     
     def load_deanna_memory(self) -> Dict[str, Any]:
         """Load DEANNA_MEMORY.JSON file"""
@@ -182,173 +557,187 @@ class DeannaMemoryManager:
     def store_persona_config(self, name: str, config_data: Dict[str, Any]):
     
         """Store persona configuration in database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO persona_config (name, config_data, version, updated_at)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            name,
-            json.dumps(config_data),
-            config_data.get('version', '1.0.0'),
-            datetime.now().isoformat()
-        ))
+        with self.db.transaction() as cursor:
+            cursor.execute('''
+                INSERT OR REPLACE INTO persona_config (name, config_data, version, updated_at)
+                VALUES (?, ?, ?, ?)
+            ''', (
+                name,
+                json.dumps(config_data),
+                config_data.get('version', '1.0.0'),
+                datetime.now().isoformat()
+            ))
         
-        conn.commit()
-        conn.close()
         logger.info(f"Stored persona config for {name}")
     
     def extract_memory_components(self, memory_data: Dict[str, Any]):
     
         """Extract key components from memory data and store as separate entries"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        entries = []
         
         # Store system prompt
         if 'system_prompt' in memory_data:
-            self.store_memory_entry(
-                'system_prompt',
-                memory_data['system_prompt'],
-                importance=10,
-                tags='core,personality,deanna'
-            )
+            entries.append({
+                'category': 'system_prompt',
+                'content': memory_data['system_prompt'],
+                'importance': 10,
+                'tags': 'core,personality,deanna'
+            })
         
         # Store personality traits
         if 'personality_traits' in memory_data:
-            self.store_memory_entry(
-                'personality_traits',
-                json.dumps(memory_data['personality_traits']),
-                importance=9,
-                tags='personality,deanna'
-            )
+            entries.append({
+                'category': 'personality_traits',
+                'content': json.dumps(memory_data['personality_traits']),
+                'importance': 9,
+                'tags': 'personality,deanna'
+            })
         
         # Store conversation style
         if 'conversation_style' in memory_data:
-            self.store_memory_entry(
-                'conversation_style',
-                json.dumps(memory_data['conversation_style']),
-                importance=9,
-                tags='conversation,style,deanna'
-            )
+            entries.append({
+                'category': 'conversation_style',
+                'content': json.dumps(memory_data['conversation_style']),
+                'importance': 9,
+                'tags': 'conversation,style,deanna'
+            })
         
         # Store additional context sections
         if 'additional_context' in memory_data:
             for key, value in memory_data['additional_context'].items():
-                self.store_memory_entry(
-                    f'context_{key}',
-                    json.dumps(value),
-                    importance=8,
-                    tags=f'context,{key},deanna'
-                )
+                entries.append({
+                    'category': f'context_{key}',
+                    'content': json.dumps(value),
+                    'importance': 8,
+                    'tags': f'context,{key},deanna'
+                })
         
         # Store behavioral patterns
         if 'behavioral_patterns' in memory_data:
-            self.store_memory_entry(
-                'behavioral_patterns',
-                json.dumps(memory_data['behavioral_patterns']),
-                importance=9,
-                tags='behavior,patterns,deanna'
-            )
+            entries.append({
+                'category': 'behavioral_patterns',
+                'content': json.dumps(memory_data['behavioral_patterns']),
+                'importance': 9,
+                'tags': 'behavior,patterns,deanna'
+            })
         
         # Store response preferences
         if 'response_preferences' in memory_data:
-            self.store_memory_entry(
-                'response_preferences',
-                json.dumps(memory_data['response_preferences']),
-                importance=9,
-                tags='responses,preferences,deanna'
-            )
+            entries.append({
+                'category': 'response_preferences',
+                'content': json.dumps(memory_data['response_preferences']),
+                'importance': 9,
+                'tags': 'responses,preferences,deanna'
+            })
         
-        conn.close()
+        self.store_memory_entries_bulk(entries)
         logger.info("Extracted and stored memory components")
     
-    def store_memory_entry(self, category: str, content: str, importance: int = 5, tags: str = ""):
-    
-        """Store a memory entry"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
+    def _memory_entry_row(self, category: str, content: str, importance: int = 5, tags: str = "") -> tuple:
+        """Build the parameter row for INSERT_MEMORY_ENTRY_SQL"""
         content_hash = hashlib.md5(content.encode()).hexdigest()
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO memory_entries 
-            (category, content, embedding_hash, importance, tags, last_accessed)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
+        return (
             category,
             content,
             content_hash,
             importance,
             tags,
             datetime.now().isoformat()
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
+    
+    def store_memory_entry(self, category: str, content: str, importance: int = 5, tags: str = ""):
+    
+        """Store a memory entry"""
+        with self.db.transaction() as cursor:
+            cursor.execute(INSERT_MEMORY_ENTRY_SQL, self._memory_entry_row(category, content, importance, tags))
+    
+    def store_memory_entries_bulk(self, entries: List[Dict[str, Any]]) -> int:
+        """Store many memory entries in a single transaction"""
+        rows = [
+            self._memory_entry_row(
+                entry['category'],
+                entry['content'],
+                entry.get('importance', 5),
+                entry.get('tags', "")
+            )
+            for entry in entries
+        ]
+        if not rows:
+            return 0
+        
+        with self.db.transaction() as cursor:
+            cursor.executemany(INSERT_MEMORY_ENTRY_SQL, rows)
+        return len(rows)
     
     def store_chat_history(self, session_id: str, user_input: str, deanna_response: str, 
                           context_hash: str = None, emotion_score: float = 0.0, tags: str = ""):
     
         """Store chat history"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO chat_history 
-            (session_id, user_input, deanna_response, context_hash, emotion_score, tags)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            session_id,
-            user_input,
-            deanna_response,
-            context_hash,
-            emotion_score,
-            tags
-        ))
-        
-        conn.commit()
-        conn.close()
-        
-        # Also save to file for backup
-        chat_file = self.chats_dir / f"{session_id}.json"
-        chat_data = {
+        self.store_chat_history_bulk([{
             'session_id': session_id,
-            'timestamp': datetime.now().isoformat(),
             'user_input': user_input,
             'deanna_response': deanna_response,
             'context_hash': context_hash,
             'emotion_score': emotion_score,
             'tags': tags
-        }
-        
-        with open(chat_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(chat_data) + '\n')
+        }])
+    
+    def store_chat_history_bulk(self, records: List[Dict[str, Any]]) -> int:
+        """Store many chat turns in a single transaction"""
+        if not records:
+            return 0
+        
+        rows = [
+            (
+                record['session_id'],
+                record['user_input'],
+                record['deanna_response'],
+                record.get('context_hash'),
+                record.get('emotion_score', 0.0),
+                record.get('tags', "")
+            )
+            for record in records
+        ]
+        
+        with self.db.transaction() as cursor:
+            cursor.executemany(INSERT_CHAT_HISTORY_SQL, rows)
+        
+        # Also save to file for backup, one append per session
+        by_session = defaultdict(list)
+        timestamp = datetime.now().isoformat()
+        for record in records:
+            by_session[record['session_id']].append(json.dumps({
+                'session_id': record['session_id'],
+                'timestamp': record.get('timestamp', timestamp),
+                'user_input': record['user_input'],
+                'deanna_response': record['deanna_response'],
+                'context_hash': record.get('context_hash'),
+                'emotion_score': record.get('emotion_score', 0.0),
+                'tags': record.get('tags', "")
+            }))
+        
+        for session_id, lines in by_session.items():
+            chat_file = self.chats_dir / f"{session_id}.json"
+            with open(chat_file, 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        
+        return len(rows)
     
     def cache_deepseek_response(self, prompt: str, response: str, model_used: str = "deepseek-chat",
                                tokens_used: int = 0, cost: float = 0.0, context_length: int = 0):
     
         """Cache DeepSeek API response"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
         prompt_hash = hashlib.md5(prompt.encode()).hexdigest()
         
-        cursor.execute('''
-            INSERT OR REPLACE INTO deepseek_cache 
-            (prompt_hash, response, model_used, tokens_used, cost, context_length)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            prompt_hash,
-            response,
-            model_used,
-            tokens_used,
-            cost,
-            context_length
-        ))
-        
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as cursor:
+            cursor.execute(INSERT_DEEPSEEK_CACHE_SQL, (
+                prompt_hash,
+                response,
+                model_used,
+                tokens_used,
+                cost,
+                context_length
+            ))
         
         # Also save to file cache
         cache_file = self.cache_dir / f"{prompt_hash}.json"
@@ -380,13 +769,7 @@ class DeannaMemoryManager:
                 pass
         
         # Check database cache
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT response FROM deepseek_cache WHERE prompt_hash = ?', (prompt_hash,))
-        result = cursor.fetchone()
-        
-        conn.close()
+        result = self.db.get_connection().execute(SELECT_CACHED_RESPONSE_SQL, (prompt_hash,)).fetchone()
         
         return result[0] if result else None
     
@@ -395,122 +778,247 @@ class DeannaMemoryManager:
         """Store embedding vector"""
         content_hash = hashlib.md5(content.encode()).hexdigest()
         
-        # Store in database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        vector_blob = pickle.dumps(vector)
-        
-        cursor.execute('''
-            INSERT OR REPLACE INTO embeddings 
-            (content_hash, vector_data, dimension, model_used)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            content_hash,
-            vector_blob,
-            len(vector),
-            model_used
-        ))
-        
-        conn.commit()
-        conn.close()
-        
-        # Store in file cache
-        embedding_file = self.embeddings_dir / f"{content_hash}.npy"
-        np.save(embedding_file, vector)
-        
-        # Update memory entry with embedding hash
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            UPDATE memory_entries 
-            SET embedding_hash = ? 
-            WHERE content = ?
-        ''', (content_hash, content))
-        
-        conn.commit()
-        conn.close()
+        # Reuse the hash's row when it has one, so replacing an embedding
+        # never leaves a dead row behind; otherwise append
+        existing = self.db.get_connection().execute(SELECT_EMBEDDING_SLOT_SQL, (content_hash,)).fetchone()
+        if (existing and existing[0] is not None and existing[1] == len(vector)
+                and existing[0] < len(self.vector_store)):
+            row = existing[0]
+            self.vector_store.write(row, vector)
+        else:
+            row = self.vector_store.append(vector)
+        
+        # Record the row and link the memory entry in one transaction
+        with self.db.transaction() as cursor:
+            cursor.execute(INSERT_EMBEDDING_SQL, (
+                content_hash,
+                row,
+                len(vector),
+                model_used
+            ))
+            cursor.execute(UPDATE_MEMORY_EMBEDDING_HASH_SQL, (content_hash, content))
         
         self.embedding_cache[content_hash] = vector
+        if self.vector_index is not None:
+            self.vector_index.upsert(content_hash, row)
         logger.info(f"Stored embedding for content hash: {content_hash}")
     
     def get_embedding(self, content_hash: str) -> Optional[np.ndarray]:
         """Get embedding vector"""
         # Check memory cache first
-        if content_hash in self.embedding_cache:
-            return self.embedding_cache[content_hash]
-        
-        # Check file cache
-        embedding_file = self.embeddings_dir / f"{content_hash}.npy"
-        if embedding_file.exists():
-            vector = np.load(embedding_file)
-            self.embedding_cache[content_hash] = vector
+        vector = self.embedding_cache.get(content_hash)
+        if vector is not None:
             return vector
         
-        # Check database
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT vector_data FROM embeddings WHERE content_hash = ?', (content_hash,))
-        result = cursor.fetchone()
-        
-        conn.close()
+        # Resolve the row in the vector store
+        result = self.db.get_connection().execute(SELECT_EMBEDDING_ROW_SQL, (content_hash,)).fetchone()
         
-        if result:
-            vector = pickle.loads(result[0])
+        if result and result[0] is not None:
+            vector = self.vector_store.get(result[0])
             self.embedding_cache[content_hash] = vector
             return vector
         
         return None
     
     def load_embedding_cache(self) -> Any:
-        """Load embedding cache from files"""
-        for embedding_file in self.embeddings_dir.glob("*.npy"):
-            content_hash = embedding_file.stem
-            vector = np.load(embedding_file)
-            self.embedding_cache[content_hash] = vector
-        
-        logger.info(f"Loaded {len(self.embedding_cache)} embeddings into cache")
+        """Open the vector store; rows are paged in on demand"""
+        logger.info(f"Vector store ready with {len(self.vector_store)} embeddings")
     
-    def search_memory(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Search memory entries by content similarity"""
-        # Simple text-based search for now
-        # FIXME: [PRIORITY]  [PRIORITY]  Implement vector similarity search when embeddings are available
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    def migrate_legacy_embeddings(self) -> int:
+        """One-shot move of pickled BLOBs and per-hash .npy files into the vector store"""
+        conn = self.db.get_connection()
+        legacy_files = list(self.embeddings_dir.glob("*.npy"))
+        has_blobs = conn.execute(
+            'SELECT 1 FROM embeddings WHERE vector_data IS NOT NULL AND vector_row IS NULL LIMIT 1'
+        ).fetchone() is not None
+        if not legacy_files and not has_blobs:
+            return 0
+        
+        hashes: List[str] = []
+        vectors: List[np.ndarray] = []
+        seen = set()
+        
+        for content_hash, blob in conn.execute(
+            'SELECT content_hash, vector_data FROM embeddings WHERE vector_data IS NOT NULL AND vector_row IS NULL'
+        ).fetchall():
+            try:
+                vectors.append(np.asarray(pickle.loads(blob), dtype=np.float32))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable embedding blob {content_hash}: {e}")
+                continue
+            hashes.append(content_hash)
+            seen.add(content_hash)
         
-        cursor.execute('''
-            SELECT category, content, importance, tags, last_accessed
+        migrated_rows = {
+            row[0] for row in conn.execute('SELECT content_hash FROM embeddings WHERE vector_row IS NOT NULL')
+        }
+        for embedding_file in legacy_files:
+            content_hash = embedding_file.stem
+            if content_hash in seen or content_hash in migrated_rows:
+                continue
+            try:
+                vectors.append(np.load(embedding_file).astype(np.float32))
+            except Exception as e:
+                logger.warning(f"Skipping unreadable embedding file {embedding_file}: {e}")
+                continue
+            hashes.append(content_hash)
+            seen.add(content_hash)
+        
+        rows = self.vector_store.append_many(vectors)
+        with self.db.transaction() as cursor:
+            cursor.executemany('''
+                INSERT INTO embeddings (content_hash, vector_row, dimension, model_used)
+                VALUES (?, ?, ?, 'local')
+                ON CONFLICT(content_hash) DO UPDATE SET vector_row = excluded.vector_row, vector_data = NULL
+            ''', [(content_hash, row, self.vector_store.dimension) for content_hash, row in zip(hashes, rows)])
+        
+        for embedding_file in legacy_files:
+            embedding_file.unlink(missing_ok=True)
+        
+        logger.info(f"Migrated {len(rows)} legacy embeddings into {self.vector_store.path}")
+        return len(rows)
+    
+    def search_memory(self, query: str, limit: int = 10, mode: str = "auto",
+                      query_vector: Optional[np.ndarray] = None,
+                      importance_weight: float = 0.0, recency_weight: float = 0.0,
+                      recency_half_life_days: float = 30.0) -> List[Dict[str, Any]]:
+        """Search memory entries by content similarity
+        
+        mode is "text" (LIKE scan), "semantic" (vector top-k, topped up with
+        text matches for entries without embeddings) or "auto", which uses
+        semantic search whenever a query vector is available.
+        """
+        if mode not in ("auto", "text", "semantic"):
+            raise ValueError(f"Unknown search mode: {mode}")
+        
+        if mode != "text" and query_vector is None and self.embedding_function is not None:
+            query_vector = self.embedding_function(query)
+        
+        if mode == "text" or query_vector is None:
+            if mode == "semantic":
+                logger.debug("No query vector available, falling back to text search")
+            return self._text_search_memory(query, limit)
+        
+        return self._semantic_search_memory(
+            query, np.asarray(query_vector), limit,
+            importance_weight, recency_weight, recency_half_life_days
+        )
+    
+    def _text_search_memory(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Substring search over content and tags"""
+        cursor = self.db.get_connection().execute('''
+            SELECT id, category, content, importance, tags, last_accessed, embedding_hash
             FROM memory_entries 
             WHERE content LIKE ? OR tags LIKE ?
             ORDER BY importance DESC, last_accessed DESC
             LIMIT ?
         ''', (f'%{query}%', f'%{query}%', limit))
         
+        return [self._search_row_to_dict(row, match='text') for row in cursor.fetchall()]
+    
+    def _search_row_to_dict(self, row: tuple, match: str, score: Optional[float] = None,
+                            similarity: Optional[float] = None) -> Dict[str, Any]:
+        """Shape a memory_entries search row into a result dict"""
+        result = {
+            'id': row[0],
+            'category': row[1],
+            'content': row[2],
+            'importance': row[3],
+            'tags': row[4],
+            'last_accessed': row[5],
+            'embedding_hash': row[6],
+            'match': match
+        }
+        if score is not None:
+            result['score'] = score
+            result['similarity'] = similarity
+        return result
+    
+    def _ensure_vector_index(self) -> MemoryVectorIndex:
+        """Build the vector index from embeddings referenced by memory entries"""
+        if self.vector_index is None:
+            index = MemoryVectorIndex(self.vector_store)
+            rows = self.db.get_connection().execute('''
+                SELECT DISTINCT e.content_hash, e.vector_row
+                FROM memory_entries m JOIN embeddings e ON e.content_hash = m.embedding_hash
+                WHERE e.vector_row IS NOT NULL
+            ''').fetchall()
+            index.upsert_many([row[0] for row in rows], [row[1] for row in rows])
+            self.vector_index = index
+            logger.info(f"Built memory vector index with {len(index)} embeddings")
+        return self.vector_index
+    
+    def _semantic_search_memory(self, query: str, query_vector: np.ndarray, limit: int,
+                                importance_weight: float, recency_weight: float,
+                                recency_half_life_days: float) -> List[Dict[str, Any]]:
+        """Vector top-k with optional importance/recency blending"""
+        index = self._ensure_vector_index()
+        
+        if len(index) and query_vector.size != index.dimension:
+            logger.warning(
+                f"Query vector dimension {query_vector.size} does not match stored embeddings "
+                f"({index.dimension}), falling back to text search"
+            )
+            return self._text_search_memory(query, limit)
+        
         results = []
-        for row in cursor.fetchall():
-            results.append({
-                'category': row[0],
-                'content': row[1],
-                'importance': row[2],
-                'tags': row[3],
-                'last_accessed': row[4]
-            })
+        if len(index):
+            # Over-fetch so blending can reorder candidates and duplicate
+            # contents sharing one hash do not crowd out the limit
+            candidates = dict(index.top_k(query_vector, limit * 4))
+            placeholders = ','.join('?' * len(candidates))
+            cursor = self.db.get_connection().execute(f'''
+                SELECT id, category, content, importance, tags, last_accessed, embedding_hash
+                FROM memory_entries
+                WHERE embedding_hash IN ({placeholders})
+            ''', list(candidates))
+            rows = cursor.fetchall()
+            
+            if rows:
+                similarity = np.array([candidates[row[6]] for row in rows], dtype=np.float32)
+                importance = np.array([row[3] or 0 for row in rows], dtype=np.float32) / 10.0
+                now = datetime.now()
+                age_days = np.array([
+                    (now - self._parse_timestamp(row[5], now)).total_seconds() / 86400.0
+                    for row in rows
+                ], dtype=np.float32)
+                recency = np.power(0.5, np.maximum(age_days, 0.0) / max(recency_half_life_days, 1e-6))
+                
+                similarity_weight = max(0.0, 1.0 - importance_weight - recency_weight)
+                scores = similarity_weight * similarity + importance_weight * importance + recency_weight * recency
+                
+                for i in np.argsort(-scores)[:limit]:
+                    results.append(self._search_row_to_dict(
+                        rows[i], match='semantic', score=float(scores[i]), similarity=float(similarity[i])
+                    ))
+        
+        # Entries without embeddings are only reachable through text search
+        if len(results) < limit:
+            seen = {result['id'] for result in results}
+            for result in self._text_search_memory(query, limit * 2):
+                if len(results) >= limit:
+                    break
+                if result['id'] in seen or result['embedding_hash'] in index:
+                    continue
+                results.append(result)
         
-        conn.close()
         return results
     
+    @staticmethod
+    def _parse_timestamp(value: Optional[str], default: datetime) -> datetime:
+        """Parse SQLite/ISO timestamps, falling back to default"""
+        if not value:
+            return default
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return default
+    
     def get_persona_config(self, name: str = "DEANNA") -> Dict[str, Any]:
         """Get persona configuration"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT config_data FROM persona_config WHERE name = ?', (name,))
-        result = cursor.fetchone()
-        
-        conn.close()
+        result = self.db.get_connection().execute(
+            'SELECT config_data FROM persona_config WHERE name = ?', (name,)
+        ).fetchone()
         
         if result:
             return json.loads(result[0])
@@ -519,50 +1027,50 @@ class DeannaMemoryManager:
     def log_access(self, memory_id: int, access_type: str, session_id: str = None, metadata: str = None):
     
         """Log memory access"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO access_logs (memory_id, access_type, session_id, metadata)
-            VALUES (?, ?, ?, ?)
-        ''', (memory_id, access_type, session_id, metadata))
-        
-        # Update access count and last accessed
-        cursor.execute('''
-            UPDATE memory_entries 
-            SET access_count = access_count + 1, last_accessed = ?
-            WHERE id = ?
-        ''', (datetime.now().isoformat(), memory_id))
-        
-        conn.commit()
-        conn.close()
+        self.log_access_bulk([{
+            'memory_id': memory_id,
+            'access_type': access_type,
+            'session_id': session_id,
+            'metadata': metadata
+        }])
+    
+    def log_access_bulk(self, accesses: List[Dict[str, Any]]) -> int:
+        """Log many memory accesses and bump access counts in one transaction"""
+        if not accesses:
+            return 0
+        
+        now = datetime.now().isoformat()
+        log_rows = [
+            (access['memory_id'], access['access_type'], access.get('session_id'), access.get('metadata'))
+            for access in accesses
+        ]
+        update_rows = [(now, access['memory_id']) for access in accesses]
+        
+        with self.db.transaction() as cursor:
+            cursor.executemany(INSERT_ACCESS_LOG_SQL, log_rows)
+            # Update access count and last accessed
+            cursor.executemany(UPDATE_MEMORY_ACCESS_SQL, update_rows)
+        
+        return len(log_rows)
     
     def get_memory_stats(self) -> Dict[str, Any]:
         """Get memory system statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self.db.get_connection()
         
         # Count memory entries
-        cursor.execute('SELECT COUNT(*) FROM memory_entries')
-        memory_count = cursor.fetchone()[0]
+        memory_count = conn.execute('SELECT COUNT(*) FROM memory_entries').fetchone()[0]
         
         # Count chat entries
-        cursor.execute('SELECT COUNT(*) FROM chat_history')
-        chat_count = cursor.fetchone()[0]
+        chat_count = conn.execute('SELECT COUNT(*) FROM chat_history').fetchone()[0]
         
         # Count cached responses
-        cursor.execute('SELECT COUNT(*) FROM deepseek_cache')
-        cache_count = cursor.fetchone()[0]
+        cache_count = conn.execute('SELECT COUNT(*) FROM deepseek_cache').fetchone()[0]
         
         # Count embeddings
-        cursor.execute('SELECT COUNT(*) FROM embeddings')
-        embedding_count = cursor.fetchone()[0]
+        embedding_count = conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
         
         # Get total cost
-        cursor.execute('SELECT SUM(cost) FROM deepseek_cache')
-        total_cost = cursor.fetchone()[0] or 0.0
-        
-        conn.close()
+        total_cost = conn.execute('SELECT SUM(cost) FROM deepseek_cache').fetchone()[0] or 0.0
         
         return {
             'memory_entries': memory_count,
@@ -570,7 +1078,9 @@ class DeannaMemoryManager:
             'cached_responses': cache_count,
             'embeddings': embedding_count,
             'total_cost': total_cost,
-            'embedding_cache_size': len(self.embedding_cache)
+            'embedding_cache_size': len(self.embedding_cache),
+            'embedding_cache': self.embedding_cache.get_statistics(),
+            'vector_index_size': len(self.vector_index) if self.vector_index is not None else 0
         }
     
     def cleanup_old_cache(self, days: int = 30):
@@ -578,37 +1088,31 @@ class DeannaMemoryManager:
         """Clean up old cache entries"""
         cutoff_date = datetime.now() - timedelta(days=days)
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Clean up old chat history
-        cursor.execute('''
-            DELETE FROM chat_history 
-            WHERE timestamp < ?
-        ''', (cutoff_date.isoformat(),))
-        
-        # Clean up old cache entries
-        cursor.execute('''
-            DELETE FROM deepseek_cache 
-            WHERE timestamp < ?
-        ''', (cutoff_date.isoformat(),))
-        
-        # Clean up old access logs
-        cursor.execute('''
-            DELETE FROM access_logs 
-            WHERE timestamp < ?
-        ''', (cutoff_date.isoformat(),))
-        
-        conn.commit()
-        conn.close()
+        with self.db.transaction() as cursor:
+            # Clean up old chat history
+            cursor.execute('''
+                DELETE FROM chat_history 
+                WHERE timestamp < ?
+            ''', (cutoff_date.isoformat(),))
+            
+            # Clean up old cache entries
+            cursor.execute('''
+                DELETE FROM deepseek_cache 
+                WHERE timestamp < ?
+            ''', (cutoff_date.isoformat(),))
+            
+            # Clean up old access logs
+            cursor.execute('''
+                DELETE FROM access_logs 
+                WHERE timestamp < ?
+            ''', (cutoff_date.isoformat(),))
         
         logger.info(f"Cleaned up cache entries older than {days} days")
     
     def export_memory_data(self, export_path: str):
     
         """Export all memory data to JSON"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self.db.get_connection()
         
         export_data = {
             'export_timestamp': datetime.now().isoformat(),
@@ -619,8 +1123,7 @@ class DeannaMemoryManager:
         }
         
         # Export memory entries
-        cursor.execute('SELECT * FROM memory_entries')
-        for row in cursor.fetchall():
+        for row in conn.execute('SELECT * FROM memory_entries'):
             export_data['memory_entries'].append({
                 'id': row[0],
                 'category': row[1],
@@ -635,8 +1138,7 @@ class DeannaMemoryManager:
             })
         
         # Export chat history
-        cursor.execute('SELECT * FROM chat_history')
-        for row in cursor.fetchall():
+        for row in conn.execute('SELECT * FROM chat_history'):
             export_data['chat_history'].append({
                 'id': row[0],
                 'session_id': row[1],
@@ -649,8 +1151,7 @@ class DeannaMemoryManager:
             })
         
         # Export persona configs
-        cursor.execute('SELECT * FROM persona_config')
-        for row in cursor.fetchall():
+        for row in conn.execute('SELECT * FROM persona_config'):
             export_data['persona_configs'].append({
                 'id': row[0],
                 'name': row[1],
@@ -660,13 +1161,15 @@ class DeannaMemoryManager:
                 'updated_at': row[5]
             })
         
-        conn.close()
-        
         # Save to file
         with open(export_path, 'w', encoding='utf-8') as f:
             json.dump(export_data, f, indent=2)
         
         logger.info(f"Exported memory data to {export_path}")
+    
+    def close(self):
+        """Close all database connections"""
+        self.db.close_all()
 
 # Global instance
 memory_manager = DeannaMemoryManager()
@@ -15,6 +15,7 @@ import asyncio
 import logging
 import sys
 import os
+import signal
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
@@ -53,7 +54,10 @@ from tools.unified_agent_system import UnifiedAgentSystem
 from tools.simple_embedding_tool import SimpleEmbeddingTool
 from tools.qwen_embedding_tool import QwenEmbeddingTool
 from tools.sql_database_tool import SQLDatabaseTool
-from tools.llm_query_tool import LLMQueryTool
+from tools.sqlite_connection_pool import close_all_pools
+from tools.deepseek_client import close_deepseek_clients
+from tools.request_scheduler import RequestPriority, request_context
+from tools.llm_query_tool import LLMQueryTool, StreamMetrics
 from tools.fim_completion_tool import FIMCompletionTool
 from tools.prefix_completion_tool import PrefixCompletionTool
 from tools.rag_pipeline_tool import RAGPipelineTool
@@ -305,30 +309,81 @@ Setup & Configuration:
         panel = Panel(help_text, title="Enhanced BASED GOD CLI Help", border_style="green")
         self.console.print(panel)
     
-    async def handle_chat(self, message: str):
-        """Handle chat interactions"""
+    async def handle_chat(self, message: str) -> Optional[str]:
+        """Handle chat interactions; streamed answers are rendered live and return None"""
         if not self.is_initialized:
             return "❌ System not initialized. Please run /setup first."
         
         try:
-            # Use unified agent for chat
-            if self.unified_agent:
+            # Interactive turns jump ahead of background DeepSeek work
+            with request_context(RequestPriority.INTERACTIVE, "chat"):
+                if self.llm_tool:
+                    await self.stream_chat_live(message)
+                    return None
+                
+                # Non-streaming fallback through the unified agent
                 response = await self.unified_agent.execute(
                     operation="conversation",
-                    user_message=message
-                )
-                return response.data.get("response", "No response generated")
-            else:
-                # Fallback to LLM tool
-                response = await self.llm_tool.execute(
-                    operation="chat_completion",
-                    messages=[{"role": "user", "content": message}]
+                    message=message
                 )
-                return response.data.get("content", "No response generated")
+            return response.data.get("response", "No response generated")
         except Exception as e:
             logger.error(f"Chat error: {e}")
             return f"❌ Error: {str(e)}"
     
+    async def stream_chat_live(self, message: str) -> StreamMetrics:
+        """Render streamed deltas as they arrive; Ctrl+C stops the answer, not the CLI"""
+        metrics = StreamMetrics()
+        text = Text()
+        
+        async def render():
+            stream = self.llm_tool.stream_chat(message, metrics=metrics)
+            try:
+                with Live(Panel(text, title="🤖 DeepSeek", border_style="cyan"),
+                          console=self.console, refresh_per_second=20) as live:
+                    async for delta in stream:
+                        text.append(delta)
+                        live.update(Panel(text, title="🤖 DeepSeek", border_style="cyan"))
+            finally:
+                await stream.aclose()
+        
+        # While the answer streams, SIGINT cancels only this task; the previous
+        # handler (KeyboardInterrupt or asyncio.Runner's) is restored afterwards
+        loop = asyncio.get_running_loop()
+        task = asyncio.ensure_future(render())
+        interrupted = False
+        
+        def on_sigint():
+            nonlocal interrupted
+            interrupted = True
+            task.cancel()
+        
+        previous_handler = signal.getsignal(signal.SIGINT)
+        try:
+            loop.add_signal_handler(signal.SIGINT, on_sigint)
+            handler_installed = True
+        except (NotImplementedError, RuntimeError):
+            # Windows event loops and non-main threads cannot take signal handlers
+            handler_installed = False
+        
+        try:
+            await task
+        except asyncio.CancelledError:
+            if not interrupted:
+                raise
+            metrics.cancelled = True
+        finally:
+            if handler_installed:
+                loop.remove_signal_handler(signal.SIGINT)
+                signal.signal(signal.SIGINT, previous_handler)
+        
+        ttft = f"{metrics.ttft_ms:.0f} ms" if metrics.ttft_ms is not None else "n/a"
+        summary = f"TTFT {ttft} · {metrics.tokens} tokens · {metrics.tokens_per_second:.1f} tok/s"
+        if metrics.cancelled:
+            summary += " · cancelled"
+        self.console.print(f"[dim]{summary}[/dim]")
+        return metrics
+    
     async def handle_tools(self):
         """Display all available tools from the unified manager."""
         if not self.tool_manager:
@@ -526,7 +581,8 @@ Setup & Configuration:
                         self.show_status()
                     elif command == 'chat':
                         response = await self.handle_chat(args)
-                        self.console.print(f"🤖 {response}")
+                        if response:
+                            self.console.print(f"🤖 {response}")
                     elif command == 'tools':
                         response = await self.handle_tools()
                         self.console.print(response)
@@ -590,7 +646,8 @@ Setup & Configuration:
                 else:
                     # Treat as chat message
                     response = await self.handle_chat(user_input)
-                    self.console.print(f"🤖 {response}")
+                    if response:
+                        self.console.print(f"🤖 {response}")
                     
             except KeyboardInterrupt:
                 self.console.print("\n👋 Goodbye!")
@@ -598,6 +655,15 @@ Setup & Configuration:
             except Exception as e:
                 logger.error(f"Interactive mode error: {e}")
                 self.console.print(f"❌ Error: {str(e)}")
+        
+        await self.shutdown()
+    
+    async def shutdown(self):
+        """Flush buffered state and release background resources"""
+        if self.json_memory_tool:
+            await self.json_memory_tool.close()
+        await close_all_pools()
+        await close_deepseek_clients()
 
 async def main():
     """Main entry point"""
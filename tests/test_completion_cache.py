@@ -0,0 +1,148 @@
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.completion_cache import CompletionCache
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.fim_completion_tool import FIMCompletionTool
+from tools.prefix_completion_tool import PrefixCompletionTool
+
+
+def test_key_normalizes_whitespace_and_windows():
+    cache = CompletionCache(prefix_window=24)
+    cache.store(
+        "import os  \r\ndef main():\n    x = ", "\n\n", "python", "deepseek-coder", "1"
+    )
+
+    assert cache.lookup(
+        "import os\ndef main():\n    x = ", "", "python", "deepseek-coder"
+    ) == ("1", "exact")
+    assert (
+        cache.lookup(
+            "# unrelated header that falls outside the window\nimport os\ndef main():\n    x = ",
+            "",
+            "python",
+            "deepseek-coder",
+        )
+        is not None
+    )
+    assert (
+        cache.lookup("import os\ndef main():\n    x =", "", "python", "deepseek-coder")
+        is None
+    )
+    assert (
+        cache.lookup(
+            "import os\ndef main():\n    x = ", "", "javascript", "deepseek-coder"
+        )
+        is None
+    )
+
+
+def test_typed_prefix_of_cached_completion_serves_the_rest():
+    cache = CompletionCache()
+    cache.store("total = ", "", "python", "m", "sum(items)")
+
+    assert cache.lookup("total = su", "", "python", "m") == ("m(items)", "extension")
+    assert cache.lookup("total = sx", "", "python", "m") is None
+    assert cache.lookup("total = sum(items)", "", "python", "m") is None
+
+    stats = cache.get_statistics()
+    assert (stats["hits"], stats["extension_hits"], stats["misses"]) == (0, 1, 2)
+    assert stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_lru_eviction():
+    cache = CompletionCache(max_entries=2)
+    cache.store("a = ", "", "python", "m", "1")
+    cache.store("b = ", "", "python", "m", "2")
+    assert cache.lookup("a = ", "", "python", "m")
+    cache.store("c = ", "", "python", "m", "3")
+
+    assert cache.lookup("b = ", "", "python", "m") is None
+    assert cache.lookup("a = ", "", "python", "m") == ("1", "exact")
+    assert cache.get_statistics()["evictions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_tools_hit_the_api_once_per_cursor_context():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        calls.append(request.url.path)
+        if "messages" in body:
+            return httpx.Response(
+                200,
+                json={
+                    "id": "c",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": body["model"],
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": " upon a time"},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": {
+                        "prompt_tokens": 5,
+                        "completion_tokens": 3,
+                        "total_tokens": 8,
+                    },
+                },
+            )
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "text_completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "text": "sum(items)",
+                        "finish_reason": "stop",
+                        "logprobs": None,
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 5,
+                    "completion_tokens": 3,
+                    "total_tokens": 8,
+                },
+            },
+        )
+
+    registry = DeepSeekClientRegistry(transport=httpx.MockTransport(handler))
+    client = registry.get_client("sk-test", "http://mock/beta").with_options(
+        max_retries=0
+    )
+    fim, prefix_tool = FIMCompletionTool(), PrefixCompletionTool()
+    fim.client = prefix_tool.client = client
+
+    first = await fim.execute(prefix="total = ", suffix="\nprint(total)")
+    typed = await fim.execute(prefix="total = su", suffix="\nprint(total)")
+    assert first.data["completion"] == "sum(items)"
+    assert (
+        typed.data["completion"] == "m(items)"
+        and typed.metadata["cache_hit"] == "extension"
+    )
+    await fim.execute(prefix="total = ", suffix="\nprint(total)", use_cache=False)
+    assert fim.get_cache_statistics()["extension_hits"] == 1
+
+    await prefix_tool.execute(prefix="Once", mode="text")
+    again = await prefix_tool.execute(prefix="Once", mode="text")
+    assert (
+        again.data["completion"] == " upon a time"
+        and again.metadata["cache_hit"] == "exact"
+    )
+
+    assert calls == ["/beta/completions", "/beta/completions", "/beta/chat/completions"]
+    await registry.close()
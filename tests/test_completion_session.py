@@ -0,0 +1,129 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.completion_session import LocalCompletionModel
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.fim_completion_tool import FIMCompletionTool
+from tools.latency_stats import percentile
+
+SOURCE = "def compute_total(items):\n    return sum(items)\n\ndef compute_mean(items):\n    return sum(items) / len(items)\n"
+
+
+def test_local_model_completes_identifiers_and_lines(tmp_path):
+    (tmp_path / "stats.py").write_text(SOURCE)
+    (tmp_path / "notes.txt").write_text("not code")
+    model = LocalCompletionModel()
+    assert model.index_paths([str(tmp_path)]) == 1
+
+    assert model.suggest("    return su").startswith("m(items)")
+    assert model.complete_word("compute_") in ("compute_total", "compute_mean")
+    assert model.suggest("zzz") == ""
+
+
+def test_percentile_interpolates():
+    assert percentile([], 50) == 0.0
+    assert percentile([10, 20, 30, 40], 50) == 25
+    assert percentile(range(1, 101), 99) == pytest.approx(99.01)
+
+
+def _fim_tool(delay: float):
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["prompt"]
+        calls.append(prompt)
+        await asyncio.sleep(delay)
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "text_completion",
+                "created": 0,
+                "model": "deepseek-coder",
+                "choices": [
+                    {
+                        "index": 0,
+                        "text": "m(items)  # remote",
+                        "finish_reason": "stop",
+                        "logprobs": None,
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 5,
+                    "completion_tokens": 4,
+                    "total_tokens": 9,
+                },
+            },
+        )
+
+    registry = DeepSeekClientRegistry(transport=httpx.MockTransport(handler))
+    tool = FIMCompletionTool()
+    tool.client = registry.get_client("sk-test", "http://mock/beta").with_options(
+        max_retries=0
+    )
+    tool.local_model.learn(SOURCE)
+    return tool, calls, registry
+
+
+@pytest.mark.asyncio
+async def test_session_debounces_and_replaces_local_with_remote():
+    tool, calls, registry = _fim_tool(delay=0.01)
+    served = []
+    session = tool.create_session(debounce=0.05, on_suggestion=served.append)
+
+    for prefix in ("    return s", "    return su"):
+        local = session.update(prefix)
+        assert local.source == "local"
+        await asyncio.sleep(0.005)
+    assert local.text.startswith("m(items)")
+
+    remote = await session.result()
+    assert remote.source == "remote" and remote.text == "m(items)  # remote"
+    assert remote.generation == 2
+    assert served == [remote]
+    assert len(calls) == 1 and calls[0].endswith("<PRE>    return su<MID><SUF>")
+    assert session.get_stats()["debounced"] == 1
+
+    latency = tool.get_latency_stats()
+    assert latency["local"]["count"] == 2
+    assert latency["remote"]["count"] == 1
+    assert latency["session"]["p50_ms"] >= 50
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_keystroke_cancels_in_flight_request():
+    tool, calls, registry = _fim_tool(delay=0.5)
+    session = tool.create_session(debounce=0.01)
+
+    session.update("    return s")
+    await asyncio.sleep(0.1)
+    session.update("    return su")
+    remote = await asyncio.wait_for(session.result(), timeout=5)
+
+    assert remote.generation == 2
+    assert len(calls) == 2
+    assert session.get_stats()["cancelled_in_flight"] == 1
+    assert registry.get_metrics()["in_flight"] == 0
+
+    session.accept(remote.text, prefix="    return su")
+    assert session.get_stats()["accepted"] == 1
+    await session.close()
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_local_mode_skips_the_network():
+    tool, calls, registry = _fim_tool(delay=0)
+    response = await tool.execute(prefix="    return su", mode="local")
+    assert response.success and response.data["source"] == "local"
+    assert response.data["completion"].startswith("m(items)")
+    assert calls == []
+    await registry.close()
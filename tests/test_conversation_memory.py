@@ -0,0 +1,144 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.conversation_memory import ConversationMemory
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.llm_query_tool import LLMQueryTool
+
+
+def _turn(i: int):
+    return [
+        HumanMessage(content=f"question {i} " + "word " * 40),
+        AIMessage(content=f"answer {i} " + "word " * 40),
+    ]
+
+
+def test_history_stays_within_budget_and_keeps_pins():
+    memory = ConversationMemory(token_budget=300, summary_budget=60)
+    memory.pin("persona", SystemMessage(content="You are Deanna, a warm assistant."))
+
+    for i in range(50):
+        memory.extend(_turn(i))
+        assert memory.token_count <= memory.token_budget
+
+    messages = memory.messages()
+    assert messages[0].content == "You are Deanna, a warm assistant."
+    assert messages[-1].content.startswith("answer 49")
+    # Without an event loop the evicted turns fold into an extract summary
+    assert messages[1].content.startswith("Summary of the earlier conversation")
+    assert "answer 48" not in messages[1].content
+    assert memory.get_stats()["evicted_messages"] == 100 - len(memory.turns)
+
+
+@pytest.mark.asyncio
+async def test_evicted_turns_are_summarized_in_the_background():
+    calls = []
+    release = asyncio.Event()
+
+    async def summarizer(summary, messages):
+        calls.append(len(messages))
+        await release.wait()
+        return f"{summary} +{len(messages)}".strip()
+
+    memory = ConversationMemory(
+        token_budget=300, summary_budget=60, summarizer=summarizer
+    )
+    for i in range(6):
+        memory.extend(_turn(i))
+
+    # Appending never waits on the summarizer
+    assert memory.summary == ""
+    assert memory.get_stats()["pending_summary"] > 0
+
+    release.set()
+    await memory.wait_for_summary()
+    assert sum(calls) == memory.get_stats()["evicted_messages"]
+    assert memory.summary.startswith("+")
+    assert memory.token_count <= memory.token_budget
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_falls_back_to_an_extract():
+    async def summarizer(summary, messages):
+        raise RuntimeError("model down")
+
+    memory = ConversationMemory(
+        token_budget=300, summary_budget=60, summarizer=summarizer
+    )
+    for i in range(6):
+        memory.extend(_turn(i))
+    await memory.wait_for_summary()
+
+    assert memory.stats["summary_failures"] >= 1
+    assert "question" in memory.summary or "answer" in memory.summary
+    assert memory.get_stats()["pending_summary"] == 0
+
+
+@pytest.mark.asyncio
+async def test_llm_tool_sends_bounded_history():
+    sent = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        sent.append(body["messages"])
+        content = (
+            "rolling summary"
+            if "running summary" in body["messages"][-1]["content"]
+            else "ok " * 30
+        )
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": "stop",
+                    }
+                ],
+            },
+        )
+
+    registry = DeepSeekClientRegistry(transport=httpx.MockTransport(handler))
+    tool = LLMQueryTool(
+        api_key="sk-test", base_url="http://mock/v1", history_token_budget=400
+    )
+    tool.openai_client = registry.get_client("sk-test", "http://mock/v1").with_options(
+        max_retries=0
+    )
+    tool.pin_message("persona", "You are Deanna.")
+
+    for i in range(8):
+        response = await tool.execute(
+            mode="stream", prompt=f"turn {i} " + "word " * 30, use_history=True
+        )
+        assert response.success
+        await tool.history.wait_for_summary()
+
+    chat_requests = [
+        messages
+        for messages in sent
+        if "running summary" not in messages[-1]["content"]
+    ]
+    last = chat_requests[-1]
+    assert last[0] == {"role": "system", "content": "You are Deanna."}
+    assert last[1] == {
+        "role": "system",
+        "content": "Summary of the earlier conversation:\nrolling summary",
+    }
+    history_tokens = sum(tool.token_counter.count(m["content"]) + 4 for m in last[:-1])
+    assert history_tokens <= 400
+    assert tool.get_history_stats()["summaries"] >= 1
+    await registry.close()
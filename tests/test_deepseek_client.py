@@ -0,0 +1,126 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.deepseek_client import DeepSeekClientRegistry
+
+
+def _completion(model: str) -> dict:
+    return {
+        "id": "cmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    }
+
+
+@pytest.mark.asyncio
+async def test_clients_share_pool_and_respect_concurrency_caps():
+    active = {"now": 0, "peak": 0, "coder_now": 0, "coder_peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        if model == "deepseek-coder":
+            active["coder_now"] += 1
+            active["coder_peak"] = max(active["coder_peak"], active["coder_now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if model == "deepseek-coder":
+            active["coder_now"] -= 1
+        return httpx.Response(200, json=_completion(model))
+
+    registry = DeepSeekClientRegistry(
+        max_concurrency=3,
+        model_concurrency={"deepseek-coder": 1},
+        transport=httpx.MockTransport(handler),
+    )
+    chat = registry.get_client("sk-test", "https://api.deepseek.com/v1")
+    beta = registry.get_client("sk-test", "https://api.deepseek.com/beta")
+    assert registry.get_client("sk-test", "https://api.deepseek.com/v1/") is chat
+    assert chat._client is beta._client is registry.http_client
+
+    async def call(client, model):
+        response = await client.chat.completions.create(
+            model=model, messages=[{"role": "user", "content": "hi"}]
+        )
+        return response.choices[0].message.content
+
+    # More requests than the caps allow; a leaked slot would hang here
+    results = await asyncio.wait_for(
+        asyncio.gather(
+            *[call(chat, "deepseek-chat") for _ in range(6)],
+            *[call(beta, "deepseek-coder") for _ in range(3)]
+        ),
+        timeout=10,
+    )
+    assert results == ["ok"] * 9
+    assert active["peak"] <= 3
+    assert active["coder_peak"] == 1
+
+    metrics = registry.get_metrics()
+    assert metrics["requests"] == 9
+    assert metrics["requests_by_model"] == {"deepseek-chat": 6, "deepseek-coder": 3}
+    assert metrics["in_flight"] == 0
+    assert metrics["peak_in_flight"] == 3
+    assert metrics["queued_requests"] > 0
+    assert metrics["clients"] == 2
+
+    await registry.close()
+
+
+class _Body(httpx.AsyncByteStream):
+    """Unread body, so the slot is held until the client consumes it"""
+
+    def __init__(self, content: bytes):
+        self._content = content
+
+    async def __aiter__(self):
+        yield self._content
+
+
+@pytest.mark.asyncio
+async def test_streamed_bodies_release_slots_when_closed():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.dumps(_completion("deepseek-chat")).encode()
+        return httpx.Response(
+            200, headers={"content-type": "application/json"}, stream=_Body(body)
+        )
+
+    registry = DeepSeekClientRegistry(
+        max_concurrency=2, transport=httpx.MockTransport(handler)
+    )
+    client = registry.get_client("sk-test", "https://api.deepseek.com/v1")
+
+    async def call():
+        response = await client.chat.completions.create(
+            model="deepseek-chat", messages=[{"role": "user", "content": "hi"}]
+        )
+        return response.choices[0].message.content
+
+    results = await asyncio.wait_for(
+        asyncio.gather(*[call() for _ in range(5)]), timeout=10
+    )
+    assert results == ["ok"] * 5
+
+    metrics = registry.get_metrics()
+    assert metrics["requests"] == 5
+    assert metrics["in_flight"] == 0
+    assert metrics["peak_in_flight"] <= 2
+
+    await registry.close()
@@ -0,0 +1,122 @@
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.base_tool import ToolResponse
+from tools.ingestion_pipeline import DocumentChunker, IngestionPipeline
+from tools.sql_database_tool import SQLDatabaseTool
+
+DOCUMENT = (
+    """# Guide
+
+Intro paragraph about the project.
+
+## Install
+
+"""
+    + " ".join(f"step{i}" for i in range(300))
+    + """
+
+```python
+def main():
+    return 42
+```
+
+## Usage
+
+Run the command.
+"""
+)
+
+
+class RecordingVectorStore:
+    """Minimal stand-in exposing the VectorDatabaseTool store/delete interface"""
+
+    client = object()
+
+    def __init__(self):
+        self.points = {}
+        self.store_calls = 0
+
+    async def execute(self, **kwargs):
+        if kwargs["operation"] == "store":
+            self.store_calls += 1
+            for point_id, text in zip(kwargs["ids"], kwargs["texts"]):
+                self.points[point_id] = text
+            return ToolResponse(
+                success=True, message="stored", data={"ids": kwargs["ids"]}
+            )
+        for point_id in kwargs["ids"]:
+            self.points.pop(point_id, None)
+        return ToolResponse(success=True, message="deleted")
+
+
+@pytest_asyncio.fixture
+async def sql_tool(tmp_path):
+    tool = SQLDatabaseTool(str(tmp_path / "ingest.db"))
+    await tool._initialize_database()
+    yield tool
+    await tool.pool.close()
+
+
+def test_chunker_respects_structure_and_budget():
+    chunker = DocumentChunker(max_tokens=120, overlap_tokens=20)
+    chunks = chunker.chunk(DOCUMENT, source="guide.md")
+
+    assert all(chunk.token_count <= 120 for chunk in chunks)
+    assert chunks[0].heading == "Guide"
+    install = [c for c in chunks if c.heading == "Guide > Install"]
+    assert len(install) >= 3
+    # Overlap: each follow-on prose chunk starts with the previous chunk's tail
+    assert install[1].text.split("\n\n", 1)[1].split()[0] in install[0].text
+    code = [c for c in chunks if "def main" in c.text]
+    assert len(code) == 1 and "return 42" in code[0].text
+    assert chunks[-1].heading == "Guide > Usage"
+
+
+@pytest.mark.asyncio
+async def test_ingestion_is_batched_and_resumable(tmp_path, sql_tool):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    for i in range(5):
+        (docs / f"doc{i}.md").write_text(DOCUMENT.replace("project", f"project {i}"))
+    (docs / "image.png").write_bytes(b"\x89PNG")
+
+    vectors = RecordingVectorStore()
+    pipeline = IngestionPipeline(
+        vector_tool=vectors,
+        sql_tool=sql_tool,
+        chunker=DocumentChunker(max_tokens=120, overlap_tokens=20),
+        batch_size=8,
+        max_pending_batches=1,
+        manifest_path=str(tmp_path / "manifest.json"),
+    )
+
+    first = await pipeline.ingest_paths([str(docs)])
+    assert first["files_seen"] == 5
+    assert first["documents"] == 5
+    assert vectors.store_calls == first["batches"] < first["chunks"]
+    assert len(vectors.points) == first["chunks"]
+
+    second = await pipeline.ingest_paths([str(docs)])
+    assert second["files_skipped"] == 5
+    assert second["chunks"] == 0
+
+    (docs / "doc0.md").write_text(
+        "# Short\n\nThis document was rewritten and is much shorter than before."
+    )
+    third = await pipeline.ingest_paths([str(docs)])
+    assert third["documents"] == 1
+
+    rows = await sql_tool.execute(
+        operation="execute_query", query="SELECT COUNT(*) AS n FROM memory"
+    )
+    per_doc = len(first["memory_ids"]) // 5
+    assert rows.data["results"][0]["n"] == per_doc * 4 + len(third["memory_ids"])
+    assert (
+        len(vectors.points) == first["chunks"] - first["chunks"] // 5 + third["chunks"]
+    )
@@ -0,0 +1,146 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.json_memory_tool import JSONMemoryTool
+
+
+def _stored_entries(memory_file: Path) -> dict:
+    with open(memory_file, "r", encoding="utf-8") as f:
+        return json.load(f)["entries"]
+
+
+@pytest.mark.asyncio
+async def test_writes_are_coalesced_until_flush(tmp_path):
+    memory_file = tmp_path / "memory.json"
+    tool = JSONMemoryTool(
+        memory_file=str(memory_file),
+        auto_backup=False,
+        flush_interval=60,
+        flush_threshold=100,
+    )
+
+    for i in range(10):
+        response = await tool.store(f"note {i}")
+        assert response.success
+
+    assert _stored_entries(memory_file) == {}
+    assert tool.get_persistence_stats()["pending_writes"] == 10
+
+    assert tool.flush()
+    stats = tool.get_persistence_stats()
+    assert stats["flushes"] == 1
+    assert stats["writes_coalesced"] == 10
+    assert stats["pending_writes"] == 0
+    assert len(_stored_entries(memory_file)) == 10
+
+    await tool.close()
+
+
+@pytest.mark.asyncio
+async def test_threshold_triggers_flush(tmp_path):
+    memory_file = tmp_path / "memory.json"
+    tool = JSONMemoryTool(
+        memory_file=str(memory_file),
+        auto_backup=False,
+        flush_interval=60,
+        flush_threshold=3,
+    )
+
+    for i in range(3):
+        await tool.store(f"note {i}")
+
+    assert len(_stored_entries(memory_file)) == 3
+    assert tool.get_persistence_stats()["last_flush_writes"] == 3
+
+    await tool.close()
+
+
+@pytest.mark.asyncio
+async def test_async_context_manager_flushes_on_exit(tmp_path):
+    memory_file = tmp_path / "memory.json"
+    async with JSONMemoryTool(
+        memory_file=str(memory_file),
+        auto_backup=False,
+        flush_interval=60,
+        flush_threshold=100,
+    ) as tool:
+        response = await tool.store("remember me")
+        await tool.retrieve(response.data["entry_id"])
+
+    entries = _stored_entries(memory_file)
+    assert len(entries) == 1
+    assert next(iter(entries.values()))["access_count"] == 1
+    assert tool.get_persistence_stats()["writes_coalesced"] == 2
+
+
+@pytest.mark.asyncio
+async def test_auto_backup_fires_on_flush_after_interval(tmp_path):
+    memory_file = tmp_path / "memory.json"
+    tool = JSONMemoryTool(
+        memory_file=str(memory_file),
+        auto_backup=True,
+        backup_interval=5,
+        flush_interval=60,
+        flush_threshold=3,
+    )
+
+    for i in range(7):
+        await tool.store(f"note {i}")
+
+    # Flushes ran at 3 and 6 entries; only the second crossed the interval
+    backups = sorted(tmp_path.glob("memory.backup_*.json"))
+    assert len(backups) == 1
+    assert tool.get_persistence_stats()["backups"] == 1
+    with open(backups[0], "r", encoding="utf-8") as f:
+        assert len(json.load(f)["entries"]) == 6
+
+    await tool.close()
+
+
+@pytest.mark.asyncio
+async def test_manual_backup_includes_pending_writes(tmp_path):
+    memory_file = tmp_path / "memory.json"
+    tool = JSONMemoryTool(
+        memory_file=str(memory_file),
+        auto_backup=False,
+        flush_interval=60,
+        flush_threshold=100,
+    )
+
+    for i in range(4):
+        await tool.store(f"note {i}")
+
+    response = await tool.execute(operation="backup")
+    assert response.success
+
+    backups = list(tmp_path.glob("memory.backup_*.json"))
+    assert len(backups) == 1
+    with open(backups[0], "r", encoding="utf-8") as f:
+        assert len(json.load(f)["entries"]) == 4
+
+    await tool.close()
+
+
+@pytest.mark.asyncio
+async def test_manual_backup_fails_when_flush_fails(tmp_path, monkeypatch):
+    memory_file = tmp_path / "memory.json"
+    tool = JSONMemoryTool(
+        memory_file=str(memory_file),
+        auto_backup=False,
+        flush_interval=60,
+        flush_threshold=100,
+    )
+    await tool.store("unsaved note")
+    monkeypatch.setattr(tool, "_save_memory", lambda: False)
+
+    response = await tool.execute(operation="backup")
+    assert not response.success
+    assert list(tmp_path.glob("memory.backup_*.json")) == []
+
+    monkeypatch.undo()
+    await tool.close()
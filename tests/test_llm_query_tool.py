@@ -0,0 +1,184 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+import pytest_asyncio
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.llm_query_tool import LLMQueryTool, StreamMetrics
+
+
+class _SSEBody(httpx.AsyncByteStream):
+    """Server-sent chat chunks with a delay between them"""
+
+    def __init__(self, deltas, delay: float = 0.0, usage=None):
+        self.deltas = deltas
+        self.delay = delay
+        self.usage = usage
+
+    async def __aiter__(self):
+        for delta in self.deltas:
+            await asyncio.sleep(self.delay)
+            chunk = {
+                "id": "c",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "deepseek-chat",
+                "choices": [
+                    {"index": 0, "delta": {"content": delta}, "finish_reason": None}
+                ],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        if self.usage:
+            chunk = {
+                "id": "c",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "deepseek-chat",
+                "choices": [],
+                "usage": self.usage,
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+
+@pytest_asyncio.fixture
+async def llm_tool():
+    registries = []
+
+    def build(handler) -> LLMQueryTool:
+        registry = DeepSeekClientRegistry(transport=httpx.MockTransport(handler))
+        registries.append(registry)
+        tool = LLMQueryTool(api_key="sk-test", base_url="http://mock/v1")
+        tool.openai_client = registry.get_client("sk-test", "http://mock/v1")
+        return tool
+
+    yield build
+    for registry in registries:
+        await registry.close()
+
+
+def _stream_response(body: _SSEBody) -> httpx.Response:
+    return httpx.Response(
+        200, headers={"content-type": "text/event-stream"}, stream=body
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_chat_yields_deltas_incrementally(llm_tool):
+    usage = {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}
+    tool = llm_tool(
+        lambda request: _stream_response(
+            _SSEBody(["Hel", "lo", "!"], delay=0.01, usage=usage)
+        )
+    )
+
+    metrics = StreamMetrics()
+    deltas = [delta async for delta in tool.stream_chat("hi", metrics=metrics)]
+
+    assert deltas == ["Hel", "lo", "!"]
+    assert metrics.chunks == 3
+    assert metrics.tokens == 3
+    assert metrics.prompt_tokens == 7
+    assert metrics.ttft_ms is not None and metrics.ttft_ms > 0
+    assert metrics.tokens_per_second > 0
+    assert not metrics.cancelled
+    assert [m.content for m in tool.conversation_history] == ["hi", "Hello!"]
+
+
+@pytest.mark.asyncio
+async def test_closing_the_stream_cancels_it(llm_tool):
+    tool = llm_tool(lambda request: _stream_response(_SSEBody(["a"] * 50, delay=0.01)))
+
+    metrics = StreamMetrics()
+    stream = tool.stream_chat("hi", metrics=metrics)
+    first = await stream.__anext__()
+    await stream.aclose()
+
+    assert first == "a"
+    assert metrics.cancelled
+    assert metrics.chunks == 1
+    assert tool.conversation_history == []
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_mode_reports_metrics(llm_tool):
+    tool = llm_tool(lambda request: _stream_response(_SSEBody(["one ", "two"])))
+
+    response = await tool.execute(mode="stream", prompt="count")
+
+    assert response.success
+    assert response.data["response"] == "one two"
+    assert response.data["metrics"]["chunks"] == 2
+    assert tool.conversation_history == []
+
+
+@pytest.mark.asyncio
+async def test_batch_complete_dedupes_and_keeps_order(llm_tool):
+    active = {"now": 0, "peak": 0, "requests": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        prompt = json.loads(request.content)["messages"][-1]["content"]
+        active["requests"] += 1
+        active["now"] += 1
+        active["peak"] = max(active["peak"], active["now"])
+        await asyncio.sleep(0.01)
+        active["now"] -= 1
+        if prompt == "bad":
+            return httpx.Response(400, json={"error": {"message": "invalid prompt"}})
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "deepseek-chat",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": prompt.upper()},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 1,
+                    "completion_tokens": 1,
+                    "total_tokens": 2,
+                },
+            },
+        )
+
+    tool = llm_tool(handler)
+    tool.openai_client = tool.openai_client.with_options(max_retries=0)
+    seen = []
+
+    async def on_result(result):
+        seen.append(result["index"])
+
+    prompts = [f"file {i}" for i in range(10)] + ["file 3", "bad"]
+    response = await tool.execute(
+        mode="batch", prompts=prompts, max_concurrency=3, on_result=on_result
+    )
+
+    assert response.success
+    results = response.data["results"]
+    assert [r["index"] for r in results] == list(range(12))
+    assert [r["response"] for r in results[:10]] == [f"FILE {i}" for i in range(10)]
+    assert results[10]["response"] == "FILE 3" and results[10]["deduplicated"]
+    assert not results[11]["success"] and "invalid prompt" in results[11]["error"]
+    assert sorted(seen) == list(range(12))
+
+    stats = response.data["stats"]
+    assert (
+        stats["unique_prompts"] == 11
+        and stats["deduplicated"] == 1
+        and stats["failed"] == 1
+    )
+    assert active["requests"] == 11
+    assert active["peak"] == 3
+    assert tool.conversation_history == []
@@ -0,0 +1,322 @@
+import hashlib
+import importlib
+import json
+import os
+import pickle
+import sqlite3
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture(scope="module")
+def memory_module(tmp_path_factory):
+    # Importing memory_manager builds a global manager and log file under ./data
+    workdir = tmp_path_factory.mktemp("memory_cwd")
+    (workdir / "data").mkdir()
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        return importlib.import_module("data.memory_manager")
+    finally:
+        os.chdir(previous)
+
+
+@pytest.fixture
+def manager(memory_module, tmp_path):
+    manager = memory_module.DeannaMemoryManager(data_dir=str(tmp_path / "memory_data"))
+    yield manager
+    manager.close()
+
+
+def test_store_memory_entries_bulk(manager):
+    entries = [
+        {
+            "category": "facts",
+            "content": f"fact number {i}",
+            "importance": i,
+            "tags": "bulk",
+        }
+        for i in range(5)
+    ]
+    assert manager.store_memory_entries_bulk(entries) == 5
+    assert manager.store_memory_entries_bulk([]) == 0
+
+    rows = (
+        manager.db.get_connection()
+        .execute(
+            "SELECT category, content, embedding_hash, importance, tags FROM memory_entries ORDER BY importance"
+        )
+        .fetchall()
+    )
+    assert len(rows) == 5
+    assert rows[3] == (
+        "facts",
+        "fact number 3",
+        hashlib.md5(b"fact number 3").hexdigest(),
+        3,
+        "bulk",
+    )
+
+
+def test_store_chat_history_bulk_appends_per_session_files(manager):
+    records = [
+        {"session_id": "alpha", "user_input": "hi", "deanna_response": "hello"},
+        {
+            "session_id": "beta",
+            "user_input": "yo",
+            "deanna_response": "hey",
+            "emotion_score": 0.5,
+        },
+        {"session_id": "alpha", "user_input": "bye", "deanna_response": "later"},
+    ]
+    assert manager.store_chat_history_bulk(records) == 3
+    manager.store_chat_history("alpha", "again", "welcome back")
+
+    count = (
+        manager.db.get_connection()
+        .execute("SELECT COUNT(*) FROM chat_history")
+        .fetchone()[0]
+    )
+    assert count == 4
+
+    alpha = (manager.chats_dir / "alpha.json").read_text(encoding="utf-8").splitlines()
+    beta = (manager.chats_dir / "beta.json").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["user_input"] for line in alpha] == ["hi", "bye", "again"]
+    assert len(beta) == 1
+    assert json.loads(beta[0])["emotion_score"] == 0.5
+
+
+def test_log_access_bulk_updates_access_counts(manager):
+    manager.store_memory_entries_bulk(
+        [
+            {"category": "facts", "content": "first"},
+            {"category": "facts", "content": "second"},
+        ]
+    )
+    conn = manager.db.get_connection()
+    ids = [row[0] for row in conn.execute("SELECT id FROM memory_entries ORDER BY id")]
+
+    logged = manager.log_access_bulk(
+        [
+            {"memory_id": ids[0], "access_type": "read", "session_id": "s1"},
+            {"memory_id": ids[0], "access_type": "read", "session_id": "s1"},
+            {"memory_id": ids[1], "access_type": "search"},
+        ]
+    )
+    assert logged == 3
+    assert manager.log_access_bulk([]) == 0
+
+    assert conn.execute("SELECT COUNT(*) FROM access_logs").fetchone()[0] == 3
+    counts = dict(conn.execute("SELECT id, access_count FROM memory_entries"))
+    assert counts == {ids[0]: 2, ids[1]: 1}
+
+
+def _axis(dimension: int, *weights: float):
+    vector = np.zeros(dimension, dtype=np.float32)
+    vector[: len(weights)] = weights
+    return vector
+
+
+def _seed_semantic(manager):
+    manager.store_memory_entries_bulk(
+        [
+            {"category": "facts", "content": "cats purr when happy", "importance": 1},
+            {"category": "facts", "content": "dogs wag their tails", "importance": 9},
+            {
+                "category": "facts",
+                "content": "fish have no embedding yet",
+                "importance": 5,
+            },
+        ]
+    )
+    manager.store_embedding("cats purr when happy", _axis(8, 1.0, 0.0))
+    manager.store_embedding("dogs wag their tails", _axis(8, 0.8, 0.6))
+
+
+def test_semantic_search_ranks_by_similarity(manager):
+    _seed_semantic(manager)
+
+    results = manager.search_memory(
+        "pets", limit=2, mode="semantic", query_vector=_axis(8, 1.0, 0.1)
+    )
+    assert [r["content"] for r in results] == [
+        "cats purr when happy",
+        "dogs wag their tails",
+    ]
+    assert all(r["match"] == "semantic" for r in results)
+    assert results[0]["similarity"] > results[1]["similarity"]
+
+    # The vector index maps hashes to store rows rather than copying vectors
+    assert len(manager.vector_index) == 2
+    assert manager.vector_index.rows == sorted(manager.vector_index.rows)
+
+
+def test_semantic_search_blends_importance_and_recency(manager):
+    _seed_semantic(manager)
+    query = _axis(8, 1.0, 0.1)
+
+    by_importance = manager.search_memory(
+        "pets", limit=2, query_vector=query, importance_weight=0.8
+    )
+    assert by_importance[0]["content"] == "dogs wag their tails"
+
+    manager.db.get_connection().execute(
+        "UPDATE memory_entries SET last_accessed = ? WHERE content = ?",
+        ("2000-01-01T00:00:00", "dogs wag their tails"),
+    )
+    manager.db.get_connection().commit()
+    by_recency = manager.search_memory(
+        "pets",
+        limit=2,
+        query_vector=_axis(8, 0.8, 0.6),
+        recency_weight=0.9,
+        recency_half_life_days=1.0,
+    )
+    assert by_recency[0]["content"] == "cats purr when happy"
+
+
+def test_semantic_search_tops_up_and_falls_back_to_text(manager):
+    _seed_semantic(manager)
+
+    topped_up = manager.search_memory("fish", limit=3, query_vector=_axis(8, 1.0))
+    assert topped_up[-1]["content"] == "fish have no embedding yet"
+    assert topped_up[-1]["match"] == "text"
+
+    no_vector = manager.search_memory("fish", mode="semantic")
+    assert [r["match"] for r in no_vector] == ["text"]
+
+    mismatched = manager.search_memory(
+        "dogs", mode="semantic", query_vector=np.ones(3, dtype=np.float32)
+    )
+    assert [r["content"] for r in mismatched] == ["dogs wag their tails"]
+    assert mismatched[0]["match"] == "text"
+
+
+def test_replacing_an_embedding_overwrites_its_row(manager):
+    manager.store_memory_entries_bulk([{"category": "facts", "content": "mutable"}])
+    content_hash = hashlib.md5(b"mutable").hexdigest()
+
+    manager.store_embedding("mutable", _axis(4, 1.0))
+    manager.store_embedding("other", _axis(4, 0.0, 1.0))
+    manager.store_embedding("mutable", _axis(4, 0.0, 0.0, 1.0))
+
+    assert len(manager.vector_store) == 2
+    manager.embedding_cache.clear()
+    np.testing.assert_array_equal(
+        manager.get_embedding(content_hash), _axis(4, 0.0, 0.0, 1.0)
+    )
+
+
+def test_migrate_legacy_embeddings(memory_module, tmp_path):
+    data_dir = tmp_path / "legacy"
+    embeddings_dir = data_dir / "embeddings"
+    embeddings_dir.mkdir(parents=True)
+
+    # Pre-vector-store layout: pickled BLOBs plus per-hash .npy files
+    conn = sqlite3.connect(data_dir / "deanna_memory.db")
+    conn.execute("""
+        CREATE TABLE embeddings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash TEXT UNIQUE NOT NULL,
+            vector_data BLOB NOT NULL,
+            dimension INTEGER,
+            model_used TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute(
+        "INSERT INTO embeddings (content_hash, vector_data, dimension, model_used) VALUES (?, ?, ?, ?)",
+        ("blobhash", pickle.dumps(_axis(4, 1.0, 2.0)), 4, "local"),
+    )
+    conn.commit()
+    conn.close()
+    np.save(embeddings_dir / "blobhash.npy", _axis(4, 9.0))
+    np.save(embeddings_dir / "filehash.npy", _axis(4, 0.0, 0.0, 3.0))
+
+    manager = memory_module.DeannaMemoryManager(data_dir=str(data_dir))
+    try:
+        assert len(manager.vector_store) == 2
+        assert not list(embeddings_dir.glob("*.npy"))
+        # The BLOB wins over a stale .npy for the same hash
+        np.testing.assert_array_equal(
+            manager.get_embedding("blobhash"), _axis(4, 1.0, 2.0)
+        )
+        np.testing.assert_array_equal(
+            manager.get_embedding("filehash"), _axis(4, 0.0, 0.0, 3.0)
+        )
+        leftover = (
+            manager.db.get_connection()
+            .execute(
+                "SELECT COUNT(*) FROM embeddings WHERE vector_data IS NOT NULL OR vector_row IS NULL"
+            )
+            .fetchone()[0]
+        )
+        assert leftover == 0
+        assert manager.migrate_legacy_embeddings() == 0
+    finally:
+        manager.close()
+
+    reopened = memory_module.DeannaMemoryManager(data_dir=str(data_dir))
+    try:
+        assert len(reopened.vector_store) == 2
+        np.testing.assert_array_equal(
+            reopened.get_embedding("filehash"), _axis(4, 0.0, 0.0, 3.0)
+        )
+    finally:
+        reopened.close()
+
+
+def test_embedding_cache_evicts_by_bytes(memory_module):
+    # Each 16-dim float32 vector is 64 bytes, so three fit in 200
+    cache = memory_module.EmbeddingLRUCache(max_bytes=200)
+    for name in ("a", "b", "c"):
+        cache.put(name, np.full(16, 1.0, dtype=np.float32))
+    assert cache.get("a") is not None
+
+    cache.put("d", np.zeros(16, dtype=np.float32))
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache and "d" in cache
+    assert cache.current_bytes == 192
+
+    stats = cache.get_statistics()
+    assert stats["evictions"] == 1
+    assert stats["entries"] == 3
+    assert stats["size_bytes"] == 192
+
+
+def test_embedding_cache_rejects_oversized_vectors(memory_module):
+    cache = memory_module.EmbeddingLRUCache(max_bytes=100)
+    cache.put("small", np.zeros(8, dtype=np.float32))
+    cache.put("huge", np.zeros(64, dtype=np.float32))
+
+    assert "huge" not in cache
+    assert "small" in cache
+    assert cache.get_statistics()["rejected"] == 1
+    assert cache.current_bytes == 32
+
+
+def test_memory_stats_report_embedding_cache(memory_module, tmp_path):
+    manager = memory_module.DeannaMemoryManager(
+        data_dir=str(tmp_path / "stats"), embedding_cache_max_bytes=64
+    )
+    try:
+        manager.store_embedding("one", _axis(8, 1.0))
+        manager.store_embedding("two", _axis(8, 0.0, 1.0))
+        manager.get_embedding(hashlib.md5(b"two").hexdigest())
+        manager.get_embedding(hashlib.md5(b"one").hexdigest())
+
+        stats = manager.get_memory_stats()
+        cache_stats = stats["embedding_cache"]
+        assert stats["embeddings"] == 2
+        assert stats["embedding_cache_size"] == 2
+        assert cache_stats["max_bytes"] == 64
+        assert cache_stats["size_bytes"] == 64
+        assert cache_stats["hits"] == 2
+        assert cache_stats["hit_rate"] == 1.0
+    finally:
+        manager.close()
@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.llm_load_test import SYSTEM_PROMPT, LoadTestHarness
+from benchmarks.mock_deepseek_server import MockDeepSeekServer, MockServerConfig
+from tools.deepseek_client import DeepSeekClientRegistry
+
+
+def _harness(tmp_path, **config):
+    server = MockDeepSeekServer(
+        MockServerConfig(
+            latency_ms=5,
+            latency_jitter_ms=1,
+            first_chunk_ms=2,
+            chunk_interval_ms=1,
+            completion_tokens=8,
+            seed=7,
+            **config
+        )
+    )
+    registry = DeepSeekClientRegistry(transport=server.transport())
+    return server, registry, LoadTestHarness(registry, "http://mock/v1", str(tmp_path))
+
+
+@pytest.mark.asyncio
+async def test_streaming_reports_usage_and_prefix_cache_hits(tmp_path):
+    server, registry, harness = _harness(tmp_path)
+    tool = harness.make_llm_tool()
+
+    for _ in range(2):
+        deltas = [
+            d
+            async for d in tool.stream_chat(
+                "hello", system_message=SYSTEM_PROMPT, use_history=False
+            )
+        ]
+        assert len(deltas) == 4 and tool.last_stream_metrics.completion_tokens == 8
+
+    stats = server.get_statistics()
+    assert stats["streamed"] == 2
+    assert stats["prompt_cache_hit_tokens"] > 0
+    assert (
+        tool.get_cache_statistics()["call_sites"]["stream"]["hit_tokens"]
+        == stats["prompt_cache_hit_tokens"]
+    )
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_injected_faults_are_retried(tmp_path):
+    server, registry, harness = _harness(
+        tmp_path, rate_limit_rate=0.3, server_error_rate=0.1
+    )
+
+    result = await harness.bench_llm(requests=20, concurrency=4)
+
+    stats = server.get_statistics()
+    assert stats["rate_limited"] + stats["server_errors"] > 0
+    assert harness.retry_policy.get_metrics()["retries"] > 0
+    assert result["requests"] == 20 and result["p99_ms"] >= result["p50_ms"] > 0
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_cached_client_serves_repeats_from_memory(tmp_path):
+    server, registry, harness = _harness(tmp_path)
+    harness.unique_prompts = 2
+
+    result = await harness.bench_cached(requests=6, concurrency=1)
+
+    assert result["failures"] == 0
+    assert result["response_cache_hit_rate"] == pytest.approx(4 / 6)
+    assert server.get_statistics()["requests"] == 2
+    await registry.close()
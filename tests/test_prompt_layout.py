@@ -0,0 +1,198 @@
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.llm_query_tool import LLMQueryTool
+from tools.prompt_layout import PrefixCacheStats, PromptLayout
+from tools.reasoning_engine import FastReasoningEngine, ReasoningStep
+from tools.sub_agent_architecture import SubAgentSystem
+
+
+def _layout(query: str, context: str) -> PromptLayout:
+    return (
+        PromptLayout("rag")
+        .context("Context", context)
+        .query(query, label="User Question")
+        .tools([{"name": "search", "parameters": {"b": 1, "a": 2}}])
+        .persona("Answer as Deanna.")
+        .system("You are Deanna.")
+    )
+
+
+def test_stable_sections_lead_in_fixed_order():
+    first = _layout("what is sqlite?", "passage one")
+    second = _layout("how do joins work?", "passage two")
+
+    assert first.system_text() == second.system_text()
+    assert first.system_text().startswith("You are Deanna.\n\nAnswer as Deanna.\n\n[")
+    assert first.text().startswith(first.system_text())
+    assert (
+        first.user_text() == "Context:\npassage one\n\nUser Question: what is sqlite?"
+    )
+    assert [m["role"] for m in first.messages()] == ["system", "user"]
+
+
+def test_reasoning_prompts_share_a_prefix_per_step():
+    engine = FastReasoningEngine()
+    step_data = {
+        "user_query": "",
+        "focus": "Analyze intent",
+        "output_format": "intent, domain",
+    }
+
+    first = engine._create_fast_prompt(
+        ReasoningStep.INITIAL_ANALYSIS, {**step_data, "user_query": "fix my bug"}, False
+    )
+    second = engine._create_fast_prompt(
+        ReasoningStep.INITIAL_ANALYSIS,
+        {**step_data, "user_query": "write a poem"},
+        False,
+    )
+
+    assert first.call_site == "reasoning.initial_analysis"
+    assert first.system_text() == second.system_text()
+    assert "fix my bug" not in first.system_text()
+    assert first.user_text().endswith("User Query: fix my bug")
+
+
+def test_prefix_cache_stats_per_call_site():
+    stats = PrefixCacheStats()
+    stats.record(
+        "rag", {"prompt_cache_hit_tokens": 300, "prompt_cache_miss_tokens": 100}
+    )
+    stats.record(
+        "rag", {"prompt_cache_hit_tokens": 500, "prompt_cache_miss_tokens": 100}
+    )
+    stats.record(
+        "chat", {"prompt_cache_hit_tokens": 0, "prompt_cache_miss_tokens": 200}
+    )
+    assert not stats.record("fim", {"prompt_tokens": 10})
+
+    result = stats.get_statistics()
+    assert result["call_sites"]["rag"]["hit_rate"] == pytest.approx(0.8)
+    assert result["call_sites"]["chat"]["hit_rate"] == 0.0
+    assert result["call_sites"]["fim"] == {
+        "requests": 1,
+        "reported": 0,
+        "hit_tokens": 0,
+        "miss_tokens": 0,
+        "hit_rate": 0.0,
+    }
+    assert result["hit_rate"] == pytest.approx(800 / 1200)
+
+
+@pytest.mark.asyncio
+async def test_llm_tool_records_cache_usage_by_call_site():
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "ok"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 120,
+                    "completion_tokens": 1,
+                    "total_tokens": 121,
+                    "prompt_cache_hit_tokens": 100,
+                    "prompt_cache_miss_tokens": 20,
+                },
+            },
+        )
+
+    registry = DeepSeekClientRegistry(transport=httpx.MockTransport(handler))
+    tool = LLMQueryTool(api_key="sk-test", base_url="http://mock/v1")
+    tool.cache_stats = PrefixCacheStats()
+    tool.client_registry = registry
+    tool.openai_client = registry.get_client("sk-test", "http://mock/v1").with_options(
+        max_retries=0
+    )
+    tool._initialize_providers()
+
+    layout = (
+        PromptLayout("reasoning.initial_analysis").instructions("Be brief.").query("hi")
+    )
+    response = await tool.execute(
+        prompt=layout.user_text(),
+        system_message=layout.system_text(),
+        use_history=False,
+        call_site=layout.call_site,
+    )
+    assert response.success
+    assert tool.conversation_history == []
+    await tool.execute(mode="fim", prefix="def f(", suffix=")")
+    assert await tool.generate_response("hello") == "ok"
+
+    sites = tool.get_cache_statistics()["call_sites"]
+    assert set(sites) == {"reasoning.initial_analysis", "fim", "generate_response"}
+    assert sites["reasoning.initial_analysis"]["hit_tokens"] == 100
+    assert sites["fim"]["hit_rate"] == pytest.approx(100 / 120)
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_sub_agents_report_their_own_call_sites():
+    system_messages = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        system_messages.append(body["messages"][0])
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": body["model"],
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "ok"},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 80,
+                    "completion_tokens": 1,
+                    "total_tokens": 81,
+                    "prompt_cache_hit_tokens": 64,
+                    "prompt_cache_miss_tokens": 16,
+                },
+            },
+        )
+
+    registry = DeepSeekClientRegistry(transport=httpx.MockTransport(handler))
+    tool = LLMQueryTool(api_key="sk-test", base_url="http://mock/v1")
+    tool.cache_stats = PrefixCacheStats()
+    tool.client_registry = registry
+    tool.openai_client = registry.get_client("sk-test", "http://mock/v1").with_options(
+        max_retries=0
+    )
+    tool._initialize_providers()
+
+    result = await SubAgentSystem(tool).generate_code_with_analysis("parse a CSV file")
+
+    assert result["overall_success"]
+    sites = tool.get_cache_statistics()["call_sites"]
+    assert set(sites) == {
+        "sub_agent.code_generation",
+        "sub_agent.code_analysis",
+        "sub_agent.security_analysis",
+    }
+    assert all(message["role"] == "system" for message in system_messages)
+    await registry.close()
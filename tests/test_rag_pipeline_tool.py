@@ -0,0 +1,169 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.context_packer import ContextPacker
+from tools.rag_fusion import HybridRanker, MinHashDeduplicator
+from tools.token_counter import TokenCounter
+from tools.rag_pipeline_tool import RAGPipelineTool
+
+
+@pytest_asyncio.fixture
+async def rag_tool(tmp_path, monkeypatch):
+    monkeypatch.setattr("config.api_keys.DEEPSEEK_API_KEY", "sk-test")
+    tool = RAGPipelineTool(sql_db_path=str(tmp_path / "rag.db"))
+    await tool.sql_tool._initialize_database()
+
+    async def generate(query, rag_context, persona_context):
+        return "answer"
+
+    tool._generate_rag_response = generate
+    yield tool
+    await tool.sql_tool.pool.close()
+
+
+@pytest.mark.asyncio
+async def test_rag_query_runs_sources_concurrently_and_degrades(rag_tool):
+    async def slow_vector(query, limit):
+        await asyncio.sleep(5)
+        return [{"text": "never", "score": 1.0}]
+
+    async def slow_history(session_id, limit):
+        await asyncio.sleep(0.2)
+        return [{"user_input": "hi", "assistant_response": "hello"}]
+
+    async def slow_memory(query, persona_id):
+        await asyncio.sleep(0.2)
+        return [
+            {
+                "id": 1,
+                "content": "remembered",
+                "importance": 8,
+                "persona_id": persona_id,
+            }
+        ]
+
+    rag_tool._retrieve_vector_context = slow_vector
+    rag_tool._retrieve_history_context = slow_history
+    rag_tool._retrieve_memory_context = slow_memory
+
+    start = time.perf_counter()
+    response = await rag_tool.execute(
+        operation="rag_query",
+        query="hello",
+        session_id="s1",
+        stage_timeouts={"vector": 0.3},
+    )
+    elapsed = time.perf_counter() - start
+
+    assert response.success
+    assert elapsed < 1.0
+    timings = response.data["timings"]
+    assert timings["vector"]["status"] == "timeout"
+    assert timings["memory"]["status"] == "ok"
+    assert timings["history"]["status"] == "ok"
+    assert response.data["degraded_sources"] == ["vector"]
+    assert response.data["context"]["memory_count"] == 1
+    assert response.data["context"]["history_count"] == 1
+    assert {"persona", "retrieval", "generation", "total"} <= set(timings)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_ranker_fuses_by_rank_and_drops_near_duplicates():
+    passage = "SQLite WAL mode lets readers proceed while a single writer appends to the log file"
+    sources = {
+        # Cosine scores near 1 and BM25 scores near 10 are on different scales
+        "vector": [
+            {"key": "v1", "text": passage, "score": 0.91},
+            {"key": "v2", "text": "Qdrant stores vectors in segments", "score": 0.90},
+        ],
+        "memory": [
+            {"key": "m1", "text": passage + " quickly", "score": 12.0},
+            {
+                "key": "m2",
+                "text": "Use executemany for bulk inserts into SQLite tables",
+                "score": 3.0,
+            },
+        ],
+    }
+
+    ranked = await HybridRanker(method="rrf").rank("sqlite wal", sources)
+
+    keys = [item["key"] for item in ranked]
+    assert keys[0] in ("v1", "m1")
+    assert not {"v1", "m1"} <= set(keys)
+    assert len(ranked) == 3
+    assert all(0 < item["score"] < 1 for item in ranked)
+
+    weighted = HybridRanker(method="weighted", weights={"memory": 2.0}).fuse(sources)
+    assert weighted[0]["key"] == "m1"
+
+
+def test_minhash_similarity_tracks_overlap():
+    dedup = MinHashDeduplicator()
+    base = dedup.signature(
+        "the quick brown fox jumps over the lazy dog near the river bank"
+    )
+    close = dedup.signature(
+        "the quick brown fox jumps over the lazy dog near the river"
+    )
+    far = dedup.signature(
+        "completely unrelated sentence about database connection pools"
+    )
+    assert dedup.similarity(base, close) > 0.6
+    assert dedup.similarity(base, far) < 0.2
+
+
+def test_context_packer_fills_budget_by_relevance_per_token():
+    counter = TokenCounter()
+    long_low = "filler " * 400
+    candidates = [
+        {"text": long_low, "relevance": 0.9},
+        {"text": "WAL lets readers run beside one writer", "relevance": 0.8},
+        {"text": "WAL lets readers run beside one writer.", "relevance": 0.7},
+        {"text": "Use executemany for bulk inserts", "relevance": 0.5},
+    ]
+
+    packed = ContextPacker(token_budget=100, counter=counter).pack(candidates)
+
+    assert [p["text"] for p in packed.passages] == [
+        candidates[1]["text"],
+        candidates[3]["text"],
+    ]
+    assert packed.used_tokens <= 100
+    assert packed.stats["dropped_by_reason"] == {"budget": 1, "duplicate": 1}
+
+
+def test_token_counter_truncates_on_token_boundary():
+    counter = TokenCounter()
+    text = "alpha beta gamma delta epsilon"
+    assert counter.count(text) > 5
+    truncated = counter.truncate(text, 4)
+    assert counter.count(truncated) <= 4
+    assert text.startswith(truncated) and truncated.endswith("beta")
+
+
+@pytest.mark.asyncio
+async def test_rag_context_respects_token_budget(rag_tool):
+    vector_results = [
+        {"text": f"passage {i} " + "detail " * 80, "score": 1 - i / 10}
+        for i in range(10)
+    ]
+    context = await rag_tool._build_rag_context(
+        query="q",
+        vector_results=vector_results,
+        memory_context=[],
+        history_context=[],
+        persona_context=None,
+        token_budget=300,
+    )
+    stats = context.packing_stats
+    assert stats["used_tokens"] <= 300
+    assert stats["packed_count"] + stats["dropped_count"] == 10
+    assert "passage 0 " in context.combined_context
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.request_scheduler import (
+    RequestPriority,
+    RequestScheduler,
+    TokenBucket,
+    request_context,
+)
+from tools.token_counter import get_token_counter
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(rate=10, capacity=5, clock=lambda: now[0])
+    bucket.consume(5)
+    assert bucket.time_until(2) == pytest.approx(0.2)
+
+    now[0] = 0.2
+    assert bucket.time_until(2) == 0
+    now[0] = 10
+    bucket.consume(0)
+    assert bucket.level == 5
+    # Oversized requests wait for a full bucket rather than forever
+    assert bucket.time_until(50) == 0
+
+
+@pytest.mark.asyncio
+async def test_interactive_requests_jump_the_background_queue():
+    # One request of burst, then one every 20ms
+    scheduler = RequestScheduler(requests_per_minute=3000, request_burst=1)
+    served = []
+
+    async def request(name, priority):
+        await scheduler.acquire(priority=priority)
+        served.append(name)
+
+    await scheduler.acquire()
+    background = [
+        asyncio.create_task(request(f"bg{i}", RequestPriority.BACKGROUND))
+        for i in range(3)
+    ]
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(request("chat", RequestPriority.INTERACTIVE))
+
+    await asyncio.wait_for(asyncio.gather(*background, interactive), timeout=5)
+    assert served[0] == "chat"
+    assert served[1:] == ["bg0", "bg1", "bg2"]
+
+    metrics = scheduler.get_metrics()["by_priority"]
+    assert metrics["interactive"]["admitted"] == 1
+    assert metrics["background"]["admitted"] == 3
+    assert metrics["background"]["max_wait_ms"] > metrics["interactive"]["max_wait_ms"]
+
+
+@pytest.mark.asyncio
+async def test_sources_take_turns_within_a_priority():
+    scheduler = RequestScheduler(requests_per_minute=6000, request_burst=1)
+    served = []
+
+    async def request(source):
+        await scheduler.acquire(source=source)
+        served.append(source)
+
+    await scheduler.acquire()
+    tasks = [asyncio.create_task(request("greedy")) for _ in range(3)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(request("polite")))
+
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+    assert served == ["greedy", "polite", "greedy", "greedy"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue():
+    scheduler = RequestScheduler(requests_per_minute=60, request_burst=1)
+    await scheduler.acquire()
+
+    waiter = asyncio.create_task(scheduler.acquire())
+    await asyncio.sleep(0.01)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    assert scheduler.get_metrics()["by_priority"]["normal"]["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_registry_charges_tokens_and_tags_priority():
+    def handler(request: httpx.Request) -> httpx.Response:
+        model = json.loads(request.content)["model"]
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "ok"},
+                        "finish_reason": "stop",
+                    }
+                ],
+            },
+        )
+
+    registry = DeepSeekClientRegistry(
+        transport=httpx.MockTransport(handler),
+        scheduler=RequestScheduler(tokens_per_minute=100_000),
+    )
+    client = registry.get_client("sk-test", "http://mock/v1")
+
+    with request_context(RequestPriority.INTERACTIVE, "chat"):
+        await client.chat.completions.create(
+            model="deepseek-chat",
+            max_tokens=100,
+            messages=[{"role": "user", "content": "hello there"}],
+        )
+    await client.chat.completions.create(
+        model="deepseek-chat", messages=[{"role": "user", "content": "hi"}]
+    )
+
+    by_priority = registry.get_metrics()["scheduler"]["by_priority"]
+    assert by_priority["interactive"]["admitted"] == 1
+    assert by_priority["interactive"]["tokens"] == 100 + get_token_counter().count(
+        "hello there"
+    )
+    assert by_priority["normal"]["admitted"] == 1
+    await registry.close()
+
+
+@pytest.mark.asyncio
+async def test_registry_queues_context_sources_fairly_on_one_model():
+    served = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        served.append(json.loads(request.content)["messages"][0]["content"])
+        return httpx.Response(
+            200,
+            json={
+                "id": "c",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "deepseek-chat",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "ok"},
+                        "finish_reason": "stop",
+                    }
+                ],
+            },
+        )
+
+    registry = DeepSeekClientRegistry(
+        transport=httpx.MockTransport(handler),
+        scheduler=RequestScheduler(requests_per_minute=600, request_burst=1),
+    )
+    client = registry.get_client("sk-test", "http://mock/v1").with_options(
+        max_retries=0
+    )
+
+    async def request(source):
+        with request_context(RequestPriority.NORMAL, source):
+            await client.chat.completions.create(
+                model="deepseek-chat", messages=[{"role": "user", "content": source}]
+            )
+
+    await registry.scheduler.acquire()
+    tasks = [asyncio.create_task(request("background_learning")) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    tasks.append(asyncio.create_task(request("chat")))
+
+    await asyncio.wait_for(asyncio.gather(*tasks), timeout=5)
+    assert served == [
+        "background_learning",
+        "chat",
+        "background_learning",
+        "background_learning",
+    ]
+    await registry.close()
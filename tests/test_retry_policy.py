@@ -0,0 +1,140 @@
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.deepseek_client import DeepSeekClientRegistry
+from tools.llm_query_tool import LLMQueryTool
+from tools.retry_policy import CircuitBreaker, RetryBudget, RetryPolicy
+
+COMPLETION = {
+    "id": "c",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "deepseek-chat",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "done"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class FakeServer:
+    """Replays a scripted list of (status, headers) before answering 200"""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        if self.script:
+            status, headers = self.script.pop(0)
+            return httpx.Response(
+                status, headers=headers, json={"error": {"message": f"status {status}"}}
+            )
+        return httpx.Response(200, json=COMPLETION)
+
+
+def _policy(**kwargs):
+    delays = []
+
+    async def sleep(seconds):
+        delays.append(seconds)
+
+    return RetryPolicy(sleep=sleep, rng=lambda: 0.5, **kwargs), delays
+
+
+def _tool(server, policy) -> LLMQueryTool:
+    registry = DeepSeekClientRegistry(transport=httpx.MockTransport(server))
+    tool = LLMQueryTool(
+        api_key="sk-test", base_url="http://mock/v1", retry_policy=policy
+    )
+    tool.openai_client = registry.get_client("sk-test", "http://mock/v1").with_options(
+        max_retries=0
+    )
+    return tool
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_retried_after_retry_after():
+    server = FakeServer([(429, {"retry-after": "2"}), (503, {})])
+    policy, delays = _policy(base_delay=1.0)
+    tool = _tool(server, policy)
+
+    response = await tool.execute(mode="fim", prefix="def f(", suffix=")")
+
+    assert response.success
+    assert server.requests == 3
+    # Retry-After wins for the 429; the 503 uses jittered backoff (0.5 * 1.0 * 2**1)
+    assert delays == [2.0, 1.0]
+    assert policy.get_metrics()["succeeded_after_retry"] == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    server = FakeServer([(400, {})])
+    policy, delays = _policy()
+    tool = _tool(server, policy)
+
+    response = await tool.execute(mode="prefix", prefix="hello")
+
+    assert not response.success
+    assert server.requests == 1
+    assert delays == []
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_and_fails_fast():
+    server = FakeServer([(500, {})] * 10)
+    policy, _ = _policy(max_retries=1, failure_threshold=2, recovery_timeout=60)
+    tool = _tool(server, policy)
+
+    first = await tool.execute(mode="function", prompt="x")
+    assert not first.success
+    assert server.requests == 2
+
+    second = await tool.execute(mode="function", prompt="x")
+    assert not second.success
+    assert second.data["error"] == "Circuit open"
+    assert server.requests == 2
+    assert policy.breaker(tool.chat_endpoint).state == CircuitBreaker.OPEN
+
+
+def test_breaker_half_open_allows_one_probe():
+    now = [0.0]
+    breaker = CircuitBreaker(
+        failure_threshold=1, recovery_timeout=10, clock=lambda: now[0]
+    )
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    now[0] = 11
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_limits_retry_storms():
+    policy, delays = _policy(
+        max_retries=5, budget=RetryBudget(ratio=0.0, min_retries=2)
+    )
+
+    async def always_unavailable():
+        raise httpx.ConnectError("down")
+
+    with pytest.raises(httpx.ConnectError):
+        await policy.call("flaky", always_unavailable)
+
+    assert len(delays) == 2
+    assert policy.budget.get_state()["exhausted"] == 1
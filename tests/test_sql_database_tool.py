@@ -0,0 +1,285 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.sql_database_tool import SQLDatabaseTool
+from tools.sqlite_connection_pool import get_connection_pool
+
+
+@pytest_asyncio.fixture
+async def sql_tool(tmp_path):
+    tool = SQLDatabaseTool(str(tmp_path / "test.db"))
+    await tool._initialize_database()
+    yield tool
+    await tool.pool.close()
+
+
+@pytest.mark.asyncio
+async def test_tools_on_same_file_share_pool(sql_tool):
+    assert get_connection_pool(sql_tool.db_path) is sql_tool.pool
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reads_and_writes_use_bounded_pool(sql_tool):
+    await asyncio.gather(
+        *[
+            sql_tool.execute(operation="store_memory", content=f"memory {i}")
+            for i in range(20)
+        ]
+    )
+    responses = await asyncio.gather(
+        *[sql_tool.execute(operation="get_memory", limit=5) for _ in range(20)]
+    )
+
+    assert all(response.success for response in responses)
+    metrics = sql_tool.get_pool_metrics()
+    assert metrics["open_readers"] <= metrics["max_readers"]
+    assert metrics["write_wait"]["count"] >= 20
+    assert metrics["read_query"]["count"] >= 20
+
+
+@pytest.mark.asyncio
+async def test_bulk_memories_and_messages(sql_tool):
+    response = await sql_tool.store_memories_bulk(
+        [{"content": f"fact {i}", "category": "bulk", "tags": ["t"]} for i in range(50)]
+    )
+    assert response.success
+    ids = response.data["memory_ids"]
+    assert len(ids) == 50
+
+    stored = await sql_tool.execute(
+        operation="execute_query",
+        query="SELECT id, content FROM memory WHERE category = 'bulk' ORDER BY id",
+    )
+    assert [row["id"] for row in stored.data["results"]] == ids
+    assert stored.data["results"][-1]["content"] == "fact 49"
+
+    messages = [{"role": "user", "content": f"message {i}"} for i in range(30)]
+    response = await sql_tool.store_messages_bulk("conv-1", messages)
+    assert response.data["messages_stored"] == 30
+
+    stored = await sql_tool.execute(
+        operation="execute_query",
+        query="SELECT message_index FROM conversation_messages WHERE conversation_id = ? ORDER BY message_index",
+        params=["conv-1"],
+    )
+    assert [row["message_index"] for row in stored.data["results"]] == list(range(30))
+
+
+@pytest.mark.asyncio
+async def test_write_queue_groups_concurrent_writes(tmp_path):
+    tool = SQLDatabaseTool(
+        str(tmp_path / "queued.db"),
+        write_queue=True,
+        write_flush_interval=0.01,
+        write_batch_size=100,
+    )
+    await tool._initialize_database()
+
+    responses = await asyncio.gather(
+        *[
+            tool.execute(
+                operation="store_conversation",
+                session_id="s",
+                user_input=f"q{i}",
+                assistant_response=f"a{i}",
+            )
+            for i in range(200)
+        ]
+    )
+
+    assert all(response.success for response in responses)
+    ids = {response.data["conversation_id"] for response in responses}
+    assert len(ids) == 200
+
+    metrics = tool.get_pool_metrics()["write_queue"]
+    assert metrics["committed"] == 200
+    assert metrics["batches"] < 20
+
+    await tool.close()
+    await tool.pool.close()
+
+
+@pytest.mark.asyncio
+async def test_full_text_search_ranks_and_tracks_changes(sql_tool):
+    await sql_tool.store_memories_bulk(
+        [
+            {"content": "Vector databases store embeddings for similarity search"},
+            {"content": "Vector search with vector indexes and vector quantization"},
+            {"content": "SQLite is an embedded relational database"},
+        ]
+    )
+    await sql_tool.execute(
+        operation="store_conversation",
+        session_id="s1",
+        user_input="How do I tune SQLite?",
+        assistant_response="Enable WAL journaling",
+    )
+
+    response = await sql_tool.execute(
+        operation="full_text_search", query="vector search"
+    )
+    assert response.data["ranking"] == "bm25"
+    memories = response.data["memory_results"]
+    assert len(memories) == 2
+    assert memories[0]["content"].startswith("Vector search")
+    assert "[" in memories[0]["snippet"]
+
+    response = await sql_tool.execute(
+        operation="full_text_search", query="journaling", tables=["conversations"]
+    )
+    assert [r["session_id"] for r in response.data["results"]] == ["s1"]
+
+    async with sql_tool.pool.write() as db:
+        await db.execute(
+            "UPDATE memory SET content = 'rewritten' WHERE content LIKE 'SQLite%'"
+        )
+    response = await sql_tool.execute(
+        operation="full_text_search", query="relational", tables=["memory"]
+    )
+    assert response.data["results"] == []
+
+
+@pytest.mark.asyncio
+async def test_iter_query_streams_in_chunks(sql_tool):
+    await sql_tool.store_memories_bulk([{"content": f"m{i}"} for i in range(1200)])
+
+    seen = 0
+    async for row in sql_tool.iter_query(
+        "SELECT id, content FROM memory", chunk_size=100
+    ):
+        seen += 1
+    assert seen == 1200
+
+    response = await sql_tool.execute(
+        operation="execute_query", query="SELECT id FROM memory", max_rows=10
+    )
+    assert len(response.data["results"]) == 10
+    assert response.data["truncated"]
+    assert (
+        sql_tool.get_pool_metrics()["idle_readers"]
+        == sql_tool.get_pool_metrics()["open_readers"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_get_conversations_keyset_pagination(sql_tool):
+    for i in range(25):
+        await sql_tool.execute(
+            operation="store_conversation",
+            session_id="paged",
+            user_input=f"q{i}",
+            assistant_response=f"a{i}",
+            timestamp=f"2024-01-01T00:00:{i // 2:02d}",
+        )
+
+    seen, token = [], None
+    while True:
+        response = await sql_tool.execute(
+            operation="get_conversations",
+            session_id="paged",
+            limit=10,
+            page_token=token,
+        )
+        seen.extend(conv["user_input"] for conv in response.data["conversations"])
+        token = response.data["next_page_token"]
+        if token is None:
+            break
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+    assert seen[0] == "q24"
+
+
+@pytest.mark.asyncio
+async def test_analytics_rollups_survive_pruning(sql_tool):
+    async with sql_tool.pool.write() as db:
+        await db.executemany(
+            "INSERT INTO analytics (event_type, session_id, timestamp) VALUES (?, ?, datetime('now', ?))",
+            [("tool_call", "s1", "-1 hours")] * 5 + [("error", "s2", "-40 days")] * 3,
+        )
+
+    response = await sql_tool.execute(operation="get_analytics", days=60)
+    assert response.data["summary"] == {"tool_call": 5, "error": 3}
+    assert sum(response.data["daily"].values()) == 8
+
+    response = await sql_tool.execute(
+        operation="get_analytics", days=60, session_id="s1"
+    )
+    assert response.data["summary"] == {"tool_call": 5}
+
+    pruned = await sql_tool.execute(operation="prune_analytics", retention_days=30)
+    assert pruned.data["deleted"] == 3
+
+    response = await sql_tool.execute(operation="get_analytics", days=60)
+    assert response.data["summary"] == {"tool_call": 5, "error": 3}
+    assert len(response.data["events"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_schema_advertises_dispatched_operations(sql_tool):
+    operations = sql_tool.get_schema()["properties"]["operation"]["enum"]
+    for operation in [
+        "pool_metrics",
+        "store_memories_bulk",
+        "store_messages_bulk",
+        "flush_writes",
+        "full_text_search",
+        "prune_analytics",
+    ]:
+        assert operation in operations
+
+
+@pytest.mark.asyncio
+async def test_list_conversations_keyset_pagination(sql_tool):
+    for i in range(7):
+        await sql_tool.execute(
+            operation="store_conversation",
+            session_id="listed",
+            user_input=f"q{i}",
+            assistant_response=f"a{i}",
+            timestamp=f"2024-01-01T00:00:{i // 2:02d}",
+        )
+    await sql_tool.execute(
+        operation="store_conversation",
+        session_id="other",
+        user_input="x",
+        assistant_response="y",
+    )
+
+    seen, token = [], None
+    while True:
+        response = await sql_tool.list_conversations(
+            session_id="listed", limit=3, page_token=token
+        )
+        assert response.success, response.message
+        seen.extend(conv["id"] for conv in response.data["conversations"])
+        token = response.data["next_page_token"]
+        if token is None:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+
+    everything = await sql_tool.list_conversations(limit=50)
+    assert everything.data["total"] == 8
+
+
+@pytest.mark.asyncio
+async def test_retrieve_data_is_capped(sql_tool):
+    await sql_tool.store_memories_bulk([{"content": f"m{i}"} for i in range(30)])
+    sql_tool.max_result_rows = 10
+
+    response = await sql_tool._retrieve_data({"table": "memory", "limit": 1000})
+    assert response.success
+    assert len(response.data["results"]) == 10
+    assert response.data["truncated"]
+
+    response = await sql_tool._retrieve_data({"table": "memory", "limit": 5})
+    assert len(response.data["results"]) == 5
+    assert not response.data["truncated"]
@@ -0,0 +1,150 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+import pytest_asyncio
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from tools.sql_database_tool import SQLDatabaseTool
+from tools.sqlite_migrations import get_schema_version
+
+# Hot queries as SQLDatabaseTool builds them, with the index each should use
+HOT_QUERIES = [
+    (
+        "get_memory",
+        "SELECT * FROM memory WHERE importance >= ? ORDER BY importance DESC, last_accessed DESC LIMIT ?",
+        [5, 10],
+        "idx_memory_importance",
+    ),
+    (
+        "get_memory by persona",
+        "SELECT * FROM memory WHERE importance >= ? AND persona_id = ? ORDER BY importance DESC, last_accessed DESC LIMIT ?",
+        [5, 1, 10],
+        "idx_memory_persona_importance",
+    ),
+    (
+        "get_memory by category",
+        "SELECT * FROM memory WHERE importance >= ? AND category = ? ORDER BY importance DESC, last_accessed DESC LIMIT ?",
+        [5, "general", 10],
+        "idx_memory_category_importance",
+    ),
+    (
+        "memory by importance and access",
+        "SELECT * FROM memory ORDER BY importance DESC, access_count DESC LIMIT ?",
+        [10],
+        "idx_memory_importance_access",
+    ),
+    (
+        "get_conversations",
+        "SELECT * FROM conversations WHERE 1=1 ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+        [10, 0],
+        "idx_conversations_timestamp",
+    ),
+    (
+        "get_conversations by session",
+        "SELECT * FROM conversations WHERE 1=1 AND session_id = ? ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+        ["s", 10, 0],
+        "idx_conversations_session_timestamp",
+    ),
+    (
+        "get_conversations by persona",
+        "SELECT * FROM conversations WHERE 1=1 AND persona_id = ? ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+        [1, 10, 0],
+        "idx_conversations_persona_timestamp",
+    ),
+    (
+        "get_context by session",
+        "SELECT * FROM context WHERE relevance_score >= ? AND session_id = ? ORDER BY relevance_score DESC, timestamp DESC LIMIT ?",
+        [0.0, "s", 10],
+        "idx_context_session_relevance",
+    ),
+    (
+        "recent analytics events",
+        "SELECT * FROM analytics WHERE timestamp >= datetime('now', ?) ORDER BY timestamp DESC LIMIT ?",
+        ["-7 days", 100],
+        "idx_analytics_timestamp",
+    ),
+    (
+        "prune_analytics",
+        "DELETE FROM analytics WHERE timestamp < datetime('now', ?)",
+        ["-30 days"],
+        "idx_analytics_timestamp",
+    ),
+    (
+        "conversation messages",
+        "SELECT role, content, timestamp FROM conversation_messages WHERE conversation_id = ? ORDER BY message_index",
+        ["c"],
+        "idx_conversation_messages_conversation",
+    ),
+]
+
+
+@pytest_asyncio.fixture
+async def sql_tool(tmp_path):
+    tool = SQLDatabaseTool(str(tmp_path / "plans.db"))
+    await tool._initialize_database()
+    yield tool
+    await tool.pool.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "name,query,params,index", HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES]
+)
+async def test_hot_query_uses_index(sql_tool, name, query, params, index):
+    async with sql_tool.pool.read() as db:
+        cursor = await db.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        plan = " | ".join(row[3] for row in await cursor.fetchall())
+
+    assert index in plan, plan
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+@pytest.mark.asyncio
+async def test_migrations_upgrade_unversioned_database(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE memory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            category TEXT NOT NULL,
+            content TEXT NOT NULL,
+            importance INTEGER DEFAULT 5,
+            access_count INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            persona_id INTEGER,
+            tags TEXT
+        );
+        CREATE INDEX idx_memory_persona ON memory(persona_id);
+        INSERT INTO memory (category, content) VALUES ('general', 'legacy searchable note');
+    """)
+    conn.close()
+
+    tool = SQLDatabaseTool(str(db_path))
+    await tool._initialize_database()
+    try:
+        async with tool.pool.read() as db:
+            version = await get_schema_version(db)
+            cursor = await db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+            indexes = {row[0] for row in await cursor.fetchall()}
+
+        assert version == tool._schema_migrations()[-1].version
+        assert "idx_memory_persona_importance" in indexes
+        assert "idx_memory_persona" not in indexes
+
+        response = await tool.execute(operation="full_text_search", query="searchable")
+        assert [r["content"] for r in response.data["results"]] == [
+            "legacy searchable note"
+        ]
+
+        # Re-running is a no-op
+        await tool._initialize_database()
+        response = await tool.execute(operation="get_memory")
+        assert len(response.data["memories"]) == 1
+    finally:
+        await tool.pool.close()
@@ -9,6 +9,7 @@ from .base_tool import BaseTool, ToolResponse
 from .memory_tool import MemoryTool
 from .json_memory_tool import JSONMemoryTool
 from .llm_query_tool import LLMQueryTool
+from .conversation_memory import ConversationMemory
 from .reasoning_engine import FastReasoningEngine
 from .tool_manager import ToolManager
 from .unified_tool_manager import UnifiedToolManager
@@ -17,6 +18,10 @@ from .prefix_completion_tool import PrefixCompletionTool
 from .unified_agent_system import UnifiedAgentSystem, EnhancedContact, EnhancedMemory
 from .vector_database_tool import VectorDatabaseTool
 from .sql_database_tool import SQLDatabaseTool
+from .sqlite_connection_pool import AsyncSQLitePool, get_connection_pool, close_all_pools
+from .deepseek_client import DeepSeekClientRegistry, get_deepseek_registry, get_deepseek_client, close_deepseek_clients
+from .request_scheduler import RequestScheduler, RequestPriority, TokenBucket, request_context
+from .retry_policy import RetryPolicy, RetryBudget, CircuitBreaker, CircuitOpenError, get_retry_policy
 from .rag_pipeline_tool import RAGPipelineTool
 from .simple_embedding_tool import SimpleEmbeddingTool
 from .qwen_embedding_tool import QwenEmbeddingTool
@@ -26,6 +31,10 @@ from .deepseek_coder_tool import DeepSeekCoderTool
 from .enhanced_tool_integration import EnhancedToolManager, ToolDefinition, ToolType
 from .json_mode_support import JSONModeManager, JSONModeLLMIntegration, CommonSchemas
 from .prompt_caching_system import PromptCache, CachedLLMClient, CacheStrategy
+from .prompt_layout import PromptLayout, PrefixCacheStats, get_prefix_cache_stats
+from .completion_session import LocalCompletionModel, CompletionSession, Suggestion
+from .latency_stats import LatencyTracker
+from .completion_cache import CompletionCache
 from .sub_agent_architecture import SubAgentSystem, AgentType, TaskPriority
 
 __all__ = [
@@ -33,6 +42,7 @@ __all__ = [
     'ToolResponse', 
     'MemoryTool',
     'LLMQueryTool',
+    'ConversationMemory',
     'FastReasoningEngine',
     'ToolManager',
     'UnifiedToolManager',
@@ -43,6 +53,22 @@ __all__ = [
     'EnhancedMemory',
     'VectorDatabaseTool',
     'SQLDatabaseTool',
+    'AsyncSQLitePool',
+    'get_connection_pool',
+    'close_all_pools',
+    'DeepSeekClientRegistry',
+    'get_deepseek_registry',
+    'get_deepseek_client',
+    'close_deepseek_clients',
+    'RequestScheduler',
+    'RequestPriority',
+    'TokenBucket',
+    'request_context',
+    'RetryPolicy',
+    'RetryBudget',
+    'CircuitBreaker',
+    'CircuitOpenError',
+    'get_retry_policy',
     'RAGPipelineTool',
     'SimpleEmbeddingTool',
     'DeepSeekCoderTool',
@@ -57,6 +83,14 @@ __all__ = [
     'PromptCache',
     'CachedLLMClient',
     'CacheStrategy',
+    'PromptLayout',
+    'PrefixCacheStats',
+    'get_prefix_cache_stats',
+    'LocalCompletionModel',
+    'CompletionSession',
+    'Suggestion',
+    'LatencyTracker',
+    'CompletionCache',
     'SubAgentSystem',
     'AgentType',
     'TaskPriority'
@@ -0,0 +1,87 @@
+"""
+Completion Cache - Enhanced BASED GOD CLI
+LRU cache for FIM and prefix completions keyed on the text around the cursor
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def _normalize(text: str) -> str:
+    """Unify line endings and drop trailing spaces on every line"""
+    return "\n".join(line.rstrip() for line in text.replace("\r\n", "\n").split("\n"))
+
+
+class CompletionCache:
+    """
+    Completions keyed on a hash of the last prefix_window characters before the
+    cursor, the first suffix_window characters after it, language and model
+    If the user has since typed the start of a cached completion, lookup()
+    returns the rest of it instead of missing
+    """
+
+    def __init__(self, max_entries: int = 2048, prefix_window: int = 1024,
+                 suffix_window: int = 256, max_extension: int = 64):
+        self.max_entries = max_entries
+        self.prefix_window = prefix_window
+        self.suffix_window = suffix_window
+        self.max_extension = max_extension
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self.lock = threading.RLock()
+        self.stats = {"hits": 0, "extension_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def _key(self, prefix: str, suffix: str, language: str, model: str) -> str:
+        # The cursor line keeps its trailing whitespace: "x = " and "x =" complete differently
+        # Normalize a wider slice first so stripped whitespace cannot shift the window
+        head, newline, cursor_line = prefix[-2 * self.prefix_window:].rpartition("\n")
+        window = (_normalize(head) + newline + cursor_line)[-self.prefix_window:]
+        key_string = "\x00".join((language or "", model or "", window,
+                                  _normalize(suffix[:self.suffix_window]).rstrip()))
+        return hashlib.sha256(key_string.encode()).hexdigest()
+
+    def lookup(self, prefix: str, suffix: str = "", language: str = "",
+               model: str = "") -> Optional[Tuple[str, str]]:
+        """Return (completion, "exact" | "extension") or None"""
+        with self.lock:
+            for typed in range(min(self.max_extension, len(prefix) - 1) + 1):
+                key = self._key(prefix[:len(prefix) - typed], suffix, language, model)
+                completion = self._entries.get(key)
+                if completion is None:
+                    continue
+                typed_text = prefix[len(prefix) - typed:]
+                if typed and not (len(completion) > typed and completion.startswith(typed_text)):
+                    continue
+                self._entries.move_to_end(key)
+                self.stats["extension_hits" if typed else "hits"] += 1
+                return completion[typed:], "extension" if typed else "exact"
+            self.stats["misses"] += 1
+            return None
+
+    def store(self, prefix: str, suffix: str, language: str, model: str, completion: str):
+        if not completion:
+            return
+        key = self._key(prefix, suffix, language, model)
+        with self.lock:
+            self._entries[key] = completion
+            self._entries.move_to_end(key)
+            self.stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self.lock:
+            hits = self.stats["hits"] + self.stats["extension_hits"]
+            lookups = hits + self.stats["misses"]
+            return {
+                **self.stats,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,241 @@
+"""
+Completion Session - Enhanced BASED GOD CLI
+Instant local suggestions with debounced, cancellable remote FIM refinement
+"""
+
+import asyncio
+import logging
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Identifiers, numbers, newlines, runs of indentation and single punctuation marks
+_CODE_TOKEN = re.compile(r"[A-Za-z_]\w*|\d+|\n|[ \t]+|[^\w\s]")
+
+CODE_EXTENSIONS = (".py", ".js", ".ts", ".tsx", ".jsx", ".java", ".go", ".rs", ".c", ".h",
+                   ".cpp", ".hpp", ".cs", ".rb", ".php", ".swift", ".kt", ".sql", ".sh")
+
+
+def tokenize_code(text: str) -> List[str]:
+    return _CODE_TOKEN.findall(text)
+
+
+class _TrieNode:
+    __slots__ = ("children", "count", "best_word", "best_count")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.count = 0
+        self.best_word = ""
+        self.best_count = 0
+
+
+class LocalCompletionModel:
+    """
+    Identifier prefix trie plus token n-gram counts, learned from code
+    Completes the identifier under the cursor, then extends greedily with the
+    most frequent next token until the end of the line
+    """
+
+    def __init__(self, order: int = 3, max_file_bytes: int = 256_000):
+        self.order = order
+        self.max_file_bytes = max_file_bytes
+        self._root = _TrieNode()
+        self._ngrams: Dict[Tuple[str, ...], Counter] = {}
+        self.files_indexed = 0
+        self.tokens_learned = 0
+
+    def _insert_word(self, word: str):
+        node = self._root
+        path = [node]
+        for char in word:
+            node = node.children.setdefault(char, _TrieNode())
+            path.append(node)
+        node.count += 1
+        for ancestor in path:
+            if node.count > ancestor.best_count:
+                ancestor.best_word = word
+                ancestor.best_count = node.count
+
+    def complete_word(self, partial: str) -> str:
+        """Most frequent known identifier starting with partial"""
+        node = self._root
+        for char in partial:
+            node = node.children.get(char)
+            if node is None:
+                return ""
+        return node.best_word
+
+    def learn(self, text: str):
+        tokens = tokenize_code(text)
+        for index, token in enumerate(tokens):
+            if token[0].isalpha() or token[0] == "_":
+                self._insert_word(token)
+            for n in range(1, self.order):
+                if index >= n:
+                    context = tuple(tokens[index - n:index])
+                    self._ngrams.setdefault(context, Counter())[token] += 1
+        self.tokens_learned += len(tokens)
+
+    def index_paths(self, paths: Iterable[str], extensions: Tuple[str, ...] = CODE_EXTENSIONS,
+                    max_files: int = 2000) -> int:
+        """Learn from source files under paths; returns how many were read"""
+        indexed = 0
+        for root in paths:
+            root_path = Path(root)
+            files = [root_path] if root_path.is_file() else sorted(root_path.rglob("*"))
+            for path in files:
+                if indexed >= max_files:
+                    break
+                if path.suffix not in extensions or not path.is_file():
+                    continue
+                if any(part.startswith(".") or part in ("node_modules", "__pycache__") for part in path.parts):
+                    continue
+                try:
+                    if path.stat().st_size > self.max_file_bytes:
+                        continue
+                    self.learn(path.read_text(encoding="utf-8", errors="ignore"))
+                except OSError as e:
+                    logger.debug(f"Skipping {path}: {e}")
+                    continue
+                indexed += 1
+        self.files_indexed += indexed
+        return indexed
+
+    def _predict(self, tokens: List[str]) -> Optional[str]:
+        for n in range(self.order - 1, 0, -1):
+            if len(tokens) < n:
+                continue
+            counts = self._ngrams.get(tuple(tokens[-n:]))
+            if counts:
+                return counts.most_common(1)[0][0]
+        return None
+
+    def suggest(self, prefix: str, max_tokens: int = 12) -> str:
+        """Continuation of prefix up to the end of the current line"""
+        tokens = tokenize_code(prefix[-512:])
+        completion = ""
+        if tokens and (prefix[-1:].isalnum() or prefix[-1:] == "_"):
+            partial = tokens[-1]
+            word = self.complete_word(partial)
+            if len(word) > len(partial):
+                completion = word[len(partial):]
+                tokens[-1] = word
+
+        for _ in range(max_tokens):
+            token = self._predict(tokens)
+            if token is None or token == "\n":
+                break
+            completion += token
+            tokens.append(token)
+        return completion
+
+    def get_statistics(self) -> Dict[str, Any]:
+        return {
+            "files_indexed": self.files_indexed,
+            "tokens_learned": self.tokens_learned,
+            "contexts": len(self._ngrams)
+        }
+
+
+@dataclass
+class Suggestion:
+    """One completion offered to the editor"""
+    text: str
+    source: str  # "local" or "remote"
+    generation: int
+    latency_ms: float
+
+
+class CompletionSession:
+    """
+    Editor-style FIM session over a FIMCompletionTool
+    update() answers at once from the local model and schedules a remote
+    request after debounce seconds; each keystroke cancels the previous
+    request, whether it is still waiting or already in flight
+    """
+
+    def __init__(self, tool, debounce: float = 0.15,
+                 on_suggestion: Optional[Callable[[Suggestion], Any]] = None, **request_options):
+        self.tool = tool
+        self.debounce = debounce
+        self.on_suggestion = on_suggestion
+        self.request_options = request_options
+        self.generation = 0
+        self.latest: Optional[Suggestion] = None
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight = False
+        self.stats = {"updates": 0, "debounced": 0, "cancelled_in_flight": 0,
+                      "remote_served": 0, "remote_failed": 0, "accepted": 0}
+
+    def update(self, prefix: str, suffix: str = "") -> Suggestion:
+        """Report the text around the cursor; returns the local suggestion"""
+        self.generation += 1
+        self.stats["updates"] += 1
+        started = time.perf_counter()
+
+        text = self.tool.local_model.suggest(prefix)
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.tool.latency["local"].record(latency_ms)
+        self.latest = Suggestion(text, "local", self.generation, latency_ms)
+
+        self._cancel_pending()
+        self._task = asyncio.get_running_loop().create_task(
+            self._refine(self.generation, prefix, suffix, started)
+        )
+        return self.latest
+
+    def _cancel_pending(self):
+        if self._task is None or self._task.done():
+            return
+        self.stats["cancelled_in_flight" if self._in_flight else "debounced"] += 1
+        self._task.cancel()
+
+    async def _refine(self, generation: int, prefix: str, suffix: str, started: float) -> Optional[Suggestion]:
+        self._in_flight = False
+        await asyncio.sleep(self.debounce)
+        self._in_flight = True
+        try:
+            response = await self.tool.execute(prefix=prefix, suffix=suffix, **self.request_options)
+        finally:
+            self._in_flight = False
+
+        if generation != self.generation:
+            return None
+        if not response.success:
+            self.stats["remote_failed"] += 1
+            return None
+
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.tool.latency["session"].record(latency_ms)
+        self.stats["remote_served"] += 1
+        self.latest = Suggestion(response.data["completion"], "remote", generation, latency_ms)
+        if self.on_suggestion is not None:
+            self.on_suggestion(self.latest)
+        return self.latest
+
+    async def result(self) -> Optional[Suggestion]:
+        """Wait for the remote suggestion for the latest update (None if it failed)"""
+        if self._task is None:
+            return None
+        try:
+            return await self._task
+        except asyncio.CancelledError:
+            return None
+
+    def accept(self, completion: str, prefix: str = ""):
+        """Learn from a completion the user kept, along with the line it finished"""
+        self.stats["accepted"] += 1
+        self.tool.local_model.learn(prefix.rsplit("\n", 1)[-1] + completion)
+
+    async def close(self):
+        self._cancel_pending()
+        await self.result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, "generation": self.generation}
@@ -0,0 +1,86 @@
+"""
+Context Packer - Enhanced BASED GOD CLI
+Fills a token budget with the most relevant-per-token passages
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from tools.rag_fusion import MinHashDeduplicator
+from tools.token_counter import TokenCounter, get_token_counter
+
+
+@dataclass
+class PackedContext:
+    """Passages chosen for a prompt, plus what was left out and why"""
+    passages: List[Dict[str, Any]]
+    dropped: List[Dict[str, Any]]
+    used_tokens: int
+    token_budget: int
+    backend: str
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        reasons: Dict[str, int] = {}
+        for item in self.dropped:
+            reasons[item["drop_reason"]] = reasons.get(item["drop_reason"], 0) + 1
+        return {
+            "packed_count": len(self.passages),
+            "dropped_count": len(self.dropped),
+            "dropped_by_reason": reasons,
+            "used_tokens": self.used_tokens,
+            "token_budget": self.token_budget,
+            "tokenizer": self.backend
+        }
+
+
+class ContextPacker:
+    """
+    Greedy knapsack over candidate passages
+    Candidates carry 'text' and 'relevance'; they are taken in order of
+    relevance per token, skipping near-duplicates of passages already packed
+    """
+
+    def __init__(self, token_budget: int = 1500,
+                 counter: Optional[TokenCounter] = None,
+                 dedup_threshold: float = 0.8,
+                 passage_overhead_tokens: int = 8):
+        self.token_budget = token_budget
+        self.counter = counter or get_token_counter()
+        self.deduplicator = MinHashDeduplicator(threshold=dedup_threshold)
+        self.passage_overhead_tokens = passage_overhead_tokens
+
+    def pack(self, candidates: List[Dict[str, Any]], token_budget: Optional[int] = None) -> PackedContext:
+        """Choose passages for the budget; packed passages keep their input order"""
+        budget = self.token_budget if token_budget is None else token_budget
+
+        scored = []
+        for position, candidate in enumerate(candidates):
+            tokens = self.counter.count(candidate.get("text", "")) + self.passage_overhead_tokens
+            density = candidate.get("relevance", 0.0) / tokens
+            scored.append((density, position, tokens, candidate))
+        scored.sort(key=lambda entry: (-entry[0], entry[1]))
+
+        packed, dropped, signatures = [], [], []
+        used = 0
+        for _, position, tokens, candidate in scored:
+            signature = self.deduplicator.signature(candidate.get("text", ""))
+            if any(self.deduplicator.similarity(signature, other) >= self.deduplicator.threshold
+                   for other in signatures):
+                dropped.append({**candidate, "tokens": tokens, "drop_reason": "duplicate"})
+                continue
+            if used + tokens > budget:
+                dropped.append({**candidate, "tokens": tokens, "drop_reason": "budget"})
+                continue
+            used += tokens
+            signatures.append(signature)
+            packed.append((position, {**candidate, "tokens": tokens}))
+
+        packed.sort(key=lambda entry: entry[0])
+        return PackedContext(
+            passages=[candidate for _, candidate in packed],
+            dropped=dropped,
+            used_tokens=used,
+            token_budget=budget,
+            backend=self.counter.backend
+        )
@@ -0,0 +1,174 @@
+"""
+Conversation Memory - Enhanced BASED GOD CLI
+Token-budgeted chat history with pinned messages and a rolling summary
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from .token_counter import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Role and separator tokens the chat format adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+Summarizer = Callable[[str, List[BaseMessage]], Awaitable[str]]
+
+
+class ConversationMemory:
+    """
+    Chat history that never costs more than token_budget prompt tokens
+    Pinned messages (system prompt, persona) always stay. Recent turns fill
+    what is left after reserving summary_budget; turns pushed out of the
+    window are folded into a rolling summary in the background
+    """
+
+    def __init__(self, token_budget: int = 4000, summary_budget: int = 400,
+                 summarizer: Optional[Summarizer] = None,
+                 counter: Optional[TokenCounter] = None):
+        self.token_budget = token_budget
+        self.summary_budget = summary_budget
+        self.summarizer = summarizer
+        self.counter = counter or get_token_counter()
+
+        self._pinned: Dict[str, Tuple[BaseMessage, int]] = {}
+        self._turns: Deque[Tuple[BaseMessage, int]] = deque()
+        self._turn_tokens = 0
+        self.summary = ""
+        self._summary_tokens = 0
+
+        self._pending: List[BaseMessage] = []
+        self._summary_task: Optional[asyncio.Task] = None
+
+        self.stats = {"evicted_messages": 0, "summaries": 0, "summary_failures": 0}
+
+    def _tokens(self, message: BaseMessage) -> int:
+        return self.counter.count(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+    @property
+    def pinned_tokens(self) -> int:
+        return sum(tokens for _, tokens in self._pinned.values())
+
+    @property
+    def turn_budget(self) -> int:
+        reserved = self.summary_budget + MESSAGE_OVERHEAD_TOKENS
+        return max(0, self.token_budget - self.pinned_tokens - reserved)
+
+    @property
+    def turns(self) -> List[BaseMessage]:
+        """Messages still kept verbatim, oldest first"""
+        return [message for message, _ in self._turns]
+
+    @property
+    def token_count(self) -> int:
+        """Prompt tokens messages() currently costs"""
+        summary = self._summary_tokens + MESSAGE_OVERHEAD_TOKENS if self.summary else 0
+        return self.pinned_tokens + summary + self._turn_tokens
+
+    def pin(self, key: str, message: BaseMessage):
+        """Keep a message (e.g. 'system' or 'persona') ahead of every turn"""
+        self._pinned[key] = (message, self._tokens(message))
+        self._evict()
+
+    def unpin(self, key: str):
+        self._pinned.pop(key, None)
+
+    def append(self, message: BaseMessage):
+        """Add one turn; each message is counted once, here"""
+        tokens = self._tokens(message)
+        self._turns.append((message, tokens))
+        self._turn_tokens += tokens
+        self._evict()
+
+    def extend(self, messages: List[BaseMessage]):
+        for message in messages:
+            self.append(message)
+
+    def clear(self):
+        self._turns.clear()
+        self._turn_tokens = 0
+        self._pending.clear()
+        self.summary = ""
+        self._summary_tokens = 0
+
+    def messages(self) -> List[BaseMessage]:
+        """Pinned messages, the summary, then recent turns"""
+        messages = [message for message, _ in self._pinned.values()]
+        if self.summary:
+            messages.append(SystemMessage(content=SUMMARY_PREFIX + self.summary))
+        messages.extend(self.turns)
+        return messages
+
+    def _evict(self):
+        evicted = []
+        budget = self.turn_budget
+        while self._turns and self._turn_tokens > budget:
+            message, tokens = self._turns.popleft()
+            self._turn_tokens -= tokens
+            evicted.append(message)
+        if not evicted:
+            return
+
+        self.stats["evicted_messages"] += len(evicted)
+        self._pending.extend(evicted)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self.summarizer is None or loop is None:
+            self._fold_pending(None)
+        elif self._summary_task is None or self._summary_task.done():
+            self._summary_task = loop.create_task(self._summarize_pending())
+
+    async def _summarize_pending(self):
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                summary = await self.summarizer(self.summary, batch)
+            except Exception as e:
+                self.stats["summary_failures"] += 1
+                logger.warning(f"History summary failed, keeping an extract instead: {e}")
+                self._pending = batch + self._pending
+                self._fold_pending(None)
+                continue
+            self._fold_pending(summary)
+
+    def _fold_pending(self, summary: Optional[str]):
+        """Replace the summary; without a model summary, append an extract of the pending turns"""
+        limit = max(0, self.summary_budget - self.counter.count(SUMMARY_PREFIX))
+        if summary is None:
+            lines = self.summary.splitlines()
+            for message in self._pending:
+                text = message.content.strip()
+                lines.append(f"{message.type}: {text.splitlines()[0] if text else ''}")
+            # Keep the newest lines when the extract outgrows the budget
+            while len(lines) > 1 and self.counter.count("\n".join(lines)) > limit:
+                lines.pop(0)
+            summary = "\n".join(lines)
+        self._pending = []
+        self.summary = self.counter.truncate(summary.strip(), limit)
+        self._summary_tokens = self.counter.count(SUMMARY_PREFIX + self.summary)
+        self.stats["summaries"] += 1
+
+    async def wait_for_summary(self):
+        """Let an in-flight background summary finish"""
+        if self._summary_task is not None:
+            await self._summary_task
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "turns": len(self._turns),
+            "pinned": len(self._pinned),
+            "pending_summary": len(self._pending),
+            "summary_tokens": self._summary_tokens,
+            "token_count": self.token_count,
+            "token_budget": self.token_budget
+        }
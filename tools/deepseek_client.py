@@ -0,0 +1,286 @@
+"""
+DeepSeek Client Registry - Enhanced BASED GOD CLI
+One pooled HTTP client and shared concurrency limits for every DeepSeek caller
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+from .request_scheduler import RequestScheduler, request_source
+from .token_counter import get_token_counter
+
+logger = logging.getLogger(__name__)
+
+# Model used for limits when a request body names none (e.g. GET /models)
+_UNKNOWN_MODEL = "unknown"
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _request_body(request: httpx.Request) -> Dict[str, Any]:
+    """JSON request body, or {} when there is none"""
+    if request.method != "POST":
+        return {}
+    try:
+        body = json.loads(request.content or b"{}")
+    except (httpx.RequestNotRead, ValueError):
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _estimate_tokens(body: Dict[str, Any]) -> int:
+    """Prompt tokens plus the completion allowance, for tokens/min budgeting"""
+    counter = get_token_counter()
+    tokens = 0
+    for message in body.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        if isinstance(content, str):
+            tokens += counter.count(content)
+    for field in ("prompt", "suffix"):
+        if isinstance(body.get(field), str):
+            tokens += counter.count(body[field])
+    return tokens + int(body.get("max_tokens") or 0)
+
+
+class _ReleasingStream(httpx.AsyncByteStream):
+    """Response body that frees its concurrency slot once closed"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, release: Callable[[], None]):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+class _LimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport with the registry's concurrency caps
+    A slot is held until the response body is closed, so streamed
+    completions count as in flight for their whole duration
+    """
+
+    def __init__(self, registry: "DeepSeekClientRegistry", transport: httpx.AsyncBaseTransport):
+        self._registry = registry
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        body = _request_body(request)
+        model = body.get("model") or _UNKNOWN_MODEL
+        if body:
+            # Fair queuing is per caller tag; untagged requests queue under their model
+            await self._registry.scheduler.acquire(_estimate_tokens(body), source=request_source.get() or model)
+        release = await self._registry._acquire(model)
+
+        opened = []
+        upstream_trace = request.extensions.get("trace")
+
+        async def trace(name: str, info: Dict[str, Any]):
+            if name == "connection.connect_tcp.complete":
+                opened.append(name)
+            if upstream_trace is not None:
+                await upstream_trace(name, info)
+
+        request.extensions["trace"] = trace
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException:
+            release()
+            raise
+
+        self._registry._record_connection(reused=not opened)
+        if response.is_closed:
+            # Body was already read into memory, so aclose() will never reach the stream
+            release()
+        else:
+            response.stream = _ReleasingStream(response.stream, release)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+class DeepSeekClientRegistry:
+    """
+    Process-wide DeepSeek clients sharing one keep-alive connection pool
+    Every AsyncOpenAI client (and LangChain provider built on it) goes through
+    the rate scheduler, then a global concurrency cap plus a per-model cap
+    """
+
+    def __init__(self, max_connections: int = 32, max_keepalive_connections: int = 16,
+                 keepalive_expiry: float = 60.0, max_concurrency: int = 16,
+                 model_concurrency: Optional[Dict[str, int]] = None,
+                 default_model_concurrency: int = 8,
+                 timeout: float = 120.0, connect_timeout: float = 10.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 scheduler: Optional[RequestScheduler] = None):
+        self.max_concurrency = max_concurrency
+        self.scheduler = scheduler or RequestScheduler()
+        self.model_concurrency = dict(model_concurrency or {})
+        self.default_model_concurrency = default_model_concurrency
+        self.http2 = _http2_available()
+        if not self.http2:
+            logger.info("h2 not installed, DeepSeek pool falls back to HTTP/1.1 keep-alive")
+
+        self._global_slots = asyncio.Semaphore(max_concurrency)
+        self._model_slots: Dict[str, asyncio.Semaphore] = {}
+        self._clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+
+        transport = transport or httpx.AsyncHTTPTransport(
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            ),
+            retries=0
+        )
+        self.http_client = httpx.AsyncClient(
+            transport=_LimitedTransport(self, transport),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout)
+        )
+        self._closed = False
+
+        # Metrics
+        self._requests = 0
+        self._queued = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._in_flight_by_model: Dict[str, int] = {}
+        self._requests_by_model: Dict[str, int] = {}
+        self._connections_opened = 0
+        self._connections_reused = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def get_client(self, api_key: str, base_url: str) -> AsyncOpenAI:
+        """Shared AsyncOpenAI client for a key and endpoint, backed by the common pool"""
+        key = (api_key, base_url.rstrip("/"))
+        client = self._clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=self.http_client)
+            self._clients[key] = client
+        return client
+
+    def _model_semaphore(self, model: str) -> asyncio.Semaphore:
+        slots = self._model_slots.get(model)
+        if slots is None:
+            limit = self.model_concurrency.get(model, self.default_model_concurrency)
+            slots = asyncio.Semaphore(limit)
+            self._model_slots[model] = slots
+        return slots
+
+    async def _acquire(self, model: str) -> Callable[[], None]:
+        """Wait for a global and a per-model slot; returns an idempotent release"""
+        model_slots = self._model_semaphore(model)
+        started = time.perf_counter()
+        if self._global_slots.locked() or model_slots.locked():
+            self._queued += 1
+
+        await model_slots.acquire()
+        try:
+            await self._global_slots.acquire()
+        except BaseException:
+            model_slots.release()
+            raise
+
+        waited = time.perf_counter() - started
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._requests += 1
+        self._requests_by_model[model] = self._requests_by_model.get(model, 0) + 1
+        self._in_flight += 1
+        self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+        self._in_flight_by_model[model] = self._in_flight_by_model.get(model, 0) + 1
+
+        released = False
+
+        def release():
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._in_flight -= 1
+            self._in_flight_by_model[model] -= 1
+            self._global_slots.release()
+            model_slots.release()
+
+        return release
+
+    def _record_connection(self, reused: bool):
+        if reused:
+            self._connections_reused += 1
+        else:
+            self._connections_opened += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Request, in-flight and connection-reuse metrics"""
+        handled = self._connections_opened + self._connections_reused
+        return {
+            "http2": self.http2,
+            "clients": len(self._clients),
+            "requests": self._requests,
+            "requests_by_model": dict(self._requests_by_model),
+            "queued_requests": self._queued,
+            "in_flight": self._in_flight,
+            "peak_in_flight": self._peak_in_flight,
+            "in_flight_by_model": {m: n for m, n in self._in_flight_by_model.items() if n},
+            "max_concurrency": self.max_concurrency,
+            "connections_opened": self._connections_opened,
+            "connections_reused": self._connections_reused,
+            "connection_reuse_ratio": self._connections_reused / handled if handled else 0.0,
+            "avg_wait_ms": self._wait_total / self._requests * 1000 if self._requests else 0.0,
+            "max_wait_ms": self._wait_max * 1000,
+            "scheduler": self.scheduler.get_metrics()
+        }
+
+    async def close(self):
+        """Close the shared pool"""
+        if self._closed:
+            return
+        self._closed = True
+        self._clients.clear()
+        await self.http_client.aclose()
+
+
+_registry: Optional[DeepSeekClientRegistry] = None
+
+
+def get_deepseek_registry() -> DeepSeekClientRegistry:
+    """Get the process-wide registry, creating it on first use"""
+    global _registry
+    if _registry is None or _registry._closed:
+        _registry = DeepSeekClientRegistry()
+    return _registry
+
+
+def get_deepseek_client(api_key: str, base_url: str) -> AsyncOpenAI:
+    """Shared AsyncOpenAI client for a key and endpoint"""
+    return get_deepseek_registry().get_client(api_key, base_url)
+
+
+async def close_deepseek_clients():
+    """Close the process-wide registry"""
+    global _registry
+    registry, _registry = _registry, None
+    if registry is not None:
+        await registry.close()
@@ -32,8 +32,8 @@ import aiohttp
 import requests
 from bs4 import BeautifulSoup
 import openai
-from openai import AsyncOpenAI
 from .base_tool import BaseTool, ToolResponse
+from .deepseek_client import get_deepseek_client
 from config.api_keys import get_deepseek_config
 
 @dataclass
@@ -84,11 +84,8 @@ class DeepSeekCoderTool(BaseTool):
         self.api_key = self.config["api_key"]
         self.base_url = self.config["base_url"]
         
-        # Initialize OpenAI client
-        self.client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+        # Shared pooled OpenAI client
+        self.client = get_deepseek_client(self.api_key, self.base_url)
         
         # Code storage and learning
         self.code_examples = {}
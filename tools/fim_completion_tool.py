@@ -3,10 +3,16 @@ FIM Completion Tool - Enhanced BASED GOD CLI
 Fill-in-Middle completion for code using DeepSeek
 """
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 import logging
+import time
 import openai
 from .base_tool import BaseTool, ToolResponse, ToolStatus
+from .completion_cache import CompletionCache
+from .completion_session import CompletionSession, LocalCompletionModel
+from .deepseek_client import get_deepseek_client
+from .latency_stats import LatencyTracker
+from .retry_policy import get_retry_policy
 from config.api_keys import get_deepseek_config
 
 class FIMCompletionTool(BaseTool):
@@ -29,6 +35,13 @@ class FIMCompletionTool(BaseTool):
             ]
         )
         self.client = None
+        self.endpoint = None
+        self.retry_policy = get_retry_policy()
+        self.completion_cache = CompletionCache()
+        
+        # Session mode: local suggestions first, remote FIM refines them
+        self.local_model = LocalCompletionModel()
+        self.latency = {mode: LatencyTracker() for mode in ("local", "remote", "session")}
         self._init_client()
     
     def _init_client(self) -> Any:
@@ -40,10 +53,9 @@ class FIMCompletionTool(BaseTool):
             # Use beta API for FIM completion
             deepseek_base_url = "https://api.deepseek.com/beta"
             
-            self.client = openai.AsyncOpenAI(
-                api_key=deepseek_api_key,
-                base_url=deepseek_base_url
-            )
+            # Retries come from the shared policy rather than the SDK
+            self.client = get_deepseek_client(deepseek_api_key, deepseek_base_url).with_options(max_retries=0)
+            self.endpoint = f"{deepseek_base_url}/completions"
             logging.info("[SUCCESS] FIM Completion Tool initialized successfully")
         except Exception as e:
             logging.info(f"[ERROR] FIM Completion Tool initialization failed: {str(e)}")
@@ -57,6 +69,10 @@ class FIMCompletionTool(BaseTool):
         max_tokens = kwargs.get("max_tokens", 1024)
         temperature = kwargs.get("temperature", 0.3)
         model = kwargs.get("model", "deepseek-coder")
+        use_cache = kwargs.get("use_cache", True)
+        
+        if kwargs.get("mode") == "local":
+            return self._local_complete(prefix)
         
         if not prefix:
             return ToolResponse(
@@ -65,6 +81,23 @@ class FIMCompletionTool(BaseTool):
                 status=ToolStatus.FAILED
             )
         
+        if use_cache:
+            cached = self.completion_cache.lookup(prefix, suffix, language, model)
+            if cached is not None:
+                completion, hit = cached
+                return ToolResponse(
+                    success=True,
+                    message=f"FIM completion served from cache ({hit})",
+                    data={
+                        "completion": completion,
+                        "full_code": prefix + completion + suffix,
+                        "language": language,
+                        "model": model,
+                        "analysis": self._analyze_completion(prefix, completion, suffix, language)
+                    },
+                    metadata={"cache_hit": hit, "tokens_used": 0}
+                )
+        
         if not self.client:
             return ToolResponse(
                 success=False,
@@ -78,18 +111,22 @@ class FIMCompletionTool(BaseTool):
             fim_prompt = f"{language_hint}<PRE>{prefix}<MID>{suffix}<SUF>"
             
             # Execute completion
-            response = await self.client.completions.create(
+            started = time.perf_counter()
+            response = await self.retry_policy.call(self.endpoint, lambda: self.client.completions.create(
                 model=model,
                 prompt=fim_prompt,
                 max_tokens=max_tokens,
                 temperature=temperature,
                 stop=["<PRE>", "<MID>", "<SUF>"]
-            )
+            ))
             
+            self.latency["remote"].record((time.perf_counter() - started) * 1000)
             completion = response.choices[0].text
             
             # Clean up the completion
             completion = completion.strip()
+            if use_cache:
+                self.completion_cache.store(prefix, suffix, language, model, completion)
             
             # Analyze the completion
             analysis = self._analyze_completion(prefix, completion, suffix, language)
@@ -119,6 +156,33 @@ class FIMCompletionTool(BaseTool):
                 status=ToolStatus.FAILED
             )
     
+    def _local_complete(self, prefix: str) -> ToolResponse:
+        """Answer from the workspace model without a network round trip"""
+        started = time.perf_counter()
+        completion = self.local_model.suggest(prefix)
+        self.latency["local"].record((time.perf_counter() - started) * 1000)
+        return ToolResponse(
+            success=True,
+            message="Local completion generated",
+            data={"completion": completion, "source": "local"}
+        )
+    
+    def index_workspace(self, paths: Iterable[str]) -> int:
+        """Teach the local model from source files; returns files read"""
+        return self.local_model.index_paths(paths)
+    
+    def create_session(self, debounce: float = 0.15, on_suggestion=None, **request_options) -> CompletionSession:
+        """Editor session: instant local suggestions, debounced remote refinement"""
+        return CompletionSession(self, debounce=debounce, on_suggestion=on_suggestion, **request_options)
+    
+    def get_latency_stats(self) -> Dict[str, Any]:
+        """Latency percentiles for local, remote and session (keystroke to remote) modes"""
+        return {mode: tracker.summary() for mode, tracker in self.latency.items()}
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Completion cache hit rate, including typed-ahead extension hits"""
+        return self.completion_cache.get_statistics()
+    
     def _analyze_completion(self, prefix: str, completion: str, suffix: str, language: str) -> Dict[str, Any]:
         """Analyze the generated completion"""
         analysis = {
@@ -163,6 +227,12 @@ class FIMCompletionTool(BaseTool):
         return {
             "type": "object",
             "properties": {
+                "mode": {
+                    "type": "string",
+                    "description": "'local' answers from the workspace model without calling DeepSeek",
+                    "enum": ["remote", "local"],
+                    "default": "remote"
+                },
                 "prefix": {
                     "type": "string",
                     "description": "Code before the completion point"
@@ -197,6 +267,11 @@ class FIMCompletionTool(BaseTool):
                     "default": 0.3,
                     "minimum": 0.0,
                     "maximum": 1.0
+                },
+                "use_cache": {
+                    "type": "boolean",
+                    "description": "Reuse earlier completions for the same cursor context",
+                    "default": True
                 }
             },
             "required": ["prefix"]
@@ -0,0 +1,473 @@
+"""
+Ingestion Pipeline - Enhanced BASED GOD CLI
+Streams documents through structure-aware token chunking into the vector and SQL stores
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from tools.token_counter import TokenCounter, get_token_counter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_EXTENSIONS = {
+    ".md", ".markdown", ".txt", ".rst",
+    ".py", ".js", ".ts", ".tsx", ".jsx", ".java", ".go", ".rs", ".c", ".cpp", ".h",
+    ".json", ".yaml", ".yml", ".toml", ".sql", ".sh"
+}
+
+# Stable vector ids: re-ingesting a file overwrites its points in place
+CHUNK_ID_NAMESPACE = uuid.UUID("5b2f8c1e-4a37-4d0e-9c61-0f7d3a9e2b18")
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+@dataclass
+class Chunk:
+    """One retrievable piece of a document"""
+    text: str
+    source: str
+    index: int
+    heading: str = ""
+    token_count: int = 0
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def chunk_id(self) -> str:
+        return str(uuid.uuid5(CHUNK_ID_NAMESPACE, f"{self.source}:{self.index}"))
+
+
+class DocumentChunker:
+    """
+    Token-sized chunks that respect document structure
+    Markdown headings start new chunks and are carried as context, fenced
+    code blocks stay whole when they fit, and prose chunks overlap
+    """
+
+    def __init__(self, max_tokens: int = 400, overlap_tokens: int = 50,
+                 counter: Optional[TokenCounter] = None):
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.counter = counter or get_token_counter()
+
+    def _sections(self, text: str) -> Iterator[Tuple[str, List[Tuple[str, bool]]]]:
+        """Yield (heading path, [(block, is_code)]) per heading section"""
+        headings: List[str] = []
+        blocks: List[Tuple[str, bool]] = []
+        paragraph: List[str] = []
+        code: Optional[List[str]] = None
+
+        def end_paragraph():
+            if paragraph:
+                blocks.append(("\n".join(paragraph), False))
+                paragraph.clear()
+
+        for line in text.splitlines():
+            if code is not None:
+                code.append(line)
+                if _FENCE.match(line):
+                    blocks.append(("\n".join(code), True))
+                    code = None
+                continue
+            if _FENCE.match(line):
+                end_paragraph()
+                code = [line]
+                continue
+            heading = _HEADING.match(line)
+            if heading:
+                end_paragraph()
+                if blocks:
+                    yield " > ".join(headings), blocks
+                    blocks = []
+                level = len(heading.group(1))
+                headings = headings[:level - 1] + [heading.group(2)]
+                continue
+            if not line.strip():
+                end_paragraph()
+            else:
+                paragraph.append(line)
+
+        if code is not None:
+            blocks.append(("\n".join(code), True))
+        end_paragraph()
+        if blocks:
+            yield " > ".join(headings), blocks
+
+    def _split_oversized(self, block: str, limit: int) -> List[str]:
+        """Split a block larger than limit by lines, then by words"""
+        pieces, current = [], []
+        for line in block.splitlines():
+            if self.counter.count(line) > limit:
+                words, line_piece = line.split(), []
+                for word in words:
+                    if line_piece and self.counter.count(" ".join(line_piece + [word])) > limit:
+                        pieces.append(" ".join(line_piece))
+                        line_piece = []
+                    line_piece.append(word)
+                if current:
+                    pieces.append("\n".join(current))
+                    current = []
+                if line_piece:
+                    pieces.append(" ".join(line_piece))
+                continue
+            if current and self.counter.count("\n".join(current + [line])) > limit:
+                pieces.append("\n".join(current))
+                current = []
+            current.append(line)
+        if current:
+            pieces.append("\n".join(current))
+        return pieces
+
+    def _tail(self, text: str) -> str:
+        """Last overlap_tokens worth of words from a chunk"""
+        words = text.split()
+        tail: List[str] = []
+        used = 0
+        for word in reversed(words):
+            used += self.counter.count(word)
+            if used > self.overlap_tokens:
+                break
+            tail.append(word)
+        return " ".join(reversed(tail))
+
+    def chunk(self, text: str, source: str = "", metadata: Optional[Dict[str, Any]] = None) -> List[Chunk]:
+        """Split a document into chunks of at most max_tokens"""
+        chunks: List[Chunk] = []
+
+        for heading, blocks in self._sections(text):
+            prefix = f"{heading}\n\n" if heading else ""
+            budget = self.max_tokens - self.counter.count(prefix)
+            if budget <= self.overlap_tokens:
+                prefix, budget = "", self.max_tokens
+
+            current: List[str] = []
+            current_tokens = 0
+            last_is_code = False
+
+            def emit():
+                body = "\n\n".join(current)
+                chunk_text = prefix + body
+                chunks.append(Chunk(
+                    text=chunk_text,
+                    source=source,
+                    index=len(chunks),
+                    heading=heading,
+                    token_count=self.counter.count(chunk_text),
+                    metadata=dict(metadata or {})
+                ))
+                return body
+
+            for block, is_code in blocks:
+                # Oversized blocks split small enough to carry the overlap tail
+                pieces = ([block] if self.counter.count(block) <= budget
+                          else self._split_oversized(block, budget - self.overlap_tokens))
+                for piece in pieces:
+                    tokens = self.counter.count(piece)
+                    if current and current_tokens + tokens > budget:
+                        body = emit()
+                        # Prose carries an overlap tail into the next chunk; code doesn't
+                        overlap = "" if last_is_code or is_code else self._tail(body)
+                        current = [overlap] if overlap else []
+                        current_tokens = self.counter.count(overlap)
+                        if current_tokens + tokens > budget:
+                            current, current_tokens = [], 0
+                    current.append(piece)
+                    current_tokens += tokens
+                    last_is_code = is_code
+
+            if current:
+                emit()
+
+        return chunks
+
+
+class IngestionManifest:
+    """Content hashes of ingested files, so interrupted runs resume and unchanged files are skipped"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if self.path.exists():
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f).get("files", {})
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Ignoring unreadable ingestion manifest {self.path}: {e}")
+
+    def is_current(self, source: str, digest: str) -> bool:
+        entry = self.entries.get(source)
+        return entry is not None and entry.get("sha256") == digest
+
+    def get(self, source: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(source)
+
+    def record(self, source: str, digest: str, vector_ids: List[str], memory_ids: List[int]):
+        self.entries[source] = {
+            "sha256": digest,
+            "chunks": len(vector_ids),
+            "vector_ids": vector_ids,
+            "memory_ids": memory_ids,
+            "ingested_at": datetime.now().isoformat()
+        }
+
+    def save(self):
+        """Write atomically so a crash never leaves a truncated manifest"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "files": self.entries}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class _Document:
+    source: str
+    text: str
+    digest: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+class _DocumentProgress:
+    """Chunks still in flight for one document"""
+
+    def __init__(self, document: _Document, total: int):
+        self.document = document
+        self.remaining = total
+        self.vector_ids: List[str] = []
+        self.memory_ids: List[int] = []
+        self.failed = False
+
+
+class IngestionPipeline:
+    """
+    Producer/consumer ingestion: documents are read and chunked while earlier
+    batches are embedded and written; the bounded queue applies backpressure
+    so a large tree never sits in memory as chunks
+    """
+
+    def __init__(self, vector_tool=None, sql_tool=None,
+                 chunker: Optional[DocumentChunker] = None,
+                 batch_size: int = 64,
+                 max_pending_batches: int = 4,
+                 manifest_path: Optional[str] = None,
+                 min_memory_chars: int = 50,
+                 manifest_save_every: int = 20,
+                 extensions: Optional[set] = None):
+        self.vector_tool = vector_tool
+        self.sql_tool = sql_tool
+        self.chunker = chunker or DocumentChunker()
+        self.batch_size = batch_size
+        self.max_pending_batches = max_pending_batches
+        self.manifest_path = manifest_path
+        self.min_memory_chars = min_memory_chars
+        self.manifest_save_every = manifest_save_every
+        self.extensions = extensions or DEFAULT_EXTENSIONS
+
+    @property
+    def vector_enabled(self) -> bool:
+        return self.vector_tool is not None and getattr(self.vector_tool, "client", None) is not None
+
+    def iter_files(self, paths: List[str]) -> Iterator[Path]:
+        """Walk files and directories, yielding files with known extensions"""
+        for path in map(Path, paths):
+            if path.is_file():
+                yield path
+            elif path.is_dir():
+                for root, dirs, files in os.walk(path):
+                    dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+                    for name in sorted(files):
+                        file_path = Path(root) / name
+                        if file_path.suffix.lower() in self.extensions:
+                            yield file_path
+
+    async def ingest_paths(self, paths: List[str], category: str = "documents",
+                           importance: int = 5, persona_id: Optional[int] = None) -> Dict[str, Any]:
+        """Ingest files and directories, skipping files whose content is already in the manifest"""
+        manifest = IngestionManifest(self.manifest_path) if self.manifest_path else None
+        stats = {"files_seen": 0, "files_skipped": 0}
+
+        async def documents() -> AsyncIterator[_Document]:
+            for path in self.iter_files(paths):
+                stats["files_seen"] += 1
+                raw = await asyncio.get_running_loop().run_in_executor(None, path.read_bytes)
+                digest = hashlib.sha256(raw).hexdigest()
+                source = str(path.resolve())
+                if manifest is not None and manifest.is_current(source, digest):
+                    stats["files_skipped"] += 1
+                    continue
+                yield _Document(
+                    source=source,
+                    text=raw.decode("utf-8", errors="replace"),
+                    digest=digest,
+                    metadata={"source": source, "file_name": path.name}
+                )
+
+        result = await self._run(documents(), category, importance, persona_id, manifest)
+        result.update(stats)
+        return result
+
+    async def ingest_texts(self, texts: List[str], metadata: Optional[List[Dict[str, Any]]] = None,
+                           category: str = "general", importance: int = 5,
+                           persona_id: Optional[int] = None) -> Dict[str, Any]:
+        """Chunk and store in-memory texts"""
+        metadata = metadata or []
+
+        async def documents() -> AsyncIterator[_Document]:
+            for i, text in enumerate(texts):
+                meta = metadata[i] if i < len(metadata) else {}
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                yield _Document(source=f"text:{digest[:16]}", text=text, metadata=dict(meta))
+
+        return await self._run(documents(), category, importance, persona_id, None)
+
+    async def _run(self, documents: AsyncIterator[_Document], category: str, importance: int,
+                   persona_id: Optional[int], manifest: Optional[IngestionManifest]) -> Dict[str, Any]:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_pending_batches)
+        stats = {
+            "documents": 0,
+            "documents_failed": 0,
+            "chunks": 0,
+            "tokens": 0,
+            "batches": 0,
+            "vector_ids": [],
+            "memory_ids": [],
+            "vector_store": "enabled" if self.vector_enabled else "unavailable"
+        }
+
+        async def produce():
+            batch: List[Tuple[Chunk, _DocumentProgress]] = []
+            async for document in documents:
+                chunks = await asyncio.get_running_loop().run_in_executor(
+                    None, self.chunker.chunk, document.text, document.source, document.metadata
+                )
+                if not chunks:
+                    continue
+                progress = _DocumentProgress(document, len(chunks))
+                for chunk in chunks:
+                    batch.append((chunk, progress))
+                    if len(batch) >= self.batch_size:
+                        await queue.put(batch)
+                        batch = []
+            if batch:
+                await queue.put(batch)
+            await queue.put(None)
+
+        async def consume():
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                await self._write_batch(batch, category, importance, persona_id, stats)
+                finished = {id(progress): progress for _, progress in batch if progress.remaining == 0}
+                for progress in finished.values():
+                    await self._finish_document(progress, manifest, stats)
+                    if manifest is not None and stats["documents"] % self.manifest_save_every == 0:
+                        manifest.save()
+
+        producer = asyncio.create_task(produce())
+        consumer = asyncio.create_task(consume())
+        try:
+            await asyncio.gather(producer, consumer)
+        except BaseException:
+            producer.cancel()
+            consumer.cancel()
+            raise
+        finally:
+            if manifest is not None:
+                manifest.save()
+
+        return stats
+
+    async def _write_batch(self, batch: List[Tuple[Chunk, "_DocumentProgress"]], category: str,
+                           importance: int, persona_id: Optional[int], stats: Dict[str, Any]):
+        """Embed and store one batch in both stores"""
+        chunks = [chunk for chunk, _ in batch]
+        stats["batches"] += 1
+        stats["chunks"] += len(chunks)
+        stats["tokens"] += sum(chunk.token_count for chunk in chunks)
+
+        vector_ok = True
+        if self.vector_enabled:
+            result = await self.vector_tool.execute(
+                operation="store",
+                texts=[chunk.text for chunk in chunks],
+                metadata=[{
+                    **chunk.metadata,
+                    "chunk_index": chunk.index,
+                    "heading": chunk.heading,
+                    "category": category
+                } for chunk in chunks],
+                ids=[chunk.chunk_id for chunk in chunks]
+            )
+            vector_ok = result.success
+            if not vector_ok:
+                logger.warning(f"Vector store rejected batch: {result.message}")
+
+        memory_rows = [
+            (position, chunk) for position, chunk in enumerate(chunks)
+            if len(chunk.text) > self.min_memory_chars
+        ]
+        memory_ids: Dict[int, int] = {}
+        if self.sql_tool is not None and memory_rows:
+            result = await self.sql_tool.store_memories_bulk([
+                {
+                    "content": chunk.text,
+                    "category": category,
+                    "importance": importance,
+                    "persona_id": persona_id,
+                    "tags": chunk.metadata.get("tags", []) + ([chunk.heading] if chunk.heading else [])
+                }
+                for _, chunk in memory_rows
+            ])
+            if result.success:
+                memory_ids = dict(zip((p for p, _ in memory_rows), result.data["memory_ids"]))
+            else:
+                vector_ok = False
+
+        for position, (chunk, progress) in enumerate(batch):
+            progress.remaining -= 1
+            progress.failed = progress.failed or not vector_ok
+            if self.vector_enabled and vector_ok:
+                progress.vector_ids.append(chunk.chunk_id)
+            if position in memory_ids:
+                progress.memory_ids.append(memory_ids[position])
+
+    async def _finish_document(self, progress: "_DocumentProgress",
+                               manifest: Optional[IngestionManifest], stats: Dict[str, Any]):
+        """Record a fully written document and drop what an older version left behind"""
+        document = progress.document
+        if progress.failed:
+            # Leave nothing half-written; the document is retried next run
+            stats["documents_failed"] += 1
+            if progress.memory_ids and self.sql_tool is not None:
+                await self.sql_tool.delete_memories_bulk(progress.memory_ids)
+            return
+
+        stats["documents"] += 1
+        stats["vector_ids"].extend(progress.vector_ids)
+        stats["memory_ids"].extend(progress.memory_ids)
+
+        if manifest is None or document.digest is None:
+            return
+
+        previous = manifest.get(document.source)
+        if previous:
+            stale_vectors = sorted(set(previous.get("vector_ids", [])) - set(progress.vector_ids))
+            if stale_vectors and self.vector_enabled:
+                await self.vector_tool.execute(operation="delete", ids=stale_vectors)
+            if previous.get("memory_ids") and self.sql_tool is not None:
+                await self.sql_tool.delete_memories_bulk(previous["memory_ids"])
+
+        manifest.record(document.source, document.digest, progress.vector_ids, progress.memory_ids)
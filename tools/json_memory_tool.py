@@ -4,11 +4,16 @@ JSON Memory Tool - Enhanced BASED GOD CLI
 Structured memory storage with JSON format and advanced querying
 """
 
+import asyncio
+import atexit
 import json
 import logging
 import os
+import threading
+import time
+import weakref
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Set, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 import hashlib
@@ -31,6 +36,12 @@ class MemoryEntry:
     access_count: int = 0
     last_accessed: Optional[datetime] = None
 
+def _flush_on_exit(tool_ref: "weakref.ReferenceType[JSONMemoryTool]") -> None:
+    """atexit hook that flushes pending writes of a still-alive tool"""
+    tool = tool_ref()
+    if tool is not None:
+        tool.flush()
+
 class JSONMemoryTool(BaseTool):
     """
     Advanced JSON-based memory system with structured storage
@@ -40,7 +51,9 @@ class JSONMemoryTool(BaseTool):
                  memory_file: str = "data/json_memory.json",
                  max_entries: int = 10000,
                  auto_backup: bool = True,
-                 backup_interval: int = 100):
+                 backup_interval: int = 100,
+                 flush_interval: float = 2.0,
+                 flush_threshold: int = 50):
         super().__init__(
             name="JSON Memory Tool",
             description="Structured memory storage with JSON format and advanced querying capabilities",
@@ -62,6 +75,29 @@ class JSONMemoryTool(BaseTool):
         self.backup_interval = backup_interval
         self.logger = logging.getLogger(__name__)
         
+        # Write coalescing: mutations mark entries dirty and are persisted in
+        # one full-file save once flush_interval seconds have passed or
+        # flush_threshold entries are dirty. flush_interval <= 0 writes through.
+        self.flush_interval = flush_interval
+        self.flush_threshold = max(1, flush_threshold)
+        self._dirty_entries: Set[str] = set()
+        self._pending_writes = 0
+        self._first_dirty_at: Optional[float] = None
+        self._flush_lock = threading.RLock()
+        self._flusher_task: Optional[asyncio.Task] = None
+        self.persistence_stats = {
+            "flushes": 0,
+            "writes_coalesced": 0,
+            "last_flush_writes": 0,
+            "max_flush_writes": 0,
+            "failed_flushes": 0,
+            "backups": 0
+        }
+        # Auto-backups are checked at flush time, once backup_interval
+        # entries have been stored since the last one
+        self._entries_since_backup = 0
+        atexit.register(_flush_on_exit, weakref.ref(self))
+        
         # Ensure directory exists
         self.memory_file.parent.mkdir(parents=True, exist_ok=True)
         
@@ -112,13 +148,12 @@ class JSONMemoryTool(BaseTool):
             if data is None:
                 data = self.memory_data
             
-            # Create backup if needed
-            if self.auto_backup and self.entry_count % self.backup_interval == 0:
-                self._create_backup()
-            
-            # Save to file
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
+            # Save to a temp file and swap it in so a crash mid-write
+            # never leaves a truncated memory file behind
+            tmp_file = self.memory_file.with_suffix(self.memory_file.suffix + '.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            os.replace(tmp_file, self.memory_file)
             
             return True
             
@@ -129,14 +164,126 @@ class JSONMemoryTool(BaseTool):
     def _create_backup(self) -> None:
         """Create backup of memory file"""
         try:
-            backup_file = self.memory_file.with_suffix(f'.backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+            backup_file = self.memory_file.with_suffix(f'.backup_{datetime.now().strftime("%Y%m%d_%H%M%S_%f")}.json')
             with open(self.memory_file, 'r', encoding='utf-8') as src:
                 with open(backup_file, 'w', encoding='utf-8') as dst:
                     dst.write(src.read())
+            self._entries_since_backup = 0
+            self.persistence_stats["backups"] += 1
             self.logger.info(f"Memory backup created: {backup_file}")
         except Exception as e:
             self.logger.error(f"Failed to create backup: {e}")
-    
+
+    def _mark_dirty(self, entry_id: str) -> bool:
+        """Record a mutation and flush if the interval or threshold is reached"""
+        with self._flush_lock:
+            self._dirty_entries.add(entry_id)
+            self._pending_writes += 1
+            if self._first_dirty_at is None:
+                self._first_dirty_at = time.monotonic()
+
+            due = (
+                self.flush_interval <= 0
+                or len(self._dirty_entries) >= self.flush_threshold
+                or time.monotonic() - self._first_dirty_at >= self.flush_interval
+            )
+
+        if due:
+            return self.flush()
+
+        self._ensure_background_flusher()
+        return True
+
+    def flush(self) -> bool:
+        """Persist all pending writes in a single save"""
+        with self._flush_lock:
+            if not self._pending_writes:
+                return True
+
+            writes = self._pending_writes
+            if not self._save_memory():
+                self.persistence_stats["failed_flushes"] += 1
+                return False
+
+            self._dirty_entries.clear()
+            self._pending_writes = 0
+            self._first_dirty_at = None
+
+            self.persistence_stats["flushes"] += 1
+            self.persistence_stats["writes_coalesced"] += writes
+            self.persistence_stats["last_flush_writes"] = writes
+            self.persistence_stats["max_flush_writes"] = max(self.persistence_stats["max_flush_writes"], writes)
+
+            if self.auto_backup and self._entries_since_backup >= self.backup_interval:
+                self._create_backup()
+            return True
+
+    def _ensure_background_flusher(self) -> None:
+        """Start the background flusher when running inside an event loop"""
+        if self._flusher_task is not None and not self._flusher_task.done():
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No loop: pending writes go out on the next due write, flush() or exit
+            return
+        self.start_background_flusher()
+
+    def start_background_flusher(self) -> asyncio.Task:
+        """Start the asyncio task that flushes pending writes periodically"""
+        if self._flusher_task is None or self._flusher_task.done():
+            self._flusher_task = asyncio.get_running_loop().create_task(self._background_flush_loop())
+        return self._flusher_task
+
+    async def stop_background_flusher(self) -> None:
+        """Stop the background flusher and persist anything still pending"""
+        task, self._flusher_task = self._flusher_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self.flush()
+
+    async def _background_flush_loop(self) -> None:
+        """Flush pending writes once they are older than flush_interval"""
+        interval = self.flush_interval if self.flush_interval > 0 else 1.0
+        while True:
+            await asyncio.sleep(interval)
+            first_dirty_at = self._first_dirty_at
+            if first_dirty_at is not None and time.monotonic() - first_dirty_at >= self.flush_interval:
+                self.flush()
+
+    async def close(self) -> None:
+        """Flush pending writes and release the background flusher"""
+        await self.stop_background_flusher()
+
+    def __enter__(self) -> "JSONMemoryTool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.flush()
+
+    async def __aenter__(self) -> "JSONMemoryTool":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    def get_persistence_stats(self) -> Dict[str, Any]:
+        """Get write-coalescing metrics"""
+        flushes = self.persistence_stats["flushes"]
+        return {
+            **self.persistence_stats,
+            "average_writes_per_flush": self.persistence_stats["writes_coalesced"] / flushes if flushes else 0.0,
+            "pending_writes": self._pending_writes,
+            "dirty_entries": len(self._dirty_entries),
+            "flush_interval": self.flush_interval,
+            "flush_threshold": self.flush_threshold,
+            "background_flusher_running": self._flusher_task is not None and not self._flusher_task.done()
+        }
+
     def _generate_entry_id(self) -> str:
         """Generate unique entry ID"""
         return str(uuid.uuid4())
@@ -202,6 +349,8 @@ class JSONMemoryTool(BaseTool):
                 return await self._export_memory(kwargs)
             elif operation == "backup":
                 return await self._create_backup_operation(kwargs)
+            elif operation == "flush":
+                return await self._flush_operation(kwargs)
             else:
                 return ToolResponse(
                     success=False,
@@ -264,8 +413,9 @@ class JSONMemoryTool(BaseTool):
             if tag not in self.memory_data["metadata"]["tags"]:
                 self.memory_data["metadata"]["tags"].append(tag)
         
-        # Save to file
-        if self._save_memory():
+        # Queue the write; it is persisted with the next flush
+        self._entries_since_backup += 1
+        if self._mark_dirty(entry.id):
             self.entry_count += 1
             return ToolResponse(
                 success=True,
@@ -311,8 +461,8 @@ class JSONMemoryTool(BaseTool):
         entry_data["access_count"] += 1
         entry_data["last_accessed"] = datetime.now().isoformat()
         
-        # Save changes
-        self._save_memory()
+        # Access counts are cheap to lose, so they always ride the next flush
+        self._mark_dirty(entry_id)
         
         return ToolResponse(
             success=True,
@@ -477,7 +627,7 @@ class JSONMemoryTool(BaseTool):
         self.memory_data["metadata"]["total_entries"] = len(self.memory_data["entries"])
         
         # Save changes
-        if self._save_memory():
+        if self._mark_dirty(entry_id):
             return ToolResponse(
                 success=True,
                 message=f"Memory entry deleted: {entry_id}",
@@ -532,7 +682,7 @@ class JSONMemoryTool(BaseTool):
         self._update_indexes(entry, "add")
         
         # Save changes
-        if self._save_memory():
+        if self._mark_dirty(entry_id):
             return ToolResponse(
                 success=True,
                 message=f"Memory entry updated: {entry_id}",
@@ -586,6 +736,9 @@ class JSONMemoryTool(BaseTool):
         ]
         analytics["recent_activity"]["entries_last_7_days"] = len(recent_entries)
         
+        # Write-coalescing metrics
+        analytics["persistence"] = self.get_persistence_stats()
+        
         return ToolResponse(
             success=True,
             message="Memory analytics generated",
@@ -659,6 +812,13 @@ class JSONMemoryTool(BaseTool):
     async def _create_backup_operation(self, kwargs: Dict[str, Any]) -> ToolResponse:
         """Create manual backup"""
         try:
+            # Pending writes go to disk first so the copy is complete
+            if not self.flush():
+                return ToolResponse(
+                    success=False,
+                    message="Failed to create backup: pending writes could not be flushed",
+                    status=ToolStatus.FAILED
+                )
             self._create_backup()
             return ToolResponse(
                 success=True,
@@ -673,6 +833,22 @@ class JSONMemoryTool(BaseTool):
                 status=ToolStatus.FAILED
             )
     
+    async def _flush_operation(self, kwargs: Dict[str, Any]) -> ToolResponse:
+        """Persist pending writes immediately"""
+        pending = self._pending_writes
+        if self.flush():
+            return ToolResponse(
+                success=True,
+                message=f"Flushed {pending} pending memory writes",
+                data=self.get_persistence_stats(),
+                status=ToolStatus.SUCCESS
+            )
+        return ToolResponse(
+            success=False,
+            message="Failed to flush memory to file",
+            status=ToolStatus.FAILED
+        )
+    
     def _remove_least_important_entry(self) -> None:
         """Remove the least important entry when at capacity"""
         if not self.memory_data["entries"]:
@@ -699,7 +875,7 @@ class JSONMemoryTool(BaseTool):
             "properties": {
                 "operation": {
                     "type": "string",
-                    "enum": ["store", "retrieve", "search", "query", "delete", "update", "analytics", "export", "backup"],
+                    "enum": ["store", "retrieve", "search", "query", "delete", "update", "analytics", "export", "backup", "flush"],
                     "description": "JSON memory operation to perform",
                     "default": "store"
                 },
@@ -792,4 +968,4 @@ class JSONMemoryTool(BaseTool):
     
     async def export(self, format: str = "json", filters: Dict[str, Any] = None) -> ToolResponse:
         """Export memory"""
-        return await self.execute(operation="export", format=format, filters=filters or {}) 
\ No newline at end of file
+        return await self.execute(operation="export", format=format, filters=filters or {})
@@ -0,0 +1,41 @@
+"""
+Latency Stats - Enhanced BASED GOD CLI
+Rolling latency samples with percentile summaries
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List
+
+
+def percentile(samples: Iterable[float], q: float) -> float:
+    """Linear-interpolated q-th percentile (0-100); 0.0 for no samples"""
+    ordered: List[float] = sorted(samples)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class LatencyTracker:
+    """Keeps the most recent max_samples latencies in milliseconds"""
+
+    def __init__(self, max_samples: int = 1000):
+        self._samples: Deque[float] = deque(maxlen=max_samples)
+        self.count = 0
+
+    def record(self, latency_ms: float):
+        self._samples.append(latency_ms)
+        self.count += 1
+
+    def summary(self) -> Dict[str, Any]:
+        samples = list(self._samples)
+        return {
+            "count": self.count,
+            "mean_ms": sum(samples) / len(samples) if samples else 0.0,
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "max_ms": max(samples) if samples else 0.0
+        }
@@ -4,16 +4,23 @@ LangChain-powered LLM integration with Agent Zero patterns
 """
 
 import asyncio
+import inspect
 import json
 import logging
-from typing import Dict, Any, Optional, List, Union
-from dataclasses import dataclass
+import time
+from typing import Dict, Any, AsyncIterator, Callable, Optional, List, Union
+from dataclasses import dataclass, field
 from datetime import datetime
 import openai
-from openai import AsyncOpenAI
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from .base_tool import BaseTool, ToolResponse
+from .conversation_memory import ConversationMemory
+from .deepseek_client import get_deepseek_registry
+from .prompt_layout import get_prefix_cache_stats
+from .request_scheduler import RequestPriority, request_context
+from .retry_policy import CircuitOpenError, RetryPolicy, get_retry_policy
+from .token_counter import get_token_counter
 from config.api_keys import get_deepseek_config, is_deepseek_key_valid
 
 @dataclass
@@ -29,6 +36,62 @@ class CompletionConfig:
     stop: Optional[List[str]] = None
     response_format: Optional[Dict[str, str]] = None
 
+@dataclass
+class StreamMetrics:
+    """Timing and throughput for one streamed completion"""
+    model: str = ""
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    chunks: int = 0
+    estimated_tokens: int = 0
+    # Reported by the server in the final chunk when it supports include_usage
+    completion_tokens: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    cancelled: bool = False
+
+    def record_delta(self, tokens: int):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.chunks += 1
+        self.estimated_tokens += tokens
+
+    def finish(self):
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+
+    @property
+    def tokens(self) -> int:
+        return self.completion_tokens if self.completion_tokens is not None else self.estimated_tokens
+
+    @property
+    def ttft_ms(self) -> Optional[float]:
+        if self.first_token_at is None:
+            return None
+        return (self.first_token_at - self.started_at) * 1000
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Generation rate after the first token"""
+        if self.first_token_at is None:
+            return 0.0
+        end = self.finished_at or time.perf_counter()
+        elapsed = end - self.first_token_at
+        return self.tokens / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        end = self.finished_at or time.perf_counter()
+        return {
+            "model": self.model,
+            "ttft_ms": self.ttft_ms,
+            "total_ms": (end - self.started_at) * 1000,
+            "chunks": self.chunks,
+            "tokens": self.tokens,
+            "prompt_tokens": self.prompt_tokens,
+            "tokens_per_second": self.tokens_per_second,
+            "cancelled": self.cancelled
+        }
+
 class LLMQueryTool(BaseTool):
     """
     Enhanced LLM Query Tool with advanced completion capabilities
@@ -38,7 +101,9 @@ class LLMQueryTool(BaseTool):
     def __init__(self, 
                  api_key: str = None,
                  base_url: str = None,
-                 default_model: str = "deepseek-chat"):
+                 default_model: str = "deepseek-chat",
+                 retry_policy: Optional[RetryPolicy] = None,
+                 history_token_budget: int = 4000):
     
         """Initialize Enhanced LLM Query Tool"""
         super().__init__(
@@ -70,11 +135,13 @@ class LLMQueryTool(BaseTool):
         if not is_deepseek_key_valid():
             logging.warning("⚠️ DeepSeek API key appears to be invalid. Please update it in config/api_keys.py")
         
-        # Initialize OpenAI client for FIM/prefix completions
-        self.openai_client = AsyncOpenAI(
-            api_key=self.api_key,
-            base_url=self.base_url
-        )
+        # Retries are owned by the shared policy, so SDK-level retries are off
+        self.retry_policy = retry_policy or get_retry_policy()
+        self.chat_endpoint = f"{self.base_url.rstrip('/')}/chat/completions"
+        
+        # Shared pooled client for FIM/prefix completions
+        self.client_registry = get_deepseek_registry()
+        self.openai_client = self.client_registry.get_client(self.api_key, self.base_url).with_options(max_retries=0)
         
         # Initialize LangChain providers with enhanced models
         self.providers = {}
@@ -102,19 +169,33 @@ class LLMQueryTool(BaseTool):
             },
         }
         
-        # Context management
-        self.conversation_history = []
-        self.max_history_length = 50
+        # DeepSeek context-cache hits, per call site
+        self.cache_stats = get_prefix_cache_stats()
+        
+        # Streaming
+        self.token_counter = get_token_counter()
+        self.last_stream_metrics: Optional[StreamMetrics] = None
+        
+        # Context management: history costs at most history_token_budget prompt tokens
+        self.history = ConversationMemory(
+            token_budget=history_token_budget,
+            summarizer=self._summarize_history,
+            counter=self.token_counter
+        )
         
         # Error handling
-        self.max_retries = 3
-        self.retry_delay = 1.0
+        self.max_retries = self.retry_policy.max_retries
+        self.retry_delay = self.retry_policy.base_delay
         
         # Logging
         self.logger = logging.getLogger(__name__)
         
     def _initialize_providers(self) -> Any:
-        """Initialize LangChain providers with enhanced configurations"""
+        """
+        Initialize LangChain providers with enhanced configurations
+        ainvoke() makes plain requests so responses keep their usage (including
+        DeepSeek's cache-hit counts); astream() still streams
+        """
         # DeepSeek Chat model (primary)
         self.providers["deepseek_chat"] = ChatOpenAI(
             model="deepseek-chat",
@@ -122,7 +203,9 @@ class LLMQueryTool(BaseTool):
             api_key=self.api_key,
             base_url=self.base_url,
             max_tokens=2000,
-            streaming=True
+            streaming=False,
+            max_retries=0,
+            http_async_client=self.client_registry.http_client
         )
         
         # DeepSeek Coder model (for programming tasks)
@@ -132,7 +215,9 @@ class LLMQueryTool(BaseTool):
             api_key=self.api_key,
             base_url=self.base_url,
             max_tokens=4000,
-            streaming=True
+            streaming=False,
+            max_retries=0,
+            http_async_client=self.client_registry.http_client
         )
         
         # DeepSeek Reasoner model (for complex reasoning)
@@ -142,7 +227,9 @@ class LLMQueryTool(BaseTool):
             api_key=self.api_key,
             base_url=self.base_url,
             max_tokens=8000,
-            streaming=True
+            streaming=False,
+            max_retries=0,
+            http_async_client=self.client_registry.http_client
         )
     
     async def execute(self, **kwargs) -> ToolResponse:
@@ -158,6 +245,8 @@ class LLMQueryTool(BaseTool):
                 return await self.stream_completion(**kwargs)
             elif mode == "function":
                 return await self.function_call(**kwargs)
+            elif mode == "batch":
+                return await self.batch_complete(**kwargs)
             else:
                 return await self.chat_completion(**kwargs)
                 
@@ -179,15 +268,17 @@ class LLMQueryTool(BaseTool):
             temperature = kwargs.get("temperature", 0.7)
             max_tokens = kwargs.get("max_tokens", 2000)
             stream = kwargs.get("stream", False)
+            use_history = kwargs.get("use_history", True)
+            call_site = kwargs.get("call_site", "chat")
             
-            # Build messages
+            # Build messages; the system message leads so it stays a cacheable prefix
             messages = []
             if system_message:
                 messages.append(SystemMessage(content=system_message))
             
-            # Add conversation history
-            for msg in self.conversation_history[-10:]:  # Last 10 messages
-                messages.append(msg)
+            # Add pinned messages, the rolling summary and recent turns
+            if use_history:
+                messages.extend(self.history.messages())
             
             # Add current message
             messages.append(HumanMessage(content=prompt))
@@ -199,17 +290,12 @@ class LLMQueryTool(BaseTool):
             if stream:
                 return await self._stream_completion(provider, messages, temperature, max_tokens)
             else:
-                response = await provider.ainvoke(messages)
+                response = await self._call(lambda: provider.ainvoke(messages))
+                self.cache_stats.record(call_site, response.response_metadata.get("token_usage"))
                 
                 # Update conversation history
-                self.conversation_history.extend([
-                    HumanMessage(content=prompt),
-                    response
-                ])
-                
-                # Trim history if too long
-                if len(self.conversation_history) > self.max_history_length:
-                    self.conversation_history = self.conversation_history[-self.max_history_length:]
+                if use_history:
+                    self.history.extend([HumanMessage(content=prompt), response])
                 
                 return ToolResponse(
                     success=True,
@@ -240,14 +326,15 @@ class LLMQueryTool(BaseTool):
             fim_prompt = f"{language_hint}<PRE>{prefix}<MID>{suffix}<SUF>"
             
             # Execute completion
-            response = await self.openai_client.chat.completions.create(
+            response = await self._call(lambda: self.openai_client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": fim_prompt}],
                 temperature=temperature,
                 max_tokens=max_tokens,
                 stream=False
-            )
+            ))
             
+            self.cache_stats.record(kwargs.get("call_site", "fim"), response.usage)
             completion = response.choices[0].message.content
             
             # Post-process completion
@@ -290,14 +377,15 @@ class LLMQueryTool(BaseTool):
                 prompt = f"Continue the following text:\n\n{prefix}"
             
             # Execute completion
-            response = await self.openai_client.chat.completions.create(
+            response = await self._call(lambda: self.openai_client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=temperature,
                 max_tokens=max_tokens,
                 stream=False
-            )
+            ))
             
+            self.cache_stats.record(kwargs.get("call_site", "prefix"), response.usage)
             completion = response.choices[0].message.content
             
             # Post-process completion
@@ -318,35 +406,128 @@ class LLMQueryTool(BaseTool):
         except Exception as e:
             return await self._handle_error(e, "prefix completion")
     
-    async def stream_completion(self, **kwargs) -> ToolResponse:
-        """Streaming completion with real-time output"""
-        try:
-            prompt = kwargs.get("prompt", "")
-            model = kwargs.get("model", "deepseek-chat")
-            temperature = kwargs.get("temperature", 0.7)
-            max_tokens = kwargs.get("max_tokens", 2000)
-            
-            # Execute streaming completion
-            stream = await self.openai_client.chat.completions.create(
-                model=model,
+    @property
+    def conversation_history(self) -> List[BaseMessage]:
+        """Turns still kept verbatim; older ones live on in the rolling summary"""
+        return self.history.turns
+    
+    def pin_message(self, key: str, content: str):
+        """Pin a system or persona message ahead of every chat turn"""
+        self.history.pin(key, SystemMessage(content=content))
+    
+    def _history_messages(self) -> List[Dict[str, str]]:
+        """Budgeted history as OpenAI-style message dicts"""
+        roles = {"human": "user", "ai": "assistant", "system": "system"}
+        return [
+            {"role": roles.get(message.type, "user"), "content": message.content}
+            for message in self.history.messages()
+        ]
+    
+    def _remember_exchange(self, prompt: str, response: str):
+        """Append one user/assistant turn to history"""
+        self.history.extend([HumanMessage(content=prompt), AIMessage(content=response)])
+    
+    async def _summarize_history(self, summary: str, messages: List[BaseMessage]) -> str:
+        """Fold turns that left the history window into the rolling summary"""
+        transcript = "\n".join(f"{message.type}: {message.content}" for message in messages)
+        prompt = (
+            "Update the running summary of a conversation with the new turns below. "
+            "Keep names, decisions, facts and open questions; drop pleasantries. "
+            "Reply with the summary only.\n\n"
+            f"Current summary:\n{summary or '(none)'}\n\n"
+            f"New turns:\n{self.token_counter.truncate(transcript, self.history.token_budget)}"
+        )
+        # Runs in its own task, so tagging it here never demotes the user's request
+        with request_context(RequestPriority.BACKGROUND, "history_summary"):
+            response = await self._call(lambda: self.openai_client.chat.completions.create(
+                model="deepseek-chat",
                 messages=[{"role": "user", "content": prompt}],
-                temperature=temperature,
-                max_tokens=max_tokens,
-                stream=True
-            )
-            
-            # Collect streamed response
-            full_response = ""
+                temperature=0.2,
+                max_tokens=self.history.summary_budget
+            ))
+        self.cache_stats.record("history_summary", response.usage)
+        return response.choices[0].message.content or ""
+    
+    async def stream_chat(self, prompt: str, system_message: str = "",
+                          model: Optional[str] = None, temperature: float = 0.7,
+                          max_tokens: int = 2000, metrics: Optional[StreamMetrics] = None,
+                          use_history: bool = True, call_site: str = "stream") -> AsyncIterator[str]:
+        """
+        Yield response text deltas as they arrive
+        Close the generator or cancel the consuming task to abort; the upstream
+        stream is closed and a partial answer is not added to history
+        """
+        metrics = metrics if metrics is not None else StreamMetrics()
+        metrics.model = model or self.default_model
+        self.last_stream_metrics = metrics
+        
+        messages = []
+        if system_message:
+            messages.append({"role": "system", "content": system_message})
+        if use_history:
+            messages.extend(self._history_messages())
+        messages.append({"role": "user", "content": prompt})
+        
+        # Only opening the stream is retried; once deltas flow they cannot be replayed
+        stream = await self._call(lambda: self.openai_client.chat.completions.create(
+            model=metrics.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True}
+        ))
+        
+        parts = []
+        try:
             async for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    full_response += chunk.choices[0].delta.content
+                usage = getattr(chunk, "usage", None)
+                if usage:
+                    metrics.completion_tokens = usage.completion_tokens
+                    metrics.prompt_tokens = usage.prompt_tokens
+                    self.cache_stats.record(call_site, usage)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    metrics.record_delta(self.token_counter.count(delta))
+                    parts.append(delta)
+                    yield delta
+            
+            metrics.finish()
+            if use_history:
+                self._remember_exchange(prompt, "".join(parts))
+        except (asyncio.CancelledError, GeneratorExit):
+            metrics.cancelled = True
+            raise
+        finally:
+            metrics.finish()
+            await stream.close()
+    
+    async def stream_completion(self, **kwargs) -> ToolResponse:
+        """Streaming completion collected into one response, with stream metrics"""
+        try:
+            metrics = StreamMetrics()
+            parts = []
+            async for delta in self.stream_chat(
+                kwargs.get("prompt", ""),
+                system_message=kwargs.get("system_message", ""),
+                model=kwargs.get("model", "deepseek-chat"),
+                temperature=kwargs.get("temperature", 0.7),
+                max_tokens=kwargs.get("max_tokens", 2000),
+                metrics=metrics,
+                use_history=kwargs.get("use_history", False),
+                call_site=kwargs.get("call_site", "stream")
+            ):
+                parts.append(delta)
             
             return ToolResponse(
                 success=True,
                 data={
-                    "response": full_response,
-                    "model": model,
+                    "response": "".join(parts),
+                    "model": metrics.model,
                     "streamed": True,
+                    "metrics": metrics.as_dict(),
                     "timestamp": datetime.now().isoformat()
                 },
                 message="Streaming completion successful"
@@ -355,6 +536,105 @@ class LLMQueryTool(BaseTool):
         except Exception as e:
             return await self._handle_error(e, "streaming completion")
     
+    async def batch_complete(self, prompts: Optional[List[str]] = None, system_message: str = "",
+                             model: Optional[str] = None, temperature: float = 0.7,
+                             max_tokens: int = 2000, max_concurrency: int = 8,
+                             on_result: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                             call_site: str = "batch", **kwargs) -> ToolResponse:
+        """
+        Complete many independent prompts concurrently, without history
+        Identical prompts are sent once. Results come back in input order and
+        a failed item does not fail the batch; on_result (sync or async) is
+        called with each item's result as soon as it is ready
+        """
+        prompts = list(prompts or [])
+        model = model or self.default_model
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        started = time.perf_counter()
+        
+        # Prompt -> input positions, so duplicates share one request
+        positions: Dict[str, List[int]] = {}
+        for index, prompt in enumerate(prompts):
+            positions.setdefault(prompt, []).append(index)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        
+        async def complete(prompt: str, indexes: List[int]):
+            async with semaphore:
+                item_started = time.perf_counter()
+                messages = [{"role": "system", "content": system_message}] if system_message else []
+                messages.append({"role": "user", "content": prompt})
+                try:
+                    response = await self._call(lambda: self.openai_client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=False
+                    ))
+                    self.cache_stats.record(call_site, response.usage)
+                    outcome = {
+                        "success": True,
+                        "response": response.choices[0].message.content,
+                        "usage": response.usage.model_dump() if response.usage else None,
+                        "error": None
+                    }
+                except Exception as e:
+                    self.logger.warning(f"Batch item failed: {e}")
+                    outcome = {"success": False, "response": None, "usage": None, "error": str(e)}
+                outcome["latency_ms"] = (time.perf_counter() - item_started) * 1000
+            
+            for position, index in enumerate(indexes):
+                results[index] = {"index": index, "prompt": prompt, **outcome,
+                                  "deduplicated": position > 0}
+                if on_result is not None:
+                    try:
+                        callback = on_result(results[index])
+                        if inspect.isawaitable(callback):
+                            await callback
+                    except Exception as e:
+                        self.logger.warning(f"Batch on_result callback failed: {e}")
+        
+        await asyncio.gather(*(complete(prompt, indexes) for prompt, indexes in positions.items()))
+        
+        failed = sum(1 for result in results if not result["success"])
+        return ToolResponse(
+            success=failed < len(results) or not results,
+            data={
+                "results": results,
+                "model": model,
+                "stats": {
+                    "items": len(prompts),
+                    "unique_prompts": len(positions),
+                    "deduplicated": len(prompts) - len(positions),
+                    "failed": failed,
+                    "max_concurrency": max_concurrency,
+                    "wall_ms": (time.perf_counter() - started) * 1000
+                },
+                "timestamp": datetime.now().isoformat()
+            },
+            message=f"Batch completion: {len(prompts) - failed}/{len(prompts)} succeeded"
+        )
+    
+    async def generate_response(self, prompt: str, model: Optional[str] = None,
+                                parameters: Optional[Dict[str, Any]] = None) -> str:
+        """Single history-free completion, for prompt-in/text-out clients like sub-agents"""
+        parameters = parameters or {}
+        response = await self.chat_completion(
+            prompt=prompt,
+            system_message=parameters.get("system_message", ""),
+            model=model or self.default_model,
+            use_history=False,
+            call_site=parameters.get("call_site", "generate_response")
+        )
+        if not response.success:
+            raise RuntimeError(response.message)
+        return response.data["response"]
+    
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """DeepSeek context-cache hit and miss tokens, overall and per call site"""
+        return self.cache_stats.get_statistics()
+    
     async def function_call(self, **kwargs) -> ToolResponse:
         """Function calling with custom tools"""
         try:
@@ -364,13 +644,14 @@ class LLMQueryTool(BaseTool):
             temperature = kwargs.get("temperature", 0.7)
             
             # Execute function call
-            response = await self.openai_client.chat.completions.create(
+            response = await self._call(lambda: self.openai_client.chat.completions.create(
                 model=model,
                 messages=[{"role": "user", "content": prompt}],
                 tools=functions,
                 tool_choice="auto",
                 temperature=temperature
-            )
+            ))
+            self.cache_stats.record(kwargs.get("call_site", "function"), response.usage)
             
             return ToolResponse(
                 success=True,
@@ -439,14 +720,23 @@ class LLMQueryTool(BaseTool):
         return completion.strip()
     
     async def _stream_completion(self, provider, messages, temperature, max_tokens) -> Any:
-        """Handle streaming completion"""
+        """Handle streaming completion through a LangChain provider"""
         try:
-            response = await provider.ainvoke(messages)
+            metrics = StreamMetrics(model=provider.model_name)
+            parts = []
+            async for chunk in provider.astream(messages):
+                if chunk.content:
+                    metrics.record_delta(self.token_counter.count(chunk.content))
+                    parts.append(chunk.content)
+            metrics.finish()
+            self.last_stream_metrics = metrics
+            
             return ToolResponse(
                 success=True,
                 data={
-                    "response": response.content,
+                    "response": "".join(parts),
                     "streamed": True,
+                    "metrics": metrics.as_dict(),
                     "timestamp": datetime.now().isoformat()
                 },
                 message="Streaming completion successful"
@@ -454,12 +744,22 @@ class LLMQueryTool(BaseTool):
         except Exception as e:
             return await self._handle_error(e, "streaming completion")
     
+    async def _call(self, fn):
+        """Run one API call under the shared retry policy and circuit breaker"""
+        return await self.retry_policy.call(self.chat_endpoint, fn)
+    
     async def _handle_error(self, error: Exception, operation: str) -> ToolResponse:
-        """Enhanced error handling with retry logic"""
+        """Turn a failure that survived the retry policy into a response"""
         self.logger.error(f"Error in {operation}: {str(error)}")
         
         # Check for specific error types
-        if "insufficient_quota" in str(error).lower() or "402" in str(error):
+        if isinstance(error, CircuitOpenError):
+            return ToolResponse(
+                success=False,
+                data={"error": "Circuit open", "retry_in": error.retry_in},
+                message=f"DeepSeek is failing; {operation} skipped for {error.retry_in:.0f}s."
+            )
+        elif "insufficient_quota" in str(error).lower() or "402" in str(error):
             return ToolResponse(
                 success=False,
                 data={"error": "Insufficient API quota"},
@@ -486,13 +786,21 @@ class LLMQueryTool(BaseTool):
             "parameters": {
                 "mode": {
                     "type": "string",
-                    "enum": ["chat", "fim", "prefix", "stream", "function"],
+                    "enum": ["chat", "fim", "prefix", "stream", "function", "batch"],
                     "description": "Completion mode to use"
                 },
                 "prompt": {
                     "type": "string",
                     "description": "Input prompt for completion"
                 },
+                "prompts": {
+                    "type": "array",
+                    "description": "Prompts for batch completion"
+                },
+                "max_concurrency": {
+                    "type": "integer",
+                    "description": "Concurrent requests for batch completion"
+                },
                 "prefix": {
                     "type": "string",
                     "description": "Prefix for FIM or prefix completion"
@@ -534,23 +842,21 @@ class LLMQueryTool(BaseTool):
         }
     
     def clear_history(self) -> Any:
-        """Clear conversation history"""
-        self.conversation_history = []
+        """Clear conversation history and its summary; pinned messages stay"""
+        self.history.clear()
     
     def get_history(self) -> List:
         """Get conversation history"""
-        return self.conversation_history.copy()
+        return self.conversation_history
     
     def add_to_history(self, role: str, content: str):
     
         """Add message to conversation history"""
         if role == "user":
-            self.conversation_history.append(HumanMessage(content=content))
+            self.history.append(HumanMessage(content=content))
         elif role == "assistant":
-            # Create a simple message object for assistant responses
-            from langchain_core.messages import AIMessage
-            self.conversation_history.append(AIMessage(content=content))
-        
-        # Trim history if too long
-        if len(self.conversation_history) > self.max_history_length:
-            self.conversation_history = self.conversation_history[-self.max_history_length:]
\ No newline at end of file
+            self.history.append(AIMessage(content=content))
+    
+    def get_history_stats(self) -> Dict[str, Any]:
+        """Token usage, eviction and summary counts for the history window"""
+        return self.history.get_stats()
@@ -7,6 +7,9 @@ from typing import Any, Dict, List, Optional
 import logging
 import openai
 from .base_tool import BaseTool, ToolResponse, ToolStatus
+from .completion_cache import CompletionCache
+from .deepseek_client import get_deepseek_client
+from .retry_policy import get_retry_policy
 from config.api_keys import get_deepseek_config
 
 class PrefixCompletionTool(BaseTool):
@@ -31,6 +34,9 @@ class PrefixCompletionTool(BaseTool):
             ]
         )
         self.client = None
+        self.endpoint = None
+        self.retry_policy = get_retry_policy()
+        self.completion_cache = CompletionCache()
         self._init_client()
     
     def _init_client(self) -> Any:
@@ -42,10 +48,9 @@ class PrefixCompletionTool(BaseTool):
             # Use beta API for prefix completion
             deepseek_base_url = "https://api.deepseek.com/beta"
             
-            self.client = openai.AsyncOpenAI(
-                api_key=deepseek_api_key,
-                base_url=deepseek_base_url
-            )
+            # Retries come from the shared policy rather than the SDK
+            self.client = get_deepseek_client(deepseek_api_key, deepseek_base_url).with_options(max_retries=0)
+            self.endpoint = f"{deepseek_base_url}/chat/completions"
             logging.info("[SUCCESS] Prefix Completion Tool initialized successfully")
         except Exception as e:
             logging.info(f"[ERROR] Prefix Completion Tool initialization failed: {str(e)}")
@@ -60,6 +65,7 @@ class PrefixCompletionTool(BaseTool):
         model = kwargs.get("model", "deepseek-chat")
         stop_sequences = kwargs.get("stop", [])
         top_p = kwargs.get("top_p", 0.95)
+        use_cache = kwargs.get("use_cache", True)
         
         if not prefix:
             return ToolResponse(
@@ -87,11 +93,28 @@ class PrefixCompletionTool(BaseTool):
                 if not stop_sequences:
                     stop_sequences = ["\n\n", "```"]
             
+            # Mode stands in for language; there is no suffix to key on
+            cached = self.completion_cache.lookup(prefix, "", mode, model) if use_cache else None
+            if cached is not None:
+                completion, hit = cached
+                return ToolResponse(
+                    success=True,
+                    message=f"Prefix completion served from cache ({hit}, {mode} mode)",
+                    data={
+                        "completion": completion,
+                        "full_text": prefix + completion,
+                        "mode": mode,
+                        "model": model,
+                        "analysis": self._analyze_completion(prefix, completion, mode)
+                    },
+                    metadata={"cache_hit": hit, "tokens_used": 0}
+                )
+            
             # Prepare system message based on mode
             system_content = self._get_system_message(mode)
             
             # Execute completion
-            response = await self.client.chat.completions.create(
+            response = await self.retry_policy.call(self.endpoint, lambda: self.client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": system_content},
@@ -101,12 +124,14 @@ class PrefixCompletionTool(BaseTool):
                 temperature=temperature,
                 top_p=top_p,
                 stop=stop_sequences if stop_sequences else None
-            )
+            ))
             
             completion = response.choices[0].message.content
             
             # Post-process completion
             completion = self._post_process(completion, mode, prefix)
+            if use_cache:
+                self.completion_cache.store(prefix, "", mode, model, completion)
             
             # Analyze the completion
             analysis = self._analyze_completion(prefix, completion, mode)
@@ -136,6 +161,10 @@ class PrefixCompletionTool(BaseTool):
                 status=ToolStatus.FAILED
             )
     
+    def get_cache_statistics(self) -> Dict[str, Any]:
+        """Completion cache hit rate, including typed-ahead extension hits"""
+        return self.completion_cache.get_statistics()
+    
     def _detect_mode(self, prefix: str) -> str:
         """Detect whether the prefix is code or text"""
         code_indicators = [
@@ -278,6 +307,11 @@ class PrefixCompletionTool(BaseTool):
                     "items": {"type": "string"},
                     "description": "Stop sequences for completion",
                     "default": []
+                },
+                "use_cache": {
+                    "type": "boolean",
+                    "description": "Reuse earlier completions for the same prefix",
+                    "default": True
                 }
             },
             "required": ["prefix"]
@@ -354,6 +354,9 @@ class PromptCache:
             
             # Store in database
             self._store_in_database(entry)
+
+            # The database keeps the serialized form; memory hits return the response itself
+            entry.value = response
     
     def clear(self):
         """Clear all cache entries"""
@@ -0,0 +1,137 @@
+"""
+Prompt Layout - Enhanced BASED GOD CLI
+Stable-first prompt assembly and DeepSeek context-cache accounting
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class PromptLayout:
+    """
+    Builds prompts so consecutive calls share the longest possible prefix
+    DeepSeek caches prompt prefixes, so stable sections (system, persona,
+    tool schemas, instructions) are always emitted first and in a fixed
+    order; per-request context and the query always come last
+    """
+
+    STABLE_SECTIONS = ("system", "persona", "tools", "instructions")
+
+    def __init__(self, call_site: str):
+        self.call_site = call_site
+        self._stable: Dict[str, List[str]] = {section: [] for section in self.STABLE_SECTIONS}
+        self._context: List[Tuple[str, str]] = []
+        self._query = ""
+        self._query_label = ""
+
+    def system(self, text: str) -> "PromptLayout":
+        return self._add("system", text)
+
+    def persona(self, text: str) -> "PromptLayout":
+        return self._add("persona", text)
+
+    def tools(self, schemas: List[Dict[str, Any]]) -> "PromptLayout":
+        # Sorted keys keep the serialized schemas byte-identical across calls
+        return self._add("tools", json.dumps(schemas, sort_keys=True, indent=2))
+
+    def instructions(self, text: str) -> "PromptLayout":
+        return self._add("instructions", text)
+
+    def context(self, label: str, value: Any) -> "PromptLayout":
+        """Per-request material: retrieved passages, code under review, prior steps"""
+        text = value if isinstance(value, str) else json.dumps(value, sort_keys=True, default=str)
+        if text.strip():
+            self._context.append((label, text.strip()))
+        return self
+
+    def query(self, text: str, label: str = "") -> "PromptLayout":
+        self._query = text.strip()
+        self._query_label = label
+        return self
+
+    def _add(self, section: str, text: str) -> "PromptLayout":
+        if text and text.strip():
+            self._stable[section].append(text.strip())
+        return self
+
+    def system_text(self) -> str:
+        """Everything that should be identical from call to call"""
+        return "\n\n".join(part for section in self.STABLE_SECTIONS for part in self._stable[section])
+
+    def user_text(self) -> str:
+        """Variable context, then the query"""
+        parts = [f"{label}:\n{text}" if label else text for label, text in self._context]
+        if self._query:
+            parts.append(f"{self._query_label}: {self._query}" if self._query_label else self._query)
+        return "\n\n".join(parts)
+
+    def text(self) -> str:
+        """Single-string form for clients that take one prompt"""
+        return "\n\n".join(part for part in (self.system_text(), self.user_text()) if part)
+
+    def messages(self) -> List[Dict[str, str]]:
+        messages = []
+        if self.system_text():
+            messages.append({"role": "system", "content": self.system_text()})
+        messages.append({"role": "user", "content": self.user_text()})
+        return messages
+
+
+def cache_usage(usage: Any) -> Optional[Tuple[int, int]]:
+    """(hit, miss) prompt tokens from a DeepSeek usage object or dict, if reported"""
+    if usage is None:
+        return None
+    if not isinstance(usage, dict):
+        usage = usage.model_dump() if hasattr(usage, "model_dump") else vars(usage)
+    hit = usage.get("prompt_cache_hit_tokens")
+    miss = usage.get("prompt_cache_miss_tokens")
+    if hit is None and miss is None:
+        return None
+    return int(hit or 0), int(miss or 0)
+
+
+class PrefixCacheStats:
+    """Context-cache hit and miss tokens per call site"""
+
+    def __init__(self):
+        self._sites: Dict[str, Dict[str, int]] = {}
+
+    def record(self, call_site: str, usage: Any) -> bool:
+        """Add one response's usage; returns False when it carried no cache fields"""
+        tokens = cache_usage(usage)
+        site = self._sites.setdefault(call_site, {"requests": 0, "reported": 0, "hit_tokens": 0, "miss_tokens": 0})
+        site["requests"] += 1
+        if tokens is None:
+            return False
+        site["reported"] += 1
+        site["hit_tokens"] += tokens[0]
+        site["miss_tokens"] += tokens[1]
+        return True
+
+    def get_statistics(self) -> Dict[str, Any]:
+        sites = {}
+        for call_site, site in sorted(self._sites.items()):
+            prompt_tokens = site["hit_tokens"] + site["miss_tokens"]
+            sites[call_site] = {**site, "hit_rate": site["hit_tokens"] / prompt_tokens if prompt_tokens else 0.0}
+        hit = sum(site["hit_tokens"] for site in self._sites.values())
+        miss = sum(site["miss_tokens"] for site in self._sites.values())
+        return {
+            "hit_tokens": hit,
+            "miss_tokens": miss,
+            "hit_rate": hit / (hit + miss) if hit + miss else 0.0,
+            "call_sites": sites
+        }
+
+    def reset(self):
+        self._sites.clear()
+
+
+_prefix_cache_stats: Optional[PrefixCacheStats] = None
+
+
+def get_prefix_cache_stats() -> PrefixCacheStats:
+    """Process-wide stats shared by every LLMQueryTool"""
+    global _prefix_cache_stats
+    if _prefix_cache_stats is None:
+        _prefix_cache_stats = PrefixCacheStats()
+    return _prefix_cache_stats
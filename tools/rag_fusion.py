@@ -0,0 +1,201 @@
+"""
+RAG Fusion - Enhanced BASED GOD CLI
+Score normalization, rank fusion, MinHash dedup and optional cross-encoder reranking
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used by the MinHash permutations
+_MINHASH_PRIME = (1 << 61) - 1
+
+
+def normalize_scores(scores: List[float]) -> List[float]:
+    """Min-max normalize one source's scores to [0, 1]"""
+    if not scores:
+        return []
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def reciprocal_rank_fusion(rankings: Dict[str, List[str]], k: int = 60,
+                           weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """
+    Fuse per-source rankings of item keys: score = sum(w / (k + rank))
+    Only ranks are used, so sources with incomparable scores mix safely
+    """
+    weights = weights or {}
+    fused: Dict[str, float] = {}
+    for source, keys in rankings.items():
+        weight = weights.get(source, 1.0)
+        for rank, key in enumerate(keys, 1):
+            fused[key] = fused.get(key, 0.0) + weight / (k + rank)
+    return fused
+
+
+def weighted_fusion(normalized: Dict[str, Dict[str, float]],
+                    weights: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+    """Fuse per-source normalized scores as a weighted sum"""
+    weights = weights or {}
+    fused: Dict[str, float] = {}
+    for source, scores in normalized.items():
+        weight = weights.get(source, 1.0)
+        for key, score in scores.items():
+            fused[key] = fused.get(key, 0.0) + weight * score
+    return fused
+
+
+class MinHashDeduplicator:
+    """
+    Drops passages whose estimated Jaccard similarity to a kept passage is
+    at or above the threshold; candidate lists are short, so pairwise
+    signature comparison is used instead of LSH banding
+    """
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 3, threshold: float = 0.8, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MINHASH_PRIME, size=num_perm, dtype=np.uint64)
+
+    def _shingles(self, text: str) -> List[int]:
+        """Hash word n-grams to 32-bit ints"""
+        words = re.findall(r"\w+", text.lower())
+        if len(words) < self.shingle_size:
+            grams = [" ".join(words)] if words else [""]
+        else:
+            grams = [" ".join(words[i:i + self.shingle_size])
+                     for i in range(len(words) - self.shingle_size + 1)]
+        return [
+            int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little")
+            for gram in set(grams)
+        ]
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash signature of a passage"""
+        shingles = np.array(self._shingles(text), dtype=np.uint64)
+        # uint64 products wrap; the permutations stay deterministic, which is all MinHash needs
+        hashed = (np.outer(shingles, self._a) + self._b) % _MINHASH_PRIME
+        return hashed.min(axis=0)
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.mean(first == second))
+
+    def dedup(self, items: List[Dict[str, Any]], text_key: str = "text") -> List[Dict[str, Any]]:
+        """Keep the first of each near-duplicate group; items should be best-first"""
+        kept, signatures = [], []
+        for item in items:
+            sig = self.signature(item.get(text_key, ""))
+            if any(self.similarity(sig, other) >= self.threshold for other in signatures):
+                continue
+            kept.append(item)
+            signatures.append(sig)
+        return kept
+
+
+class CrossEncoderReranker:
+    """Local CPU cross-encoder; disabled when sentence-transformers is missing"""
+
+    def __init__(self, model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"):
+        self.model_name = model_name
+        self._model = None
+        self.available = True
+
+    def _load(self):
+        if self._model is None and self.available:
+            try:
+                from sentence_transformers import CrossEncoder
+                self._model = CrossEncoder(self.model_name, device="cpu")
+            except Exception as e:
+                logger.info(f"Cross-encoder reranker unavailable: {e}")
+                self.available = False
+        return self._model
+
+    def score(self, query: str, texts: List[str]) -> Optional[List[float]]:
+        """Relevance of each text to the query, or None when unavailable"""
+        model = self._load()
+        if model is None:
+            return None
+        return [float(s) for s in model.predict([(query, text) for text in texts])]
+
+
+class HybridRanker:
+    """
+    Fuses per-source result lists into one ranking
+    Sources are lists of dicts with 'key', 'text' and 'score', best-first
+    """
+
+    def __init__(self, method: str = "rrf", rrf_k: int = 60,
+                 weights: Optional[Dict[str, float]] = None,
+                 dedup_threshold: float = 0.8,
+                 reranker: Optional[CrossEncoderReranker] = None,
+                 rerank_top_n: int = 20):
+        if method not in ("rrf", "weighted"):
+            raise ValueError(f"Unknown fusion method: {method}")
+        self.method = method
+        self.rrf_k = rrf_k
+        self.weights = weights or {}
+        self.deduplicator = MinHashDeduplicator(threshold=dedup_threshold)
+        self.reranker = reranker
+        self.rerank_top_n = rerank_top_n
+
+    def fuse(self, sources: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """Normalize, fuse and dedup; returns items best-first with a fused 'score'"""
+        items: Dict[str, Dict[str, Any]] = {}
+        rankings: Dict[str, List[str]] = {}
+        normalized: Dict[str, Dict[str, float]] = {}
+
+        for source, results in sources.items():
+            ordered = sorted(results, key=lambda r: r.get("score", 0.0), reverse=True)
+            rankings[source] = [r["key"] for r in ordered]
+            norm = normalize_scores([r.get("score", 0.0) for r in ordered])
+            normalized[source] = {r["key"]: n for r, n in zip(ordered, norm)}
+            for result, n in zip(ordered, norm):
+                item = items.setdefault(result["key"], {**result, "sources": {}})
+                item["sources"][source] = {"raw_score": result.get("score", 0.0), "normalized": n}
+
+        if self.method == "rrf":
+            fused = reciprocal_rank_fusion(rankings, k=self.rrf_k, weights=self.weights)
+        else:
+            fused = weighted_fusion(normalized, weights=self.weights)
+
+        ranked = []
+        for key, score in sorted(fused.items(), key=lambda kv: kv[1], reverse=True):
+            item = items[key]
+            item["raw_score"] = item.get("score", 0.0)
+            item["score"] = score
+            ranked.append(item)
+
+        return self.deduplicator.dedup(ranked)
+
+    async def rank(self, query: str, sources: Dict[str, List[Dict[str, Any]]],
+                   limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Fuse sources, then rerank the top-N with the cross-encoder if configured"""
+        ranked = self.fuse(sources)
+
+        if self.reranker is not None and ranked:
+            head = ranked[:self.rerank_top_n]
+            scores = await asyncio.get_running_loop().run_in_executor(
+                None, self.reranker.score, query, [item.get("text", "") for item in head]
+            )
+            if scores is not None:
+                for item, score in zip(head, scores):
+                    item["fusion_score"] = item["score"]
+                    item["score"] = score
+                head.sort(key=lambda item: item["score"], reverse=True)
+                ranked = head + ranked[self.rerank_top_n:]
+
+        return ranked[:limit] if limit else ranked
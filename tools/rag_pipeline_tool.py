@@ -5,9 +5,11 @@ Integrates vector database, SQL database, and context-aware retrieval
 
 import os
 import json
+import time
+from pathlib import Path
 import asyncio
 from typing import Dict, Any, List, Optional, Union, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
@@ -17,6 +19,10 @@ from tools.base_tool import BaseTool, ToolResponse, ToolStatus
 from tools.vector_database_tool import VectorDatabaseTool
 from tools.sql_database_tool import SQLDatabaseTool
 from tools.llm_query_tool import LLMQueryTool
+from tools.rag_fusion import CrossEncoderReranker, HybridRanker, normalize_scores
+from tools.context_packer import ContextPacker
+from tools.prompt_layout import PromptLayout
+from tools.ingestion_pipeline import DocumentChunker, IngestionPipeline
 
 
 @dataclass
@@ -30,6 +36,7 @@ class RAGContext:
     combined_context: str
     relevance_scores: Dict[str, float]
     timestamp: str
+    packing_stats: Dict[str, Any] = field(default_factory=dict)
 
 
 class RAGPipelineTool(BaseTool):
@@ -40,7 +47,11 @@ class RAGPipelineTool(BaseTool):
     
     def __init__(self, 
                  vector_db_config: Optional[Dict[str, Any]] = None,
-                 sql_db_path: str = "deepcli_database.db"):
+                 sql_db_path: str = "deepcli_database.db",
+                 fusion_method: str = "rrf",
+                 source_weights: Optional[Dict[str, float]] = None,
+                 reranker_model: Optional[str] = None,
+                 context_token_budget: int = 1500):
     
         """Initialize RAG Pipeline Tool"""
         super().__init__(
@@ -52,7 +63,8 @@ class RAGPipelineTool(BaseTool):
                 "persona_aware_search",
                 "memory_augmentation",
                 "hybrid_search",
-                "context_ranking"
+                "context_ranking",
+                "document_ingestion"
             ]
         )
         
@@ -68,6 +80,37 @@ class RAGPipelineTool(BaseTool):
         # Configuration
         self.default_context_limit = 5
         self.default_relevance_threshold = 0.5
+        
+        # Hybrid ranking: rank fusion across sources, near-duplicate removal,
+        # and an optional local cross-encoder pass over the top results
+        self.ranker = HybridRanker(
+            method=fusion_method,
+            weights=source_weights,
+            reranker=CrossEncoderReranker(reranker_model) if reranker_model else None
+        )
+        
+        # Prompt context is packed into a token budget by relevance per token;
+        # source weights put knowledge ahead of memories ahead of history
+        self.context_packer = ContextPacker(token_budget=context_token_budget)
+        self.context_source_weights = {"vector": 1.0, "memory": 0.8, "history": 0.6}
+        self.stored_context_tokens = 256
+        
+        # Chunked, batched ingestion; the manifest lets directory ingests resume
+        self.ingestion = IngestionPipeline(
+            vector_tool=self.vector_tool,
+            sql_tool=self.sql_tool,
+            chunker=DocumentChunker(max_tokens=400, overlap_tokens=50),
+            manifest_path=str(Path(sql_db_path).with_suffix(".ingest_manifest.json"))
+        )
+        
+        # Per-source retrieval timeouts in seconds; a source that misses its
+        # deadline contributes nothing instead of stalling the query
+        self.stage_timeouts = {
+            "persona": 2.0,
+            "vector": 5.0,
+            "memory": 3.0,
+            "history": 3.0
+        }
     
     async def execute(self, **kwargs) -> ToolResponse:
         """Execute RAG pipeline operations"""
@@ -78,6 +121,8 @@ class RAGPipelineTool(BaseTool):
                 return await self._rag_query(kwargs)
             elif operation == 'store_knowledge':
                 return await self._store_knowledge(kwargs)
+            elif operation == 'ingest':
+                return await self._ingest(kwargs)
             elif operation == 'hybrid_search':
                 return await self._hybrid_search(kwargs)
             elif operation == 'persona_query':
@@ -116,27 +161,45 @@ class RAGPipelineTool(BaseTool):
                 status=ToolStatus.FAILED
             )
         
-        # 1. Get persona context
-        persona_context = await self._get_persona_context(persona_name)
-        
-        # 2. Retrieve vector contexts
-        vector_results = await self._retrieve_vector_context(
-            query, context_limit
-        )
-        
-        # 3. Retrieve relevant memories
-        memory_context = []
-        if include_memory:
-            memory_context = await self._retrieve_memory_context(
-                query, persona_context.get('id') if persona_context else None
+        query_start = time.perf_counter()
+        timeouts = {**self.stage_timeouts, **kwargs.get('stage_timeouts', {})}
+        stages: Dict[str, Dict[str, Any]] = {}
+        
+        # 1-4. Retrieve persona, vector, memory and history concurrently;
+        # memory only waits on the persona lookup for its id
+        persona_task = asyncio.ensure_future(self._run_stage(
+            "persona", self._get_persona_context(persona_name),
+            timeouts["persona"], None, stages
+        ))
+        
+        async def memory_stage():
+            persona = await asyncio.shield(persona_task)
+            return await self._retrieve_memory_context(
+                query, persona.get('id') if persona else None
             )
         
-        # 4. Retrieve conversation history
-        history_context = []
-        if include_history and session_id:
-            history_context = await self._retrieve_history_context(
-                session_id, limit=3
+        async def no_results():
+            return []
+        
+        _, vector_results, memory_context, history_context = await asyncio.gather(
+            persona_task,
+            self._run_stage(
+                "vector", self._retrieve_vector_context(query, context_limit),
+                timeouts["vector"], [], stages
+            ),
+            self._run_stage(
+                "memory", memory_stage() if include_memory else no_results(),
+                timeouts["memory"], [], stages
+            ),
+            self._run_stage(
+                "history",
+                self._retrieve_history_context(session_id, limit=3)
+                if include_history and session_id else no_results(),
+                timeouts["history"], [], stages
             )
+        )
+        persona_context = persona_task.result()
+        stages["retrieval"] = {"latency_ms": (time.perf_counter() - query_start) * 1000, "status": "ok"}
         
         # 5. Build combined context
         rag_context = await self._build_rag_context(
@@ -144,18 +207,22 @@ class RAGPipelineTool(BaseTool):
             vector_results=vector_results,
             memory_context=memory_context,
             history_context=history_context,
-            persona_context=persona_context
+            persona_context=persona_context,
+            token_budget=kwargs.get('context_token_budget')
         )
         
         # 6. Generate response with context
+        generation_start = time.perf_counter()
         response = await self._generate_rag_response(
             query=query,
             rag_context=rag_context,
             persona_context=persona_context
         )
+        stages["generation"] = {"latency_ms": (time.perf_counter() - generation_start) * 1000, "status": "ok"}
         
         # 7. Store the interaction
         if session_id:
+            store_start = time.perf_counter()
             await self._store_interaction(
                 session_id=session_id,
                 query=query,
@@ -163,6 +230,9 @@ class RAGPipelineTool(BaseTool):
                 context=rag_context,
                 persona_id=persona_context.get('id') if persona_context else None
             )
+            stages["store"] = {"latency_ms": (time.perf_counter() - store_start) * 1000, "status": "ok"}
+        
+        stages["total"] = {"latency_ms": (time.perf_counter() - query_start) * 1000, "status": "ok"}
         
         return ToolResponse(
             success=True,
@@ -174,9 +244,14 @@ class RAGPipelineTool(BaseTool):
                     "vector_count": len(vector_results),
                     "memory_count": len(memory_context),
                     "history_count": len(history_context),
-                    "total_context_length": len(rag_context.combined_context)
+                    "total_context_length": len(rag_context.combined_context),
+                    "packing": rag_context.packing_stats
                 },
-                "persona": persona_name
+                "persona": persona_name,
+                "timings": stages,
+                "degraded_sources": [
+                    name for name, stage in stages.items() if stage["status"] != "ok"
+                ]
             }
         )
     
@@ -195,42 +270,64 @@ class RAGPipelineTool(BaseTool):
                 status=ToolStatus.FAILED
             )
         
-        # Store in vector database
-        vector_result = await self.vector_tool.execute(
-            operation='store',
-            texts=texts,
+        # Chunk, embed and store in both databases in batches
+        result = await self.ingestion.ingest_texts(
+            texts,
             metadata=metadata,
-            category=category
+            category=category,
+            importance=importance,
+            persona_id=persona_id
         )
         
-        if not vector_result.success:
-            return vector_result
-        
-        # Store important items in SQL memory
-        stored_memories = []
-        for i, text in enumerate(texts):
-            if len(text) > 50:  # Only store substantial content
-                memory_result = await self.sql_tool.execute(
-                    operation='store_memory',
-                    content=text,
-                    category=category,
-                    importance=importance,
-                    persona_id=persona_id,
-                    tags=metadata[i].get('tags', []) if i < len(metadata) else []
-                )
-                if memory_result.success:
-                    stored_memories.append(memory_result.data['memory_id'])
+        if result["documents_failed"]:
+            return ToolResponse(
+                success=False,
+                message=f"Failed to store {result['documents_failed']} of {len(texts)} texts",
+                status=ToolStatus.FAILED,
+                data=result
+            )
         
         return ToolResponse(
             success=True,
-            message=f"Stored {len(texts)} items in knowledge base",
+            message=f"Stored {len(texts)} items in knowledge base ({result['chunks']} chunks)",
             data={
-                "vector_ids": vector_result.data['ids'],
-                "memory_ids": stored_memories,
+                "vector_ids": result["vector_ids"],
+                "memory_ids": result["memory_ids"],
+                "chunks": result["chunks"],
+                "vector_store": result["vector_store"],
                 "category": category
             }
         )
     
+    async def _ingest(self, kwargs: Dict[str, Any]) -> ToolResponse:
+        """Ingest files or directories; unchanged files are skipped via the manifest"""
+        paths = kwargs.get('paths', [])
+        if isinstance(paths, str):
+            paths = [paths]
+        
+        if not paths:
+            return ToolResponse(
+                success=False,
+                message="No paths provided to ingest",
+                status=ToolStatus.FAILED
+            )
+        
+        result = await self.ingestion.ingest_paths(
+            paths,
+            category=kwargs.get('category', 'documents'),
+            importance=kwargs.get('importance', 5),
+            persona_id=kwargs.get('persona_id')
+        )
+        
+        summary = {key: value for key, value in result.items() if key not in ("vector_ids", "memory_ids")}
+        return ToolResponse(
+            success=result["documents_failed"] == 0,
+            message=(f"Ingested {result['documents']} files ({result['chunks']} chunks), "
+                     f"skipped {result['files_skipped']} unchanged"),
+            status=ToolStatus.SUCCESS if result["documents_failed"] == 0 else ToolStatus.FAILED,
+            data=summary
+        )
+    
     async def _hybrid_search(self, kwargs: Dict[str, Any]) -> ToolResponse:
         """Perform hybrid search across vector and SQL databases"""
         query = kwargs.get('query', '')
@@ -255,35 +352,22 @@ class RAGPipelineTool(BaseTool):
             if vector_result.success:
                 results["vector_results"] = vector_result.data['results']
         
-        # Memory search (using SQL LIKE for now)
+        # Keyword search over memories and conversations (FTS5, BM25-ranked)
+        keyword_tables = []
         if include_memories:
-            memory_result = await self.sql_tool.execute(
-                operation='execute_query',
-                query="""
-                    SELECT * FROM memory 
-                    WHERE content LIKE ? 
-                    ORDER BY importance DESC, access_count DESC 
-                    LIMIT ?
-                """,
-                params=[f'%{query}%', limit]
-            )
-            if memory_result.success:
-                results["memory_results"] = memory_result.data['results']
-        
-        # Conversation search
+            keyword_tables.append('memory')
         if include_conversations:
-            conv_result = await self.sql_tool.execute(
-                operation='execute_query',
-                query="""
-                    SELECT * FROM conversations 
-                    WHERE user_input LIKE ? OR assistant_response LIKE ?
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                """,
-                params=[f'%{query}%', f'%{query}%', limit]
+            keyword_tables.append('conversations')
+        if keyword_tables:
+            keyword_result = await self.sql_tool.execute(
+                operation='full_text_search',
+                query=query,
+                tables=keyword_tables,
+                limit=limit
             )
-            if conv_result.success:
-                results["conversation_results"] = conv_result.data['results']
+            if keyword_result.success:
+                results["memory_results"] = keyword_result.data['memory_results']
+                results["conversation_results"] = keyword_result.data['conversation_results']
         
         # Rank and combine results
         ranked_results = await self._rank_hybrid_results(query, results)
@@ -323,12 +407,10 @@ class RAGPipelineTool(BaseTool):
         
         persona = persona_result.data['persona']
         
-        # Build persona-aware prompt
-        persona_prompt = self._build_persona_prompt(persona, query)
-        
-        # Execute RAG query with persona context
+        # Execute RAG query with persona context; the persona framing goes into the
+        # stable system prompt, so retrieval and the prompt tail see only the query
         rag_result = await self._rag_query({
-            'query': persona_prompt,
+            'query': query,
             'session_id': session_id,
             'persona_name': persona_name,
             'include_memory': True,
@@ -398,22 +480,19 @@ class RAGPipelineTool(BaseTool):
                 status=ToolStatus.FAILED
             )
         
-        # Use LLM to analyze relevance
-        analysis_prompt = f"""
-        Analyze the relevance of the following contexts to the query.
-        Rate each on a scale of 0-1 and explain why.
-        
-        Query: {query}
-        
-        Contexts:
-        {json.dumps(contexts, indent=2)}
-        
-        Provide analysis in JSON format.
-        """
+        # Use LLM to analyze relevance; fixed instructions lead, query and contexts follow
+        layout = (PromptLayout("rag.relevance")
+                  .instructions("Analyze the relevance of the following contexts to the query.\n"
+                                "Rate each on a scale of 0-1 and explain why.\n"
+                                "Provide analysis in JSON format.")
+                  .context("Contexts", json.dumps(contexts, indent=2))
+                  .query(query, label="Query"))
         
         analysis_result = await self.llm_tool.execute(
-            query=analysis_prompt,
-            task_type='analysis',
+            prompt=layout.user_text(),
+            system_message=layout.system_text(),
+            use_history=False,
+            call_site=layout.call_site,
             max_tokens=1000
         )
         
@@ -432,6 +511,23 @@ class RAGPipelineTool(BaseTool):
     
     # Helper methods
     
+    async def _run_stage(self, name: str, coro, timeout: float, default: Any,
+                         stages: Dict[str, Dict[str, Any]]) -> Any:
+        """Await one retrieval source with a deadline, recording latency and outcome"""
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(coro, timeout)
+            stage = {"status": "ok"}
+        except asyncio.TimeoutError:
+            result = default
+            stage = {"status": "timeout"}
+        except Exception as e:
+            result = default
+            stage = {"status": "error", "error": str(e)}
+        stage["latency_ms"] = (time.perf_counter() - start) * 1000
+        stages[name] = stage
+        return result
+    
     async def _get_persona_context(self, persona_name: str) -> Optional[Dict[str, Any]]:
         """Get persona context"""
         result = await self.sql_tool.execute(
@@ -464,18 +560,15 @@ class RAGPipelineTool(BaseTool):
         
         # Also search for query-relevant memories
         search_result = await self.sql_tool.execute(
-            operation='execute_query',
-            query="""
-                SELECT * FROM memory 
-                WHERE content LIKE ? AND persona_id = ?
-                ORDER BY importance DESC 
-                LIMIT 3
-            """,
-            params=[f'%{query}%', persona_id] if persona_id else [f'%{query}%', -1]
+            operation='full_text_search',
+            query=query,
+            tables=['memory'],
+            persona_id=persona_id,
+            limit=3
         )
         
         if search_result.success:
-            memories.extend(search_result.data.get('results', []))
+            memories.extend(search_result.data.get('memory_results', []))
         
         # Deduplicate
         seen_ids = set()
@@ -497,35 +590,69 @@ class RAGPipelineTool(BaseTool):
         return result.data.get('conversations', []) if result.success else []
     
     async def _build_rag_context(self, **kwargs) -> RAGContext:
-        """Build combined RAG context"""
+        """Build combined RAG context within the token budget"""
         query = kwargs.get('query', '')
         vector_results = kwargs.get('vector_results', [])
         memory_context = kwargs.get('memory_context', [])
         history_context = kwargs.get('history_context', [])
         persona_context = kwargs.get('persona_context')
+        token_budget = kwargs.get('token_budget')
+        
+        # Candidate passages; relevance is normalized within each source
+        # (cosine, importance and recency aren't comparable) then weighted
+        candidates = []
+        vector_relevance = normalize_scores([v.get('score', 0) for v in vector_results])
+        for ctx, relevance in zip(vector_results, vector_relevance):
+            candidates.append({
+                'section': 'vector',
+                'text': ctx.get('text', ''),
+                'score': ctx.get('score', 0),
+                'relevance': self.context_source_weights['vector'] * max(relevance, 0.1)
+            })
+        
+        memory_relevance = normalize_scores([m.get('importance', 5) for m in memory_context])
+        for mem, relevance in zip(memory_context, memory_relevance):
+            candidates.append({
+                'section': 'memory',
+                'text': mem.get('content', ''),
+                'category': mem.get('category', 'general'),
+                'relevance': self.context_source_weights['memory'] * max(relevance, 0.1)
+            })
+        
+        # History arrives newest first
+        for i, conv in enumerate(history_context):
+            candidates.append({
+                'section': 'history',
+                'text': f"User: {conv.get('user_input', '')}\nAssistant: {conv.get('assistant_response', '')}",
+                'relevance': self.context_source_weights['history'] / (i + 1)
+            })
+        
+        packed = self.context_packer.pack(candidates, token_budget=token_budget)
         
         # Build combined context string
         context_parts = []
+        sections = {'vector': [], 'memory': [], 'history': []}
+        for passage in packed.passages:
+            sections[passage['section']].append(passage)
         
         # Add vector search results
-        if vector_results:
+        if sections['vector']:
             context_parts.append("## Relevant Knowledge:")
-            for i, ctx in enumerate(vector_results, 1):
-                context_parts.append(f"\n### Context {i} (Score: {ctx.get('score', 0):.3f}):")
-                context_parts.append(ctx.get('text', ''))
+            for i, ctx in enumerate(sections['vector'], 1):
+                context_parts.append(f"\n### Context {i} (Score: {ctx['score']:.3f}):")
+                context_parts.append(ctx['text'])
         
         # Add memories
-        if memory_context:
+        if sections['memory']:
             context_parts.append("\n## Relevant Memories:")
-            for mem in memory_context:
-                context_parts.append(f"\n- [{mem.get('category', 'general')}] {mem.get('content', '')}")
+            for mem in sections['memory']:
+                context_parts.append(f"\n- [{mem['category']}] {mem['text']}")
         
         # Add conversation history
-        if history_context:
+        if sections['history']:
             context_parts.append("\n## Recent Conversation:")
-            for conv in history_context:
-                context_parts.append(f"\nUser: {conv.get('user_input', '')}")
-                context_parts.append(f"Assistant: {conv.get('assistant_response', '')}")
+            for conv in sections['history']:
+                context_parts.append(f"\n{conv['text']}")
         
         combined_context = "\n".join(context_parts)
         
@@ -544,7 +671,8 @@ class RAGPipelineTool(BaseTool):
             memory_context=memory_context,
             combined_context=combined_context,
             relevance_scores=relevance_scores,
-            timestamp=datetime.now().isoformat()
+            timestamp=datetime.now().isoformat(),
+            packing_stats=packed.stats
         )
     
     async def _generate_rag_response(self, query: str, rag_context: RAGContext, 
@@ -562,20 +690,21 @@ class RAGPipelineTool(BaseTool):
 Personality: {', '.join(traits.get('traits', []))}
 Communication style: {traits.get('communication_style', 'professional')}"""
         
-        # Build prompt with context
-        prompt = f"""Based on the following context, please answer the user's question.
-
-{rag_context.combined_context}
-
-User Question: {query}
-
-Please provide a comprehensive and helpful response."""
+        # Stable persona and instructions first, so DeepSeek can reuse the cached prefix
+        layout = PromptLayout("rag").system(system_message)
+        if persona_context:
+            layout.persona(self._build_persona_prompt(persona_context))
+        layout.instructions("Answer the user's question using the context provided with it. "
+                            "Please provide a comprehensive and helpful response.")
+        layout.context("Context", rag_context.combined_context)
+        layout.query(query, label="User Question")
         
         # Generate response
         result = await self.llm_tool.execute(
-            query=prompt,
-            system_message=system_message,
-            task_type='general',
+            prompt=layout.user_text(),
+            system_message=layout.system_text(),
+            use_history=False,
+            call_site=layout.call_site,
             max_tokens=1500
         )
         
@@ -592,11 +721,14 @@ Please provide a comprehensive and helpful response."""
             user_input=query,
             assistant_response=response,
             persona_id=persona_id,
-            context=context.combined_context[:1000],  # Truncate for storage
+            context=self.context_packer.counter.truncate(
+                context.combined_context, self.stored_context_tokens
+            ),
             metadata={
                 'vector_count': len(context.vector_results),
                 'memory_count': len(context.memory_context),
-                'relevance_scores': context.relevance_scores
+                'relevance_scores': context.relevance_scores,
+                'packing': context.packing_stats
             }
         )
         
@@ -612,55 +744,60 @@ Please provide a comprehensive and helpful response."""
             )
     
     async def _rank_hybrid_results(self, query: str, results: Dict[str, List]) -> List[Dict[str, Any]]:
-        """Rank and combine hybrid search results"""
-        ranked = []
+        """Rank and combine hybrid search results
+        
+        Each source keeps its own score scale (cosine, BM25); the ranker
+        fuses them by rank and drops near-duplicate passages
+        """
+        sources = {'vector': [], 'memory': [], 'conversation': []}
         
         # Add vector results with type tag
-        for r in results.get('vector_results', []):
-            ranked.append({
+        for i, r in enumerate(results.get('vector_results', [])):
+            sources['vector'].append({
+                'key': f"vector:{r.get('id', i)}",
                 'type': 'vector',
                 'score': r.get('score', 0),
                 'text': r.get('text', ''),
                 'metadata': r.get('metadata', {})
             })
         
-        # Add memory results
+        # Add memory results; BM25 score when found by full-text search
         for r in results.get('memory_results', []):
-            ranked.append({
+            sources['memory'].append({
+                'key': f"memory:{r.get('id')}",
                 'type': 'memory',
-                'score': r.get('importance', 5) / 10.0,  # Normalize importance
+                'score': r['score'] if 'score' in r else r.get('importance', 5) / 10.0,
                 'text': r.get('content', ''),
                 'metadata': {
                     'category': r.get('category'),
-                    'access_count': r.get('access_count')
+                    'access_count': r.get('access_count'),
+                    'snippet': r.get('snippet')
                 }
             })
         
         # Add conversation results
         for r in results.get('conversation_results', []):
-            ranked.append({
+            sources['conversation'].append({
+                'key': f"conversation:{r.get('id')}",
                 'type': 'conversation',
-                'score': 0.5,  # Default score for conversations
+                'score': r.get('score', 0.0),
                 'text': f"Q: {r.get('user_input', '')}\nA: {r.get('assistant_response', '')}",
                 'metadata': {
                     'session_id': r.get('session_id'),
-                    'timestamp': r.get('timestamp')
+                    'timestamp': r.get('timestamp'),
+                    'snippet': r.get('snippet')
                 }
             })
         
-        # Sort by score
-        ranked.sort(key=lambda x: x['score'], reverse=True)
-        
-        return ranked
+        return await self.ranker.rank(query, sources)
     
-    def _build_persona_prompt(self, persona: Dict[str, Any], query: str) -> str:
-        """Build persona-aware prompt"""
+    def _build_persona_prompt(self, persona: Dict[str, Any]) -> str:
+        """Build the persona's expertise framing; holds no per-query text so it caches"""
         knowledge = persona.get('knowledge_base', {})
         if isinstance(knowledge, str):
             knowledge = json.loads(knowledge)
         
-        return f"""As {persona.get('name')}, with expertise in {', '.join(knowledge.get('domains', []))}, 
-please answer the following question: {query}"""
+        return f"""Answer as {persona.get('name')}, drawing on expertise in {', '.join(knowledge.get('domains', []))}."""
     
     def _apply_persona_style(self, response: str, persona: Dict[str, Any]) -> str:
         """Apply persona conversation style to response"""
@@ -681,7 +818,7 @@ please answer the following question: {query}"""
             "properties": {
                 "operation": {
                     "type": "string",
-                    "enum": ["rag_query", "store_knowledge", "hybrid_search", 
+                    "enum": ["rag_query", "store_knowledge", "ingest", "hybrid_search", 
                             "persona_query", "update_context", "analyze_relevance"],
                     "description": "RAG operation to perform"
                 },
@@ -694,6 +831,11 @@ please answer the following question: {query}"""
                     "items": {"type": "string"},
                     "description": "Texts to store"
                 },
+                "paths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Files or directories to ingest"
+                },
                 "session_id": {
                     "type": "string",
                     "description": "Session identifier"
@@ -10,6 +10,7 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 
 from .base_tool import BaseTool, ToolResponse, ToolStatus
+from .prompt_layout import PromptLayout
 
 class ReasoningStep(Enum):
     INITIAL_ANALYSIS = "initial_analysis"
@@ -276,12 +277,15 @@ class FastReasoningEngine(BaseTool):
             return self._fallback_reasoning(step, step_data)
         
         # Create optimized prompt for speed
-        prompt = self._create_fast_prompt(step, step_data, speed_mode)
+        layout = self._create_fast_prompt(step, step_data, speed_mode)
         
         try:
             # Fast LLM call with optimized parameters
             llm_params = {
-                "query": prompt,
+                "prompt": layout.user_text(),
+                "system_message": layout.system_text(),
+                "use_history": False,
+                "call_site": layout.call_site,
                 "task_type": "reasoning",
                 "max_tokens": 150 if speed_mode else 300,
                 "temperature": 0.3  # Lower temperature for consistent reasoning
@@ -301,36 +305,34 @@ class FastReasoningEngine(BaseTool):
         except Exception as e:
             return self._fallback_reasoning(step, step_data)
     
-    def _create_fast_prompt(self, step: ReasoningStep, step_data: Dict, speed_mode: bool) -> str:
-        """Create optimized prompt for fast reasoning"""
+    def _create_fast_prompt(self, step: ReasoningStep, step_data: Dict, speed_mode: bool) -> PromptLayout:
+        """Create optimized prompt for fast reasoning; per-step text leads so it caches"""
         
         user_query = step_data["user_query"]
         focus = step_data.get("focus", "")
         output_format = step_data.get("output_format", "")
+        layout = PromptLayout(f"reasoning.{step.value}")
         
         if speed_mode:
             # Ultra-fast prompt
-            prompt = f"""FAST REASONING - {step.value.upper()}
+            layout.instructions(f"""FAST REASONING - {step.value.upper()}
 
-Query: {user_query}
 Focus: {focus}
 Output: {output_format}
 
-Quick analysis (2-3 lines):"""
+Quick analysis (2-3 lines).""")
+            layout.query(user_query, label="Query")
         else:
             # Standard prompt
-            prompt = f"""REASONING STEP: {step.value.upper()}
+            layout.instructions(f"""REASONING STEP: {step.value.upper()}
 
-User Query: {user_query}
-Context: {step_data.get('context', {})}
 Focus: {focus}
-Previous: {step_data.get('previous_reasoning', 'None')}
-
-Required Output Format: {output_format}
-
-Analysis:"""
+Required Output Format: {output_format}""")
+            layout.context("Context", str(step_data.get('context', {})))
+            layout.context("Previous", str(step_data.get('previous_reasoning', 'None')))
+            layout.query(user_query, label="User Query")
         
-        return prompt
+        return layout
     
     def _fallback_reasoning(self, step: ReasoningStep, step_data: Dict) -> Dict[str, Any]:
         """Fallback reasoning when LLM is unavailable"""
@@ -0,0 +1,195 @@
+"""
+Request Scheduler - Enhanced BASED GOD CLI
+Client-side token-bucket rate limits and priority scheduling for DeepSeek
+"""
+
+import asyncio
+import contextvars
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Callable, Deque, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Lower values are served first"""
+    INTERACTIVE = 0
+    NORMAL = 1
+    BACKGROUND = 2
+
+
+# Read by the DeepSeek transport, so callers tag work without threading arguments
+request_priority: contextvars.ContextVar[RequestPriority] = contextvars.ContextVar(
+    "request_priority", default=RequestPriority.NORMAL
+)
+request_source: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "request_source", default=None
+)
+
+
+@contextmanager
+def request_context(priority: RequestPriority, source: Optional[str] = None) -> Iterator[None]:
+    """Tag DeepSeek requests made inside the block with a priority and fairness source"""
+    priority_token = request_priority.set(priority)
+    source_token = request_source.set(source) if source is not None else None
+    try:
+        yield
+    finally:
+        if source_token is not None:
+            request_source.reset(source_token)
+        request_priority.reset(priority_token)
+
+
+class TokenBucket:
+    """Refills continuously at rate units per second up to capacity"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self.level = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until amount can be taken; requests above capacity wait for a full bucket"""
+        self._refill()
+        needed = min(amount, self.capacity) - self.level
+        return max(0.0, needed / self.rate) if self.rate > 0 else (0.0 if needed <= 0 else float("inf"))
+
+    def consume(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+
+class _Ticket:
+    __slots__ = ("tokens", "priority", "source")
+
+    def __init__(self, tokens: int, priority: RequestPriority, source: str):
+        self.tokens = tokens
+        self.priority = priority
+        self.source = source
+
+
+class RequestScheduler:
+    """
+    Admits requests under requests/min and tokens/min buckets
+    Higher priorities always go first; within a priority, sources take turns
+    (round robin) so one busy caller cannot starve the others
+    """
+
+    def __init__(self, requests_per_minute: float = 300, tokens_per_minute: float = 500_000,
+                 request_burst: Optional[float] = None, token_burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._clock = clock
+        self.request_bucket = TokenBucket(requests_per_minute / 60, request_burst or requests_per_minute, clock)
+        self.token_bucket = TokenBucket(tokens_per_minute / 60, token_burst or tokens_per_minute, clock)
+
+        self._queues: Dict[RequestPriority, "OrderedDict[str, Deque[_Ticket]]"] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._condition = asyncio.Condition()
+
+        # Metrics
+        self._admitted = {priority: 0 for priority in RequestPriority}
+        self._tokens = {priority: 0 for priority in RequestPriority}
+        self._wait_total = {priority: 0.0 for priority in RequestPriority}
+        self._wait_max = {priority: 0.0 for priority in RequestPriority}
+        self._throttled = 0
+
+    def _enqueue(self, ticket: _Ticket):
+        self._queues[ticket.priority].setdefault(ticket.source, deque()).append(ticket)
+
+    def _remove(self, ticket: _Ticket):
+        sources = self._queues[ticket.priority]
+        queue = sources.get(ticket.source)
+        if queue is None or ticket not in queue:
+            return
+        if queue[0] is ticket:
+            queue.popleft()
+            # Round robin: the source goes to the back once its head is served
+            if queue:
+                sources.move_to_end(ticket.source)
+        else:
+            queue.remove(ticket)
+        if not queue:
+            del sources[ticket.source]
+
+    def _head(self) -> Optional[_Ticket]:
+        for priority in RequestPriority:
+            sources = self._queues[priority]
+            if sources:
+                return next(iter(sources.values()))[0]
+        return None
+
+    def _delay(self, tokens: int) -> float:
+        return max(self.request_bucket.time_until(1), self.token_bucket.time_until(tokens))
+
+    async def acquire(self, tokens: int = 0, priority: Optional[RequestPriority] = None,
+                      source: Optional[str] = None) -> float:
+        """Wait for a turn and rate budget; returns seconds spent queued"""
+        priority = request_priority.get() if priority is None else priority
+        source = source or request_source.get() or "default"
+        ticket = _Ticket(tokens, priority, source)
+        started = self._clock()
+
+        async with self._condition:
+            self._enqueue(ticket)
+            try:
+                while True:
+                    delay = None
+                    if self._head() is ticket:
+                        delay = self._delay(tokens)
+                        if delay <= 0:
+                            break
+                    if delay:
+                        self._throttled += 1
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                self._remove(ticket)
+                self._condition.notify_all()
+                raise
+
+            self.request_bucket.consume(1)
+            self.token_bucket.consume(tokens)
+            self._remove(ticket)
+            self._condition.notify_all()
+
+        waited = self._clock() - started
+        self._admitted[priority] += 1
+        self._tokens[priority] += tokens
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+        return waited
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Admissions and queue wait per priority"""
+        by_priority = {}
+        for priority in RequestPriority:
+            admitted = self._admitted[priority]
+            by_priority[priority.name.lower()] = {
+                "admitted": admitted,
+                "tokens": self._tokens[priority],
+                "queued": sum(len(queue) for queue in self._queues[priority].values()),
+                "avg_wait_ms": self._wait_total[priority] / admitted * 1000 if admitted else 0.0,
+                "max_wait_ms": self._wait_max[priority] * 1000
+            }
+        return {
+            "requests_per_minute": self.requests_per_minute,
+            "tokens_per_minute": self.tokens_per_minute,
+            "throttled": self._throttled,
+            "by_priority": by_priority
+        }
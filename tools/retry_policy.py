@@ -0,0 +1,275 @@
+"""
+Retry Policy - Enhanced BASED GOD CLI
+Backoff with jitter, Retry-After, retry budgets and per-endpoint circuit breakers
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+import httpx
+import openai
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the endpoint while its breaker is open"""
+
+    def __init__(self, endpoint: str, retry_in: float):
+        super().__init__(f"Circuit open for {endpoint}; retry in {retry_in:.1f}s")
+        self.endpoint = endpoint
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures, fails fast for
+    recovery_timeout seconds, then lets one probe call through (half-open)
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+        self.stats = {"opened": 0, "rejected": 0, "failures": 0, "successes": 0}
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.recovery_timeout - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go through now"""
+        if self.state == self.OPEN and self.retry_in() <= 0:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.stats["rejected"] += 1
+        return False
+
+    def record_success(self):
+        self.stats["successes"] += 1
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats["opened"] += 1
+                logger.warning(f"Circuit opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = self._clock()
+
+    def release(self):
+        """End a call that neither proved nor disproved endpoint health"""
+        self._probe_in_flight = False
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": self.retry_in() if self.state == self.OPEN else 0.0
+        }
+
+
+class RetryBudget:
+    """
+    Caps retries to min_retries plus ratio of the requests seen in the last
+    window seconds, so a failing endpoint is not hammered by retry storms
+    """
+
+    def __init__(self, ratio: float = 0.2, min_retries: int = 5, window: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.ratio = ratio
+        self.min_retries = min_retries
+        self.window = window
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+
+    def _trim(self, now: float):
+        for events in (self._requests, self._retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        self._requests.append(self._clock())
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget if any is left"""
+        now = self._clock()
+        self._trim(now)
+        if len(self._retries) >= self.min_retries + self.ratio * len(self._requests):
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def get_state(self) -> Dict[str, Any]:
+        self._trim(self._clock())
+        return {
+            "requests_in_window": len(self._requests),
+            "retries_in_window": len(self._retries),
+            "exhausted": self.exhausted
+        }
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    return getattr(error, "status_code", None)
+
+
+class RetryPolicy:
+    """
+    Runs calls with exponential backoff and full jitter
+    429, 408, 409, 5xx, connection errors and timeouts are retried; a
+    Retry-After header overrides the computed delay. 5xx, connection errors
+    and timeouts also count against the endpoint's circuit breaker
+    """
+
+    RETRYABLE_STATUS = {408, 409, 429}
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 0.5, max_delay: float = 20.0,
+                 budget: Optional[RetryBudget] = None,
+                 failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+                 rng: Callable[[], float] = random.random):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget or RetryBudget()
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._sleep = sleep
+        self._rng = rng
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats = {"calls": 0, "retries": 0, "succeeded_after_retry": 0, "failed": 0, "fast_failed": 0}
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.recovery_timeout)
+            self.breakers[endpoint] = breaker
+        return breaker
+
+    def is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError,
+                              httpx.TransportError, asyncio.TimeoutError)):
+            return True
+        status = _status_code(error)
+        return status is not None and (status in self.RETRYABLE_STATUS or status >= 500)
+
+    def is_outage(self, error: Exception) -> bool:
+        """Errors that say the endpoint itself is unhealthy"""
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError,
+                              httpx.TransportError, asyncio.TimeoutError)):
+            return True
+        status = _status_code(error)
+        return status is not None and status >= 500
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        """Server-requested delay in seconds, from Retry-After(-Ms) headers"""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if not headers:
+            return None
+        value = headers.get("retry-after-ms")
+        if value:
+            try:
+                return float(value) / 1000
+            except ValueError:
+                pass
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number attempt (0-based)"""
+        return self._rng() * min(self.max_delay, self.base_delay * (2 ** attempt))
+
+    async def call(self, endpoint: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run fn under the endpoint's breaker, retrying transient failures"""
+        breaker = self.breaker(endpoint)
+        self.stats["calls"] += 1
+        self.budget.record_request()
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.stats["fast_failed"] += 1
+                raise CircuitOpenError(endpoint, breaker.retry_in())
+
+            try:
+                result = await fn()
+            except Exception as error:
+                if self.is_outage(error):
+                    breaker.record_failure()
+                else:
+                    breaker.release()
+
+                if (not self.is_retryable(error) or attempt >= self.max_retries
+                        or not self.budget.try_spend()):
+                    self.stats["failed"] += 1
+                    raise
+
+                delay = self.retry_after(error)
+                delay = min(self.max_delay, delay) if delay is not None else self.backoff(attempt)
+                attempt += 1
+                self.stats["retries"] += 1
+                logger.info(f"Retrying {endpoint} in {delay:.2f}s (attempt {attempt}/{self.max_retries}): {error}")
+                await self._sleep(delay)
+                continue
+
+            breaker.record_success()
+            if attempt:
+                self.stats["succeeded_after_retry"] += 1
+            return result
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "budget": self.budget.get_state(),
+            "breakers": {endpoint: breaker.get_state() for endpoint, breaker in self.breakers.items()}
+        }
+
+
+_default_policy: Optional[RetryPolicy] = None
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Process-wide policy, so every tool shares the same breakers and budget"""
+    global _default_policy
+    if _default_policy is None:
+        _default_policy = RetryPolicy()
+    return _default_policy
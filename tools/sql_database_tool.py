@@ -6,19 +6,88 @@ Provides persistent storage for conversations, personas, memory, and more
 """
 
 import os
+import re
 import json
+import base64
 import sqlite3
 import asyncio
-from typing import Dict, Any, List, Optional, Union, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Union, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
-import aiosqlite
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
 from tools.base_tool import BaseTool, ToolResponse, ToolStatus
+from tools.sqlite_connection_pool import BatchedWriteQueue, get_connection_pool
+from tools.sqlite_migrations import Migration, apply_migrations
+
+
+# External-content FTS5 indexes mirroring memory and conversations.
+# Triggers keep them in sync; the memory update trigger only fires on indexed
+# columns so access-count bumps don't rewrite the index.
+FTS_SCHEMA = {
+    "memory_fts": [
+        """CREATE VIRTUAL TABLE memory_fts USING fts5(
+            content, category, tags,
+            content='memory', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS memory_fts_insert AFTER INSERT ON memory BEGIN
+            INSERT INTO memory_fts(rowid, content, category, tags)
+            VALUES (new.id, new.content, new.category, new.tags);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS memory_fts_delete AFTER DELETE ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, content, category, tags)
+            VALUES ('delete', old.id, old.content, old.category, old.tags);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS memory_fts_update AFTER UPDATE OF content, category, tags ON memory BEGIN
+            INSERT INTO memory_fts(memory_fts, rowid, content, category, tags)
+            VALUES ('delete', old.id, old.content, old.category, old.tags);
+            INSERT INTO memory_fts(rowid, content, category, tags)
+            VALUES (new.id, new.content, new.category, new.tags);
+        END"""
+    ],
+    "conversations_fts": [
+        """CREATE VIRTUAL TABLE conversations_fts USING fts5(
+            user_input, assistant_response,
+            content='conversations', content_rowid='id', tokenize='porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS conversations_fts_insert AFTER INSERT ON conversations BEGIN
+            INSERT INTO conversations_fts(rowid, user_input, assistant_response)
+            VALUES (new.id, new.user_input, new.assistant_response);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS conversations_fts_delete AFTER DELETE ON conversations BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, user_input, assistant_response)
+            VALUES ('delete', old.id, old.user_input, old.assistant_response);
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS conversations_fts_update AFTER UPDATE OF user_input, assistant_response ON conversations BEGIN
+            INSERT INTO conversations_fts(conversations_fts, rowid, user_input, assistant_response)
+            VALUES ('delete', old.id, old.user_input, old.assistant_response);
+            INSERT INTO conversations_fts(rowid, user_input, assistant_response)
+            VALUES (new.id, new.user_input, new.assistant_response);
+        END"""
+    ]
+}
+
+
+# Per-hour and per-day event counts keyed by (event_type, session, persona).
+# NULL session/persona are stored as '' / 0 so they take part in the
+# primary key. Rows are only ever added, so pruning raw events keeps totals.
+ROLLUP_BUCKETS = {
+    "analytics_rollup_hourly": "%Y-%m-%dT%H:00:00",
+    "analytics_rollup_daily": "%Y-%m-%d"
+}
+
+
+def _encode_page_token(values: List[Any]) -> str:
+    """Encode the sort key of the last row on a page as an opaque token"""
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def _decode_page_token(token: str) -> List[Any]:
+    """Decode a token produced by _encode_page_token"""
+    return json.loads(base64.urlsafe_b64decode(token.encode("ascii")).decode("utf-8"))
 
 
 @dataclass
@@ -79,9 +148,16 @@ class SQLDatabaseTool(BaseTool):
     Manages conversations, personas, memory, and context
     """
     
-    def __init__(self, db_path: str = "data/deepcli_database.db"):
+    def __init__(self, db_path: str = "data/deepcli_database.db",
+                 write_queue: bool = False,
+                 write_flush_interval: float = 0.05,
+                 write_batch_size: int = 256):
     
-        """Initialize SQL Database Tool"""
+        """Initialize SQL Database Tool
+        
+        With write_queue enabled, single-row writes from concurrent coroutines
+        are grouped and committed together every write_flush_interval seconds
+        """
         super().__init__(
             name="SQL Database",
             description="Persistent storage for conversations, personas, memory, and context",
@@ -96,112 +172,226 @@ class SQLDatabaseTool(BaseTool):
         )
         
         # Ensure data directory exists
-        data_dir = Path("data")
-        data_dir.mkdir(exist_ok=True)
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
-        self.db_path = str(data_dir / "deepcli_database.db")
+        self.db_path = str(db_path)
         self.console = Console()
         self._initialized = False
+        self.fts_enabled = False
+        
+        # Streaming reads: rows fetched per fetchmany, and the cap on rows
+        # materialized into a single ToolResponse
+        self.fetch_chunk_size = 500
+        self.max_result_rows = 10000
+        
+        # Shared pool: every tool opening this file reuses the same connections
+        self.pool = get_connection_pool(self.db_path)
+        self.write_queue = BatchedWriteQueue(
+            self.pool,
+            flush_interval=write_flush_interval,
+            max_batch=write_batch_size
+        ) if write_queue else None
         
         # Initialize database
         asyncio.create_task(self._initialize_database())
     
     async def _initialize_database(self) -> Any:
-        """Initialize database with tables"""
+        """Initialize database by applying any pending schema migrations"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                # Enable foreign keys
-                await db.execute("PRAGMA foreign_keys = ON")
-                
-                # Create personas table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS personas (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        name TEXT UNIQUE NOT NULL,
-                        description TEXT,
-                        personality_traits TEXT,
-                        knowledge_base TEXT,
-                        conversation_style TEXT,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        is_active BOOLEAN DEFAULT 1
-                    )
-                """)
-                
-                # Create conversations table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS conversations (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL,
-                        user_input TEXT NOT NULL,
-                        assistant_response TEXT NOT NULL,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        persona_id INTEGER,
-                        context TEXT,
-                        metadata TEXT,
-                        FOREIGN KEY (persona_id) REFERENCES personas(id)
-                    )
-                """)
-                
-                # Create memory table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS memory (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        category TEXT NOT NULL,
-                        content TEXT NOT NULL,
-                        importance INTEGER DEFAULT 5,
-                        access_count INTEGER DEFAULT 0,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        persona_id INTEGER,
-                        tags TEXT,
-                        FOREIGN KEY (persona_id) REFERENCES personas(id)
-                    )
-                """)
-                
-                # Create context table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS context (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        session_id TEXT NOT NULL,
-                        context_type TEXT NOT NULL,
-                        context_data TEXT NOT NULL,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        relevance_score REAL DEFAULT 0.0
-                    )
-                """)
-                
-                # Create analytics table
-                await db.execute("""
-                    CREATE TABLE IF NOT EXISTS analytics (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        event_type TEXT NOT NULL,
-                        event_data TEXT,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        session_id TEXT,
-                        persona_id INTEGER,
-                        FOREIGN KEY (persona_id) REFERENCES personas(id)
-                    )
-                """)
-                
-                # Create indexes
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations(session_id)")
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_conversations_persona ON conversations(persona_id)")
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_memory_category ON memory(category)")
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_memory_persona ON memory(persona_id)")
-                await db.execute("CREATE INDEX IF NOT EXISTS idx_context_session ON context(session_id)")
-                
-                await db.commit()
+            await apply_migrations(self.pool, self._schema_migrations())
+            
+            async with self.pool.write() as db:
+                cursor = await db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'memory_fts'"
+                )
+                self.fts_enabled = await cursor.fetchone() is not None
                 
                 # Initialize default Deanna persona
                 await self._create_deanna_persona(db)
                 
-                self._initialized = True
+            self._initialized = True
                 
         except Exception as e:
-            self.console.logger.info(f"[red]Database initialization failed: {str(e)}[/red]")
+            logger.error(f"Database initialization failed: {str(e)}")
             self._initialized = False
     
+    def _schema_migrations(self) -> List[Migration]:
+        """Schema history; append new steps, never edit applied ones
+        
+        Steps 1-4 use IF NOT EXISTS so databases created before versioning
+        (user_version 0) upgrade in place
+        """
+        return [
+            Migration(1, "base tables", [
+                """
+                CREATE TABLE IF NOT EXISTS personas (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE NOT NULL,
+                    description TEXT,
+                    personality_traits TEXT,
+                    knowledge_base TEXT,
+                    conversation_style TEXT,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    is_active BOOLEAN DEFAULT 1
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    user_input TEXT NOT NULL,
+                    assistant_response TEXT NOT NULL,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    persona_id INTEGER,
+                    context TEXT,
+                    metadata TEXT,
+                    FOREIGN KEY (persona_id) REFERENCES personas(id)
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS memory (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    category TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    importance INTEGER DEFAULT 5,
+                    access_count INTEGER DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_accessed TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    persona_id INTEGER,
+                    tags TEXT,
+                    FOREIGN KEY (persona_id) REFERENCES personas(id)
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS context (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_id TEXT NOT NULL,
+                    context_type TEXT NOT NULL,
+                    context_data TEXT NOT NULL,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    relevance_score REAL DEFAULT 0.0
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS analytics (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_type TEXT NOT NULL,
+                    event_data TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    session_id TEXT,
+                    persona_id INTEGER,
+                    FOREIGN KEY (persona_id) REFERENCES personas(id)
+                )
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_conversations_session ON conversations(session_id)",
+                "CREATE INDEX IF NOT EXISTS idx_conversations_persona ON conversations(persona_id)",
+                "CREATE INDEX IF NOT EXISTS idx_memory_category ON memory(category)",
+                "CREATE INDEX IF NOT EXISTS idx_memory_persona ON memory(persona_id)",
+                "CREATE INDEX IF NOT EXISTS idx_context_session ON context(session_id)"
+            ]),
+            Migration(2, "conversation messages", [
+                """
+                CREATE TABLE IF NOT EXISTS conversation_messages (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    conversation_id TEXT NOT NULL,
+                    message_index INTEGER NOT NULL,
+                    role TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """,
+                "CREATE INDEX IF NOT EXISTS idx_conversation_messages_conversation ON conversation_messages(conversation_id, message_index)"
+            ]),
+            Migration(3, "full-text search", apply=self._create_fts_tables),
+            Migration(4, "analytics rollups", [
+                "CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics(timestamp)"
+            ], apply=self._create_analytics_rollups),
+            Migration(5, "composite indexes for hot queries", [
+                # get_memory: importance filter + ordering, optionally by persona or category
+                "CREATE INDEX IF NOT EXISTS idx_memory_importance ON memory(importance DESC, last_accessed DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_memory_persona_importance ON memory(persona_id, importance DESC, last_accessed DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_memory_category_importance ON memory(category, importance DESC, last_accessed DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_memory_importance_access ON memory(importance DESC, access_count DESC)",
+                # get_conversations: newest first, by session or persona
+                "CREATE INDEX IF NOT EXISTS idx_conversations_timestamp ON conversations(timestamp DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_conversations_session_timestamp ON conversations(session_id, timestamp DESC)",
+                "CREATE INDEX IF NOT EXISTS idx_conversations_persona_timestamp ON conversations(persona_id, timestamp DESC)",
+                # get_context: per session, most relevant first
+                "CREATE INDEX IF NOT EXISTS idx_context_session_relevance ON context(session_id, relevance_score DESC, timestamp DESC)",
+                # Superseded by the composites above
+                "DROP INDEX IF EXISTS idx_conversations_session",
+                "DROP INDEX IF EXISTS idx_conversations_persona",
+                "DROP INDEX IF EXISTS idx_memory_category",
+                "DROP INDEX IF EXISTS idx_memory_persona",
+                "DROP INDEX IF EXISTS idx_context_session"
+            ])
+        ]
+    
+    async def _create_fts_tables(self, db):
+        """Create FTS5 mirrors and triggers, backfilling indexes created on an existing database"""
+        try:
+            for fts_table, statements in FTS_SCHEMA.items():
+                cursor = await db.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (fts_table,)
+                )
+                exists = await cursor.fetchone()
+                if not exists:
+                    await db.execute(statements[0])
+                for trigger in statements[1:]:
+                    await db.execute(trigger)
+                if not exists:
+                    await db.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+            self.fts_enabled = True
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5: full_text_search falls back to LIKE
+            logger.warning(f"FTS5 unavailable, using LIKE search: {str(e)}")
+            self.fts_enabled = False
+    
+    async def _create_analytics_rollups(self, db):
+        """Create rollup tables and the insert trigger that maintains them"""
+        upserts = []
+        for table, bucket_format in ROLLUP_BUCKETS.items():
+            cursor = await db.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            )
+            exists = await cursor.fetchone()
+            
+            await db.execute(f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    bucket TEXT NOT NULL,
+                    event_type TEXT NOT NULL,
+                    session_id TEXT NOT NULL DEFAULT '',
+                    persona_id INTEGER NOT NULL DEFAULT 0,
+                    event_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (bucket, event_type, session_id, persona_id)
+                ) WITHOUT ROWID
+            """)
+            
+            # Backfill from events recorded before the rollup existed
+            if not exists:
+                await db.execute(f"""
+                    INSERT INTO {table} (bucket, event_type, session_id, persona_id, event_count)
+                    SELECT strftime('{bucket_format}', timestamp), event_type,
+                           COALESCE(session_id, ''), COALESCE(persona_id, 0), COUNT(*)
+                    FROM analytics
+                    GROUP BY 1, 2, 3, 4
+                """)
+            
+            upserts.append(f"""
+                INSERT INTO {table} (bucket, event_type, session_id, persona_id, event_count)
+                VALUES (strftime('{bucket_format}', new.timestamp), new.event_type,
+                        COALESCE(new.session_id, ''), COALESCE(new.persona_id, 0), 1)
+                ON CONFLICT (bucket, event_type, session_id, persona_id)
+                DO UPDATE SET event_count = event_count + 1;
+            """)
+        
+        await db.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS analytics_rollup_insert AFTER INSERT ON analytics BEGIN
+                {"".join(upserts)}
+            END
+        """)
+    
     async def _create_deanna_persona(self, db) -> Any:
         """Create the default Deanna persona"""
         try:
@@ -242,11 +432,10 @@ class SQLDatabaseTool(BaseTool):
                 """, (deanna.name, deanna.description, deanna.personality_traits, 
                       deanna.knowledge_base, deanna.conversation_style, deanna.created_at, deanna.updated_at))
                 
-                await db.commit()
-                self.console.logger.info("[green]Created Deanna persona[/green]")
+                logger.info("Created Deanna persona")
                 
         except Exception as e:
-            self.console.logger.info(f"[yellow]Failed to create Deanna persona: {str(e)}[/yellow]")
+            logger.warning(f"Failed to create Deanna persona: {str(e)}")
     
     async def execute(self, **kwargs) -> ToolResponse:
         """Execute database operations"""
@@ -264,6 +453,21 @@ class SQLDatabaseTool(BaseTool):
                 return await self._store_persona(kwargs)
             elif operation == 'store_memory':
                 return await self._store_memory(kwargs)
+            elif operation == 'store_memories_bulk':
+                return await self.store_memories_bulk(kwargs.get('memories', []))
+            elif operation == 'store_messages_bulk':
+                return await self.store_messages_bulk(
+                    kwargs.get('conversation_id'),
+                    kwargs.get('messages', []),
+                    start_index=kwargs.get('start_index', 0)
+                )
+            elif operation == 'flush_writes':
+                await self.flush_writes()
+                return ToolResponse(
+                    success=True,
+                    message="Pending writes committed",
+                    data=self.get_pool_metrics()
+                )
             elif operation == 'get_memory':
                 return await self._get_memory(kwargs)
             elif operation == 'update_persona':
@@ -278,6 +482,16 @@ class SQLDatabaseTool(BaseTool):
                 return await self._execute_query(kwargs)
             elif operation == 'get_analytics':
                 return await self._get_analytics(kwargs)
+            elif operation == 'prune_analytics':
+                return await self.prune_analytics(kwargs.get('retention_days', 30))
+            elif operation == 'full_text_search':
+                return await self._full_text_search(kwargs)
+            elif operation == 'pool_metrics':
+                return ToolResponse(
+                    success=True,
+                    message="Connection pool metrics",
+                    data=self.get_pool_metrics()
+                )
             else:
                 return ToolResponse(
                     success=False,
@@ -292,6 +506,140 @@ class SQLDatabaseTool(BaseTool):
                 status=ToolStatus.FAILED
             )
     
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Get pool-wait and query-time metrics for this database"""
+        metrics = self.pool.get_metrics()
+        if self.write_queue is not None:
+            metrics["write_queue"] = self.write_queue.get_metrics()
+        return metrics
+    
+    async def iter_query(self, query: str, params: Optional[Union[List[Any], Tuple[Any, ...]]] = None,
+                         chunk_size: Optional[int] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Stream rows of a SELECT, fetching chunk_size rows at a time
+        
+        A reader connection is held until the iterator is exhausted or closed
+        """
+        if not query.strip().upper().startswith('SELECT'):
+            raise ValueError("Only SELECT queries are allowed")
+        
+        chunk_size = chunk_size or self.fetch_chunk_size
+        async with self.pool.read() as db:
+            async with db.execute(query, params or []) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield dict(row)
+    
+    async def _write(self, work):
+        """Run a write unit, through the batching queue when enabled"""
+        if self.write_queue is not None:
+            return await self.write_queue.submit(work)
+        async with self.pool.write() as db:
+            return await work(db)
+    
+    async def flush_writes(self):
+        """Commit any writes still waiting in the batching queue"""
+        if self.write_queue is not None:
+            await self.write_queue.flush()
+    
+    async def close(self):
+        """Flush queued writes; the shared pool is closed by close_all_pools"""
+        if self.write_queue is not None:
+            await self.write_queue.close()
+    
+    async def store_memories_bulk(self, memories: List[Dict[str, Any]]) -> ToolResponse:
+        """Store many memory entries with one executemany in one transaction"""
+        if not memories:
+            return ToolResponse(
+                success=True,
+                message="No memories to store",
+                data={"memory_ids": []}
+            )
+        
+        rows = [
+            (
+                memory.get('category', 'general'),
+                memory.get('content', ''),
+                memory.get('importance', 5),
+                memory.get('persona_id'),
+                json.dumps(memory.get('tags', []))
+            )
+            for memory in memories
+        ]
+        
+        async with self.pool.write() as db:
+            await db.executemany("""
+                INSERT INTO memory (category, content, importance, persona_id, tags)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            cursor = await db.execute("SELECT last_insert_rowid()")
+            last_id = (await cursor.fetchone())[0]
+        
+        # The single writer inserts the batch contiguously
+        first_id = last_id - len(rows) + 1
+        return ToolResponse(
+            success=True,
+            message=f"Stored {len(rows)} memories",
+            data={"memory_ids": list(range(first_id, last_id + 1))}
+        )
+    
+    async def delete_memories_bulk(self, memory_ids: List[int]) -> ToolResponse:
+        """Delete many memory entries in one transaction"""
+        if memory_ids:
+            async with self.pool.write() as db:
+                await db.executemany("DELETE FROM memory WHERE id = ?", [(i,) for i in memory_ids])
+        
+        return ToolResponse(
+            success=True,
+            message=f"Deleted {len(memory_ids)} memories",
+            data={"deleted": len(memory_ids)}
+        )
+    
+    async def store_messages_bulk(self, conversation_id: str, messages: List[Dict[str, Any]],
+                                  start_index: int = 0) -> ToolResponse:
+        """Append many messages to a conversation with one executemany in one transaction"""
+        if not conversation_id:
+            return ToolResponse(
+                success=False,
+                message="conversation_id is required",
+                status=ToolStatus.FAILED
+            )
+        
+        async with self.pool.write() as db:
+            await self._insert_messages(db, conversation_id, messages, start_index)
+        
+        return ToolResponse(
+            success=True,
+            message=f"Stored {len(messages)} messages",
+            data={
+                "conversation_id": conversation_id,
+                "messages_stored": len(messages)
+            }
+        )
+    
+    async def _insert_messages(self, db, conversation_id: str, messages: List[Dict[str, Any]],
+                               start_index: int = 0):
+        """Insert conversation messages on an open write connection"""
+        if not messages:
+            return
+        now = datetime.now().isoformat()
+        await db.executemany("""
+            INSERT INTO conversation_messages 
+            (conversation_id, message_index, role, content, timestamp)
+            VALUES (?, ?, ?, ?, ?)
+        """, [
+            (
+                conversation_id,
+                start_index + i,
+                message.get("role", "user"),
+                message.get("content", ""),
+                message.get("timestamp", now)
+            )
+            for i, message in enumerate(messages)
+        ])
+    
     async def store_conversation(self, conversation_data: Dict[str, Any]) -> ToolResponse:
         """Store conversation in database"""
         try:
@@ -301,7 +649,7 @@ class SQLDatabaseTool(BaseTool):
             persona_id = conversation_data.get("persona_id")
             metadata = conversation_data.get("metadata", {})
             
-            async with aiosqlite.connect(self.db_path) as db:
+            async def work(db):
                 # Store conversation
                 await db.execute("""
                     INSERT OR REPLACE INTO conversations 
@@ -317,20 +665,9 @@ class SQLDatabaseTool(BaseTool):
                 ))
                 
                 # Store messages
-                for i, message in enumerate(messages):
-                    await db.execute("""
-                        INSERT INTO conversation_messages 
-                        (conversation_id, message_index, role, content, timestamp)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (
-                        conversation_id,
-                        i,
-                        message.get("role", "user"),
-                        message.get("content", ""),
-                        message.get("timestamp", datetime.now().isoformat())
-                    ))
-                
-                await db.commit()
+                await self._insert_messages(db, conversation_id, messages)
+            
+            await self._write(work)
             
             return ToolResponse(
                 success=True,
@@ -343,7 +680,7 @@ class SQLDatabaseTool(BaseTool):
             )
             
         except Exception as e:
-            self.console.logger.info(f"[red]Failed to store conversation: {str(e)}[/red]")
+            logger.error(f"Failed to store conversation: {str(e)}")
             return ToolResponse(
                 success=False,
                 data={"error": str(e)},
@@ -353,7 +690,7 @@ class SQLDatabaseTool(BaseTool):
     async def get_conversation(self, conversation_id: str) -> ToolResponse:
         """Get conversation by ID"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.read() as db:
                 # Get conversation
                 async with db.execute("""
                     SELECT id, user_id, persona_id, metadata, created_at, updated_at
@@ -402,56 +739,62 @@ class SQLDatabaseTool(BaseTool):
                 )
                 
         except Exception as e:
-            self.console.logger.info(f"[red]Failed to get conversation: {str(e)}[/red]")
+            logger.error(f"Failed to get conversation: {str(e)}")
             return ToolResponse(
                 success=False,
                 data={"error": str(e)},
                 message=f"Failed to get conversation: {str(e)}"
             )
     
-    async def list_conversations(self, user_id: str = None, limit: int = 50) -> ToolResponse:
-        """List conversations"""
+    async def list_conversations(self, session_id: str = None, limit: int = 50,
+                                 page_token: Optional[str] = None) -> ToolResponse:
+        """List conversations, newest first, one keyset page at a time"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                if user_id:
-                    async with db.execute("""
-                        SELECT id, user_id, persona_id, created_at, updated_at
-                        FROM conversations 
-                        WHERE user_id = ?
-                        ORDER BY updated_at DESC
-                        LIMIT ?
-                    """, (user_id, limit)) as cursor:
-                        rows = await cursor.fetchall()
-                else:
-                    async with db.execute("""
-                        SELECT id, user_id, persona_id, created_at, updated_at
-                        FROM conversations 
-                        ORDER BY updated_at DESC
-                        LIMIT ?
-                    """, (limit,)) as cursor:
-                        rows = await cursor.fetchall()
+            query = """
+                SELECT id, session_id, persona_id, timestamp
+                FROM conversations WHERE 1=1
+            """
+            params: List[Any] = []
+            if session_id:
+                query += " AND session_id = ?"
+                params.append(session_id)
+            if page_token:
+                last_timestamp, last_id = _decode_page_token(page_token)
+                query += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+                params.extend([last_timestamp, last_timestamp, last_id])
+            query += " ORDER BY timestamp DESC, id DESC LIMIT ?"
+            params.append(limit + 1)
+            
+            async with self.pool.read() as db:
+                async with db.execute(query, params) as cursor:
+                    rows = await cursor.fetchall()
+                
+                next_page_token = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_page_token = _encode_page_token([rows[-1][3], rows[-1][0]])
                 
                 conversations = []
                 for row in rows:
                     conversations.append({
                         "id": row[0],
-                        "user_id": row[1],
+                        "session_id": row[1],
                         "persona_id": row[2],
-                        "created_at": row[3],
-                        "updated_at": row[4]
+                        "timestamp": row[3]
                     })
                 
                 return ToolResponse(
                     success=True,
                     data={
                         "conversations": conversations,
-                        "total": len(conversations)
+                        "total": len(conversations),
+                        "next_page_token": next_page_token
                     },
                     message=f"Retrieved {len(conversations)} conversations"
                 )
                 
         except Exception as e:
-            self.console.logger.info(f"[red]Failed to list conversations: {str(e)}[/red]")
+            logger.error(f"Failed to list conversations: {str(e)}")
             return ToolResponse(
                 success=False,
                 data={"error": str(e)},
@@ -461,7 +804,7 @@ class SQLDatabaseTool(BaseTool):
     async def delete_conversation(self, conversation_id: str) -> ToolResponse:
         """Delete conversation by ID"""
         try:
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.pool.write() as db:
                 # Delete messages first
                 await db.execute("""
                     DELETE FROM conversation_messages WHERE conversation_id = ?
@@ -472,7 +815,6 @@ class SQLDatabaseTool(BaseTool):
                     DELETE FROM conversations WHERE id = ?
                 """, (conversation_id,))
                 
-                await db.commit()
             
             return ToolResponse(
                 success=True,
@@ -481,7 +823,7 @@ class SQLDatabaseTool(BaseTool):
             )
             
         except Exception as e:
-            self.console.logger.info(f"[red]Failed to delete conversation: {str(e)}[/red]")
+            logger.error(f"Failed to delete conversation: {str(e)}")
             return ToolResponse(
                 success=False,
                 data={"error": str(e)},
@@ -500,24 +842,23 @@ class SQLDatabaseTool(BaseTool):
             metadata=json.dumps(kwargs.get('metadata', {}))
         )
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async def work(db):
             cursor = await db.execute("""
                 INSERT INTO conversations (session_id, user_input, assistant_response, timestamp, persona_id, context, metadata)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
             """, (conversation.session_id, conversation.user_input, conversation.assistant_response,
                   conversation.timestamp, conversation.persona_id, conversation.context, conversation.metadata))
-            
-            await db.commit()
-            conversation.id = cursor.lastrowid
+            conversation_id = cursor.lastrowid
             
             # Log analytics event
             await db.execute("""
                 INSERT INTO analytics (event_type, event_data, session_id, persona_id)
                 VALUES (?, ?, ?, ?)
-            """, ('conversation_stored', json.dumps({'conversation_id': conversation.id}), 
+            """, ('conversation_stored', json.dumps({'conversation_id': conversation_id}), 
                   conversation.session_id, conversation.persona_id))
-            
-            await db.commit()
+            return conversation_id
+        
+        conversation.id = await self._write(work)
         
         return ToolResponse(
             success=True,
@@ -526,11 +867,16 @@ class SQLDatabaseTool(BaseTool):
         )
     
     async def _get_conversations(self, kwargs: Dict[str, Any]) -> ToolResponse:
-        """Get conversations with filters"""
+        """Get conversations with filters
+        
+        Pass the returned next_page_token back as page_token to continue;
+        keyset paging on (timestamp, id) stays fast at any depth, unlike offset
+        """
         session_id = kwargs.get('session_id')
         persona_id = kwargs.get('persona_id')
         limit = kwargs.get('limit', 10)
         offset = kwargs.get('offset', 0)
+        page_token = kwargs.get('page_token')
         
         query = "SELECT * FROM conversations WHERE 1=1"
         params = []
@@ -543,25 +889,34 @@ class SQLDatabaseTool(BaseTool):
             query += " AND persona_id = ?"
             params.append(persona_id)
         
-        query += " ORDER BY timestamp DESC LIMIT ? OFFSET ?"
-        params.extend([limit, offset])
+        if page_token:
+            last_timestamp, last_id = _decode_page_token(page_token)
+            query += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+            params.extend([last_timestamp, last_timestamp, last_id])
+            offset = 0
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(query, params)
-            rows = await cursor.fetchall()
-            
-            conversations = []
-            for row in rows:
-                conv = dict(row)
-                if conv['metadata']:
-                    conv['metadata'] = json.loads(conv['metadata'])
-                conversations.append(conv)
+        query += " ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?"
+        params.extend([limit + 1, offset])
+        
+        conversations = []
+        async for conv in self.iter_query(query, params):
+            if conv['metadata']:
+                conv['metadata'] = json.loads(conv['metadata'])
+            conversations.append(conv)
+        
+        next_page_token = None
+        if len(conversations) > limit:
+            conversations = conversations[:limit]
+            last = conversations[-1]
+            next_page_token = _encode_page_token([last['timestamp'], last['id']])
         
         return ToolResponse(
             success=True,
             message=f"Retrieved {len(conversations)} conversations",
-            data={"conversations": conversations}
+            data={
+                "conversations": conversations,
+                "next_page_token": next_page_token
+            }
         )
     
     async def _store_persona(self, kwargs: Dict[str, Any]) -> ToolResponse:
@@ -575,14 +930,13 @@ class SQLDatabaseTool(BaseTool):
             is_active=kwargs.get('is_active', True)
         )
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.write() as db:
             cursor = await db.execute("""
                 INSERT INTO personas (name, description, personality_traits, knowledge_base, conversation_style, is_active)
                 VALUES (?, ?, ?, ?, ?, ?)
             """, (persona.name, persona.description, persona.personality_traits, 
                   persona.knowledge_base, persona.conversation_style, persona.is_active))
             
-            await db.commit()
             persona.id = cursor.lastrowid
         
         return ToolResponse(
@@ -601,14 +955,14 @@ class SQLDatabaseTool(BaseTool):
             tags=json.dumps(kwargs.get('tags', []))
         )
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async def work(db):
             cursor = await db.execute("""
                 INSERT INTO memory (category, content, importance, persona_id, tags)
                 VALUES (?, ?, ?, ?, ?)
             """, (memory.category, memory.content, memory.importance, memory.persona_id, memory.tags))
-            
-            await db.commit()
-            memory.id = cursor.lastrowid
+            return cursor.lastrowid
+        
+        memory.id = await self._write(work)
         
         return ToolResponse(
             success=True,
@@ -637,8 +991,7 @@ class SQLDatabaseTool(BaseTool):
         query += " ORDER BY importance DESC, last_accessed DESC LIMIT ?"
         params.append(limit)
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.read() as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
             
@@ -648,14 +1001,15 @@ class SQLDatabaseTool(BaseTool):
                 if mem['tags']:
                     mem['tags'] = json.loads(mem['tags'])
                 memories.append(mem)
-                
-                # Update access count
-                await db.execute(
+        
+        # Update access counts in one write
+        if memories:
+            now = datetime.now().isoformat()
+            async with self.pool.write() as db:
+                await db.executemany(
                     "UPDATE memory SET access_count = access_count + 1, last_accessed = ? WHERE id = ?",
-                    (datetime.now().isoformat(), row['id'])
+                    [(now, mem['id']) for mem in memories]
                 )
-            
-            await db.commit()
         
         return ToolResponse(
             success=True,
@@ -697,9 +1051,8 @@ class SQLDatabaseTool(BaseTool):
         query = f"UPDATE personas SET {', '.join(set_clauses)} WHERE name = ?"
         params.append(persona_name)
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.pool.write() as db:
             await db.execute(query, params)
-            await db.commit()
         
         return ToolResponse(
             success=True,
@@ -711,8 +1064,7 @@ class SQLDatabaseTool(BaseTool):
         """Get persona information"""
         persona_name = kwargs.get('name', 'Deanna')
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.read() as db:
             cursor = await db.execute(
                 "SELECT * FROM personas WHERE name = ? AND is_active = 1",
                 (persona_name,)
@@ -748,15 +1100,15 @@ class SQLDatabaseTool(BaseTool):
             relevance_score=kwargs.get('relevance_score', 0.0)
         )
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async def work(db):
             cursor = await db.execute("""
                 INSERT INTO context (session_id, context_type, context_data, timestamp, relevance_score)
                 VALUES (?, ?, ?, ?, ?)
             """, (context.session_id, context.context_type, context.context_data, 
                   context.timestamp, context.relevance_score))
-            
-            await db.commit()
-            context.id = cursor.lastrowid
+            return cursor.lastrowid
+        
+        context.id = await self._write(work)
         
         return ToolResponse(
             success=True,
@@ -785,8 +1137,7 @@ class SQLDatabaseTool(BaseTool):
         query += " ORDER BY relevance_score DESC, timestamp DESC LIMIT ?"
         params.append(limit)
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
+        async with self.pool.read() as db:
             cursor = await db.execute(query, params)
             rows = await cursor.fetchall()
             
@@ -823,75 +1174,222 @@ class SQLDatabaseTool(BaseTool):
                 status=ToolStatus.FAILED
             )
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(query, params)
-            rows = await cursor.fetchall()
-            
-            results = [dict(row) for row in rows]
+        results, truncated = await self._collect_rows(
+            query, params, kwargs.get('max_rows', self.max_result_rows)
+        )
         
         return ToolResponse(
             success=True,
-            message=f"Query executed, returned {len(results)} rows",
-            data={"results": results}
+            message=f"Query executed, returned {len(results)} rows" + (" (truncated)" if truncated else ""),
+            data={"results": results, "truncated": truncated}
         )
     
+    async def _collect_rows(self, query: str, params: List[Any],
+                            max_rows: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """Stream a query into a list of at most max_rows rows; returns (rows, truncated)"""
+        results = []
+        truncated = False
+        rows = self.iter_query(query, params)
+        try:
+            async for row in rows:
+                if len(results) >= max_rows:
+                    truncated = True
+                    break
+                results.append(row)
+        finally:
+            await rows.aclose()
+        return results, truncated
+    
+    @staticmethod
+    def _build_fts_query(text: str) -> str:
+        """Turn free text into an FTS5 MATCH expression (OR of quoted terms)"""
+        terms = re.findall(r"\w+", text)
+        return " OR ".join(f'"{term}"' for term in terms)
+    
+    async def _full_text_search(self, kwargs: Dict[str, Any]) -> ToolResponse:
+        """BM25-ranked full-text search over memory and conversations"""
+        query = kwargs.get('query', '')
+        tables = kwargs.get('tables', ['memory', 'conversations'])
+        persona_id = kwargs.get('persona_id')
+        session_id = kwargs.get('session_id')
+        limit = kwargs.get('limit', 10)
+        
+        match = self._build_fts_query(query)
+        if not match:
+            return ToolResponse(
+                success=False,
+                message="No searchable terms in query",
+                status=ToolStatus.FAILED
+            )
+        
+        results = {"memory": [], "conversations": []}
+        async with self.pool.read() as db:
+            if 'memory' in tables:
+                results["memory"] = await self._search_table(
+                    db, "memory", query, match, limit,
+                    [("persona_id", persona_id)]
+                )
+            if 'conversations' in tables:
+                results["conversations"] = await self._search_table(
+                    db, "conversations", query, match, limit,
+                    [("persona_id", persona_id), ("session_id", session_id)]
+                )
+        
+        for row in results["memory"]:
+            if row.get('tags'):
+                row['tags'] = json.loads(row['tags'])
+        for row in results["conversations"]:
+            if row.get('metadata'):
+                row['metadata'] = json.loads(row['metadata'])
+        
+        combined = [
+            {**row, "source": source}
+            for source, rows in results.items()
+            for row in rows
+        ]
+        combined.sort(key=lambda r: r['score'], reverse=True)
+        
+        return ToolResponse(
+            success=True,
+            message=f"Full-text search returned {len(combined)} results",
+            data={
+                "query": query,
+                "results": combined[:limit],
+                "memory_results": results["memory"],
+                "conversation_results": results["conversations"],
+                "ranking": "bm25" if self.fts_enabled else "like"
+            }
+        )
+    
+    async def _search_table(self, db, table: str, query: str, match: str, limit: int,
+                            filters: List[Tuple[str, Any]]) -> List[Dict[str, Any]]:
+        """Search one table through its FTS mirror, or LIKE when FTS5 is unavailable"""
+        where = []
+        params: List[Any] = []
+        for column, value in filters:
+            if value:
+                where.append(f"t.{column} = ?")
+                params.append(value)
+        
+        if self.fts_enabled:
+            fts_table = f"{table}_fts"
+            sql = f"""
+                SELECT t.*, bm25({fts_table}) AS rank,
+                       snippet({fts_table}, -1, '[', ']', '...', 12) AS snippet
+                FROM {fts_table} JOIN {table} t ON t.id = {fts_table}.rowid
+                WHERE {fts_table} MATCH ?
+            """
+            params.insert(0, match)
+            if where:
+                sql += " AND " + " AND ".join(where)
+            sql += " ORDER BY rank LIMIT ?"
+        else:
+            columns = ["content"] if table == "memory" else ["user_input", "assistant_response"]
+            like = " OR ".join(f"t.{column} LIKE ?" for column in columns)
+            sql = f"SELECT t.*, 0.0 AS rank, NULL AS snippet FROM {table} t WHERE ({like})"
+            params = [f"%{query}%"] * len(columns) + params
+            if where:
+                sql += " AND " + " AND ".join(where)
+            sql += " ORDER BY t.id DESC LIMIT ?"
+        params.append(limit)
+        
+        cursor = await db.execute(sql, params)
+        rows = []
+        for row in await cursor.fetchall():
+            item = dict(row)
+            # bm25() is lower-is-better; expose a higher-is-better score
+            item['score'] = -item.pop('rank')
+            rows.append(item)
+        return rows
+    
     async def _get_analytics(self, kwargs: Dict[str, Any]) -> ToolResponse:
-        """Get analytics data"""
+        """Get analytics data
+        
+        Summary and daily series come from the rollup tables, so cost tracks
+        the number of buckets rather than the number of raw events. Only the
+        most recent event_limit raw events are returned.
+        """
         event_type = kwargs.get('event_type')
         session_id = kwargs.get('session_id')
         persona_id = kwargs.get('persona_id')
         days = kwargs.get('days', 7)
+        event_limit = kwargs.get('event_limit', 100)
         
-        # Calculate date threshold
-        date_threshold = datetime.now().timestamp() - (days * 24 * 60 * 60)
-        date_threshold_str = datetime.fromtimestamp(date_threshold).isoformat()
-        
-        query = "SELECT * FROM analytics WHERE timestamp >= ?"
-        params = [date_threshold_str]
+        filters = ""
+        filter_params = []
         
         if event_type:
-            query += " AND event_type = ?"
-            params.append(event_type)
+            filters += " AND event_type = ?"
+            filter_params.append(event_type)
         
         if session_id:
-            query += " AND session_id = ?"
-            params.append(session_id)
+            filters += " AND session_id = ?"
+            filter_params.append(session_id)
         
         if persona_id:
-            query += " AND persona_id = ?"
-            params.append(persona_id)
+            filters += " AND persona_id = ?"
+            filter_params.append(persona_id)
         
-        query += " ORDER BY timestamp DESC"
+        period = f"-{int(days)} days"
         
-        async with aiosqlite.connect(self.db_path) as db:
-            db.row_factory = aiosqlite.Row
-            cursor = await db.execute(query, params)
-            rows = await cursor.fetchall()
+        async with self.pool.read() as db:
+            cursor = await db.execute(f"""
+                SELECT event_type, SUM(event_count) AS total
+                FROM analytics_rollup_hourly
+                WHERE bucket >= strftime('{ROLLUP_BUCKETS["analytics_rollup_hourly"]}', 'now', ?){filters}
+                GROUP BY event_type
+            """, [period, *filter_params])
+            event_counts = {row['event_type']: row['total'] for row in await cursor.fetchall()}
+            
+            cursor = await db.execute(f"""
+                SELECT bucket, SUM(event_count) AS total
+                FROM analytics_rollup_daily
+                WHERE bucket >= strftime('{ROLLUP_BUCKETS["analytics_rollup_daily"]}', 'now', ?){filters}
+                GROUP BY bucket
+                ORDER BY bucket
+            """, [period, *filter_params])
+            daily_counts = {row['bucket']: row['total'] for row in await cursor.fetchall()}
+            
+            cursor = await db.execute(f"""
+                SELECT * FROM analytics
+                WHERE timestamp >= datetime('now', ?){filters}
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, [period, *filter_params, event_limit])
             
             events = []
-            for row in rows:
+            for row in await cursor.fetchall():
                 evt = dict(row)
                 if evt['event_data']:
                     evt['event_data'] = json.loads(evt['event_data'])
                 events.append(evt)
-            
-            # Generate summary statistics
-            event_counts = {}
-            for event in events:
-                event_type = event['event_type']
-                event_counts[event_type] = event_counts.get(event_type, 0) + 1
         
         return ToolResponse(
             success=True,
-            message=f"Retrieved {len(events)} analytics events",
+            message=f"Retrieved {sum(event_counts.values())} analytics events",
             data={
                 "events": events,
                 "summary": event_counts,
+                "daily": daily_counts,
                 "period_days": days
             }
         )
     
+    async def prune_analytics(self, retention_days: int = 30) -> ToolResponse:
+        """Delete raw analytics events older than retention_days; rollups keep their counts"""
+        async with self.pool.write() as db:
+            cursor = await db.execute(
+                "DELETE FROM analytics WHERE timestamp < datetime('now', ?)",
+                (f"-{int(retention_days)} days",)
+            )
+            deleted = cursor.rowcount
+        
+        return ToolResponse(
+            success=True,
+            message=f"Pruned {deleted} analytics events older than {retention_days} days",
+            data={"deleted": deleted, "retention_days": retention_days}
+        )
+    
     def get_schema(self) -> Dict[str, Any]:
         """Get tool schema"""
         return {
@@ -901,7 +1399,9 @@ class SQLDatabaseTool(BaseTool):
                     "type": "string",
                     "enum": ["store_conversation", "get_conversations", "store_memory", 
                             "get_memory", "update_persona", "get_persona", "store_context",
-                            "get_context", "execute_query", "get_analytics"],
+                            "get_context", "execute_query", "get_analytics", "pool_metrics",
+                            "store_memories_bulk", "store_messages_bulk", "flush_writes",
+                            "full_text_search", "prune_analytics"],
                     "description": "Database operation to perform"
                 },
                 "session_id": {"type": "string", "description": "Session identifier"},
@@ -919,8 +1419,16 @@ class SQLDatabaseTool(BaseTool):
                 "params": {"type": "array", "description": "Query parameters"},
                 "limit": {"type": "integer", "description": "Result limit"},
                 "offset": {"type": "integer", "description": "Result offset"},
+                "page_token": {"type": "string", "description": "Keyset pagination token from a previous get_conversations call"},
+                "max_rows": {"type": "integer", "description": "Row cap for execute_query"},
+                "days": {"type": "integer", "description": "Analytics period in days"},
+                "retention_days": {"type": "integer", "description": "Raw analytics events older than this are pruned"},
                 "updates": {"type": "object", "description": "Updates to apply"},
                 "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags"},
+                "tables": {"type": "array", "items": {"type": "string", "enum": ["memory", "conversations"]}, "description": "Tables to search for full_text_search"},
+                "memories": {"type": "array", "items": {"type": "object"}, "description": "Memory entries for store_memories_bulk"},
+                "conversation_id": {"type": "string", "description": "Conversation ID for store_messages_bulk"},
+                "messages": {"type": "array", "items": {"type": "object"}, "description": "Messages with role/content for store_messages_bulk"},
                 "metadata": {"type": "object", "description": "Additional metadata"}
             },
             "required": ["operation"]
@@ -947,56 +1455,20 @@ class SQLDatabaseTool(BaseTool):
                 values.append(value)
             where_clause = " WHERE " + " AND ".join(where_parts)
         
+        max_rows = kwargs.get("max_rows", self.max_result_rows)
         query = f"SELECT * FROM {table}{where_clause} LIMIT ?"
-        values.append(limit)
+        values.append(min(limit, max_rows + 1))
         
         try:
-            async with aiosqlite.connect(self.db_path) as db:
-                async with db.execute(query, values) as cursor:
-                    rows = await cursor.fetchall()
-                    columns = [description[0] for description in cursor.description] if cursor.description else []
-                    
-                    results = []
-                    for row in rows:
-                        results.append(dict(zip(columns, row)))
-                    
-                    return ToolResponse(
-                        success=True,
-                        message=f"Retrieved {len(results)} records from {table}",
-                        data={"results": results}
-                    )
+            results, truncated = await self._collect_rows(query, values, max_rows)
+            
+            return ToolResponse(
+                success=True,
+                message=f"Retrieved {len(results)} records from {table}" + (" (truncated)" if truncated else ""),
+                data={"results": results, "truncated": truncated}
+            )
         except Exception as e:
             return ToolResponse(
                 success=False,
                 message=f"Retrieve error: {str(e)}"
             )
-    
-    def get_schema(self) -> Dict[str, Any]:
-        """Get the tool schema"""
-        return {
-            "name": self.name,
-            "description": self.description,
-            "parameters": {
-                "operation": {
-                    "type": "string",
-                    "description": "Operation to perform",
-                    "enum": ["query", "store", "retrieve", "update", "delete"]
-                },
-                "query": {
-                    "type": "string",
-                    "description": "SQL query to execute (for query operation)"
-                },
-                "table": {
-                    "type": "string",
-                    "description": "Table name (for store/retrieve operations)"
-                },
-                "data": {
-                    "type": "object",
-                    "description": "Data to store (for store operation)"
-                },
-                "conditions": {
-                    "type": "object",
-                    "description": "Conditions for retrieval (for retrieve operation)"
-                }
-            }
-        }
@@ -0,0 +1,337 @@
+"""
+SQLite Connection Pool - Enhanced BASED GOD CLI
+Shared aiosqlite pool with N read connections and one serialized writer
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# Applied to every pooled connection
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+    "cache_size": -16000,      # 16 MiB page cache per connection
+    "mmap_size": 268435456,    # 256 MiB memory-mapped I/O
+    "busy_timeout": 5000
+}
+
+
+class _Timing:
+    """Count/total/max accumulator for a latency series"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ms": self.total * 1000,
+            "avg_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "max_ms": self.max * 1000
+        }
+
+
+class AsyncSQLitePool:
+    """
+    Pooled async access to one SQLite database
+    Readers run concurrently under WAL; all writes go through one connection
+    """
+
+    def __init__(self, db_path: str, readers: int = 4, pragmas: Optional[Dict[str, Any]] = None):
+        self.db_path = str(db_path)
+        self.max_readers = max(1, readers)
+        self.pragmas = {**DEFAULT_PRAGMAS, **(pragmas or {})}
+
+        self._idle_readers: Optional[asyncio.Queue] = None
+        self._readers: List[aiosqlite.Connection] = []
+        self._reader_open_lock: Optional[asyncio.Lock] = None
+        self._writer: Optional[aiosqlite.Connection] = None
+        self._writer_lock: Optional[asyncio.Lock] = None
+        self._closed = False
+
+        self.metrics = {
+            "read_wait": _Timing(),
+            "write_wait": _Timing(),
+            "read_query": _Timing(),
+            "write_query": _Timing()
+        }
+
+    def _ensure_primitives(self):
+        """Create asyncio primitives inside the running loop"""
+        if self._idle_readers is None:
+            self._idle_readers = asyncio.Queue()
+            self._reader_open_lock = asyncio.Lock()
+            self._writer_lock = asyncio.Lock()
+
+    async def _open_connection(self, read_only: bool) -> aiosqlite.Connection:
+        """Open a connection and apply the pool pragmas"""
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = await aiosqlite.connect(self.db_path)
+        conn.row_factory = aiosqlite.Row
+        for name, value in self.pragmas.items():
+            await conn.execute(f"PRAGMA {name} = {value}")
+        if read_only:
+            await conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    async def _acquire_reader(self) -> aiosqlite.Connection:
+        """Take an idle reader, opening a new one while under the limit"""
+        try:
+            return self._idle_readers.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+
+        async with self._reader_open_lock:
+            if len(self._readers) < self.max_readers:
+                conn = await self._open_connection(read_only=True)
+                self._readers.append(conn)
+                return conn
+
+        return await self._idle_readers.get()
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        self._ensure_primitives()
+
+        wait_start = time.perf_counter()
+        conn = await self._acquire_reader()
+        self.metrics["read_wait"].record(time.perf_counter() - wait_start)
+
+        query_start = time.perf_counter()
+        try:
+            yield conn
+        finally:
+            self.metrics["read_query"].record(time.perf_counter() - query_start)
+            self._idle_readers.put_nowait(conn)
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Hold the single writer; commits on success, rolls back on error"""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        self._ensure_primitives()
+
+        wait_start = time.perf_counter()
+        async with self._writer_lock:
+            self.metrics["write_wait"].record(time.perf_counter() - wait_start)
+
+            if self._writer is None:
+                self._writer = await self._open_connection(read_only=False)
+
+            query_start = time.perf_counter()
+            try:
+                yield self._writer
+                await self._writer.commit()
+            except BaseException:
+                await self._writer.rollback()
+                raise
+            finally:
+                self.metrics["write_query"].record(time.perf_counter() - query_start)
+
+    async def close(self):
+        """Close every pooled connection"""
+        self._closed = True
+        connections = list(self._readers)
+        if self._writer is not None:
+            connections.append(self._writer)
+        self._readers = []
+        self._writer = None
+        self._idle_readers = None
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled connection: {e}")
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get pool-wait and query-time metrics"""
+        return {
+            "db_path": self.db_path,
+            "max_readers": self.max_readers,
+            "open_readers": len(self._readers),
+            "idle_readers": self._idle_readers.qsize() if self._idle_readers is not None else 0,
+            "writer_open": self._writer is not None,
+            **{name: timing.as_dict() for name, timing in self.metrics.items()}
+        }
+
+
+class BatchedWriteQueue:
+    """
+    Groups writes from concurrent coroutines into periodic commits
+    Each submitted unit runs inside its own SAVEPOINT, so one failing unit
+    rolls back alone while the rest of the batch still commits
+    """
+
+    def __init__(self, pool: AsyncSQLitePool, flush_interval: float = 0.05, max_batch: int = 256):
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.max_batch = max(1, max_batch)
+
+        self._pending: List[Tuple[Callable[[aiosqlite.Connection], Awaitable[Any]], asyncio.Future]] = []
+        self._has_work: Optional[asyncio.Event] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.stats = {
+            "submitted": 0,
+            "committed": 0,
+            "failed": 0,
+            "batches": 0,
+            "largest_batch": 0
+        }
+        self.commit_timing = _Timing()
+
+    def _ensure_running(self):
+        """Create primitives and the drain task inside the running loop"""
+        if self._has_work is None:
+            self._has_work = asyncio.Event()
+            self._batch_full = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._drain_loop())
+
+    async def submit(self, work: Callable[[aiosqlite.Connection], Awaitable[Any]]) -> Any:
+        """Queue a unit of work for the next batch and wait for its commit"""
+        if self._closed:
+            raise RuntimeError("Write queue is closed")
+        self._ensure_running()
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((work, future))
+        self.stats["submitted"] += 1
+
+        self._has_work.set()
+        if len(self._pending) >= self.max_batch:
+            self._batch_full.set()
+        return await future
+
+    async def _drain_loop(self):
+        """Commit pending work every flush_interval, or sooner once a batch fills"""
+        while not self._closed:
+            await self._has_work.wait()
+            if len(self._pending) < self.max_batch:
+                try:
+                    await asyncio.wait_for(self._batch_full.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def flush(self):
+        """Commit everything queued so far"""
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.max_batch]
+                del self._pending[:len(batch)]
+                await self._commit_batch(batch)
+            self._has_work.clear()
+            self._batch_full.clear()
+
+    async def _commit_batch(self, batch: List[Tuple[Callable, asyncio.Future]]):
+        """Run a batch in one transaction and resolve each caller's future"""
+        outcomes = []
+        commit_start = time.perf_counter()
+        try:
+            async with self.pool.write() as db:
+                if not db.in_transaction:
+                    await db.execute("BEGIN")
+                for work, future in batch:
+                    if future.cancelled():
+                        continue
+                    await db.execute("SAVEPOINT batched_write")
+                    try:
+                        result = await work(db)
+                    except Exception as e:
+                        await db.execute("ROLLBACK TO batched_write")
+                        await db.execute("RELEASE batched_write")
+                        outcomes.append((future, None, e))
+                    else:
+                        await db.execute("RELEASE batched_write")
+                        outcomes.append((future, result, None))
+        except Exception as e:
+            logger.error(f"Batched write commit failed: {e}")
+            self.stats["failed"] += len(batch)
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.commit_timing.record(time.perf_counter() - commit_start)
+
+        self.stats["batches"] += 1
+        self.stats["largest_batch"] = max(self.stats["largest_batch"], len(batch))
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is None:
+                self.stats["committed"] += 1
+                future.set_result(result)
+            else:
+                self.stats["failed"] += 1
+                future.set_exception(error)
+
+    async def close(self):
+        """Flush outstanding work and stop the drain task"""
+        await self.flush()
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get batching statistics"""
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "avg_batch_size": self.stats["committed"] / self.stats["batches"] if self.stats["batches"] else 0.0,
+            "commit": self.commit_timing.as_dict()
+        }
+
+
+# Process-wide pools, one per database file
+_pools: Dict[str, AsyncSQLitePool] = {}
+
+
+def get_connection_pool(db_path: str, readers: int = 4, pragmas: Optional[Dict[str, Any]] = None) -> AsyncSQLitePool:
+    """Get the shared pool for a database file, creating it on first use"""
+    key = str(Path(db_path).resolve())
+    pool = _pools.get(key)
+    if pool is None or pool._closed:
+        pool = AsyncSQLitePool(db_path, readers=readers, pragmas=pragmas)
+        _pools[key] = pool
+    return pool
+
+
+async def close_all_pools():
+    """Close every shared pool"""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.close()
@@ -0,0 +1,64 @@
+"""
+SQLite Migrations - Enhanced BASED GOD CLI
+Versioned schema migrations tracked in PRAGMA user_version
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+import aiosqlite
+
+from tools.sqlite_connection_pool import AsyncSQLitePool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Migration:
+    """One schema step; statements run first, then the optional apply hook"""
+    version: int
+    description: str
+    statements: List[str] = field(default_factory=list)
+    apply: Optional[Callable[[aiosqlite.Connection], Awaitable[None]]] = None
+
+
+async def get_schema_version(db: aiosqlite.Connection) -> int:
+    """Read the schema version stored in the database header"""
+    cursor = await db.execute("PRAGMA user_version")
+    row = await cursor.fetchone()
+    return row[0] if row else 0
+
+
+async def apply_migrations(pool: AsyncSQLitePool, migrations: List[Migration]) -> List[int]:
+    """
+    Apply every migration newer than the database, each in its own transaction
+    BEGIN IMMEDIATE plus a re-check of the version keeps concurrent processes
+    from applying the same step twice
+    """
+    migrations = sorted(migrations, key=lambda m: m.version)
+    if not migrations:
+        return []
+
+    async with pool.read() as db:
+        if await get_schema_version(db) >= migrations[-1].version:
+            return []
+
+    applied = []
+    for migration in migrations:
+        async with pool.write() as db:
+            if not db.in_transaction:
+                await db.execute("BEGIN IMMEDIATE")
+            if migration.version <= await get_schema_version(db):
+                continue
+
+            for statement in migration.statements:
+                await db.execute(statement)
+            if migration.apply is not None:
+                await migration.apply(db)
+            await db.execute(f"PRAGMA user_version = {int(migration.version)}")
+
+        applied.append(migration.version)
+        logger.info(f"Applied migration {migration.version}: {migration.description}")
+
+    return applied
@@ -17,9 +17,27 @@ import uuid
 from abc import ABC, abstractmethod
 import sympy as sp
 
+from tools.prompt_layout import PromptLayout
+
 logger = logging.getLogger(__name__)
 
 
+def _code_block(code: str, input_data: Dict[str, Any]) -> str:
+    """Fenced code for the variable tail of a prompt"""
+    return f"```{input_data.get('language', 'python')}\n{code}\n```"
+
+
+async def _complete(llm_client, layout: PromptLayout) -> str:
+    """Send the stable system part and variable user part under the layout's call site"""
+    return await llm_client.generate_response(
+        prompt=layout.user_text(),
+        parameters={
+            "call_site": layout.call_site,
+            "system_message": layout.system_text(),
+        },
+    )
+
+
 class AgentType(Enum):
     """Agent types for specialization"""
 
@@ -299,57 +317,52 @@ class CoderAgent(BaseAgent):
 
     async def _generate_code(self, input_data: Dict[str, Any]) -> str:
         """Generate code based on requirements"""
-        prompt = f"""
-Generate code for the following requirements:
-{input_data.get('requirements', '')}
-
-Language: {input_data.get('language', 'python')}
-Style: {input_data.get('style', 'clean and readable')}
-"""
+        layout = (
+            PromptLayout("sub_agent.code_generation")
+            .instructions("Generate code for the requirements below.")
+            .context("Language", input_data.get("language", "python"))
+            .context("Style", input_data.get("style", "clean and readable"))
+            .query(input_data.get("requirements", ""), label="Requirements")
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return response
 
     async def _review_code(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Review code for issues and improvements"""
         code = input_data.get("code", "")
-        prompt = f"""
-Review the following code for issues, improvements, and best practices:
-
-```{input_data.get('language', 'python')}
-{code}
-```
+        layout = (
+            PromptLayout("sub_agent.code_review")
+            .instructions("""Review the code below for issues, improvements, and best practices.
 
 Provide a detailed analysis including:
 1. Potential bugs
 2. Performance issues
 3. Security concerns
 4. Code style improvements
-5. Best practices recommendations
-"""
+5. Best practices recommendations""")
+            .query(_code_block(code, input_data))
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return {"review": response}
 
     async def _refactor_code(self, input_data: Dict[str, Any]) -> str:
         """Refactor code for better structure and performance"""
         code = input_data.get("code", "")
-        prompt = f"""
-Refactor the following code to improve:
+        layout = (
+            PromptLayout("sub_agent.refactoring")
+            .instructions("""Refactor the code below to improve:
 - Readability
 - Performance
 - Maintainability
 - Code structure
 
-Original code:
-```{input_data.get('language', 'python')}
-{code}
-```
-
-Provide the refactored version with explanations of the improvements.
-"""
+Provide the refactored version with explanations of the improvements.""")
+            .query(_code_block(code, input_data), label="Original code")
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return response
 
 
@@ -401,63 +414,56 @@ class AnalyzerAgent(BaseAgent):
     async def _analyze_code(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze code for complexity, maintainability, etc."""
         code = input_data.get("code", "")
-        prompt = f"""
-Analyze the following code for:
+        layout = (
+            PromptLayout("sub_agent.code_analysis")
+            .instructions("""Analyze the code below for:
 1. Cyclomatic complexity
 2. Maintainability index
 3. Code smells
 4. Potential improvements
 
-Code:
-```{input_data.get('language', 'python')}
-{code}
-```
-
-Provide a structured analysis with metrics and recommendations.
-"""
+Provide a structured analysis with metrics and recommendations.""")
+            .query(_code_block(code, input_data), label="Code")
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return {"analysis": response}
 
     async def _analyze_performance(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze code for performance issues"""
         code = input_data.get("code", "")
-        prompt = f"""
-Analyze the following code for performance issues:
-
-```{input_data.get('language', 'python')}
-{code}
-```
+        layout = (
+            PromptLayout("sub_agent.performance_analysis")
+            .instructions("""Analyze the code below for performance issues.
 
 Identify:
 1. Time complexity issues
 2. Memory usage problems
 3. Inefficient algorithms
-4. Optimization opportunities
-"""
+4. Optimization opportunities""")
+            .query(_code_block(code, input_data))
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return {"performance_analysis": response}
 
     async def _analyze_security(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze code for security vulnerabilities"""
         code = input_data.get("code", "")
-        prompt = f"""
-Analyze the following code for security vulnerabilities:
-
-```{input_data.get('language', 'python')}
-{code}
-```
+        layout = (
+            PromptLayout("sub_agent.security_analysis")
+            .instructions("""Analyze the code below for security vulnerabilities.
 
 Identify:
 1. SQL injection vulnerabilities
 2. XSS vulnerabilities
 3. Input validation issues
 4. Authentication/authorization problems
-5. Data exposure risks
-"""
+5. Data exposure risks""")
+            .query(_code_block(code, input_data))
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return {"security_analysis": response}
 
 
@@ -516,35 +522,37 @@ class ResearcherAgent(BaseAgent):
     async def _search_documentation(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Search documentation for specific information"""
         query = input_data.get("query", "")
-        prompt = f"""
-Search for documentation about: {query}
+        layout = (
+            PromptLayout("sub_agent.documentation_search")
+            .instructions("""Search for documentation about the topic below.
 
 Provide:
 1. Relevant documentation links
 2. Key concepts and explanations
 3. Code examples
-4. Best practices
-"""
+4. Best practices""")
+            .query(query, label="Topic")
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return {"documentation_search": response}
 
     async def _synthesize_research(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Synthesize research findings"""
         findings = input_data.get("findings", [])
-        prompt = f"""
-Synthesize the following research findings:
-
-{findings}
+        layout = (
+            PromptLayout("sub_agent.research_synthesis")
+            .instructions("""Synthesize the research findings below.
 
 Provide:
 1. Key insights
 2. Patterns and trends
 3. Recommendations
-4. Action items
-"""
+4. Action items""")
+            .query(str(findings), label="Findings")
+        )
 
-        response = await self.llm_client.generate_response(prompt)
+        response = await _complete(self.llm_client, layout)
         return {"synthesis": response}
 
 
@@ -727,7 +735,12 @@ async def test_sub_agent_system():
 
     # Mock LLM client
     class MockLLMClient:
-        async def generate_response(self, prompt: str) -> str:
+        async def generate_response(
+            self,
+            prompt: str,
+            model: Optional[str] = None,
+            parameters: Optional[Dict[str, Any]] = None,
+        ) -> str:
             await asyncio.sleep(0.1)  # Simulate API call
             return f"Response to: {prompt[:50]}..."
 
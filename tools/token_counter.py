@@ -0,0 +1,87 @@
+"""
+Token Counter - Enhanced BASED GOD CLI
+Local token counting and truncation for prompt budgeting
+"""
+
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Words, numbers and single punctuation marks
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# BPE vocabularies average roughly four characters per token on English and code
+_CHARS_PER_TOKEN = 4
+
+
+def _piece_tokens(piece: str) -> int:
+    """Estimated BPE tokens for one regex piece"""
+    return 1 + (len(piece) - 1) // _CHARS_PER_TOKEN
+
+
+class TokenCounter:
+    """
+    Counts tokens without network access
+    Uses a tiktoken encoding when one is named and loadable, otherwise a
+    regex estimator that tracks BPE counts closely enough for budgeting
+    """
+
+    def __init__(self, encoding_name: Optional[str] = None, cache_size: int = 4096):
+        self.encoding_name = encoding_name
+        self._encoding = None
+
+        if encoding_name:
+            try:
+                import tiktoken
+                self._encoding = tiktoken.get_encoding(encoding_name)
+            except Exception as e:
+                logger.info(f"tiktoken encoding {encoding_name} unavailable, estimating tokens: {e}")
+
+        self.count = lru_cache(maxsize=cache_size)(self._count)
+
+    @property
+    def backend(self) -> str:
+        return f"tiktoken:{self.encoding_name}" if self._encoding is not None else "estimate"
+
+    def _count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return sum(_piece_tokens(m.group()) for m in _TOKEN_PATTERN.finditer(text))
+
+    def count_many(self, texts: List[str]) -> List[int]:
+        """Count tokens for several texts"""
+        return [self.count(text) for text in texts]
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens, on a token boundary"""
+        if max_tokens <= 0:
+            return ""
+        if self.count(text) <= max_tokens:
+            return text
+        if self._encoding is not None:
+            return self._encoding.decode(self._encoding.encode(text, disallowed_special=())[:max_tokens])
+
+        used = 0
+        end = 0
+        for match in _TOKEN_PATTERN.finditer(text):
+            used += _piece_tokens(match.group())
+            if used > max_tokens:
+                break
+            end = match.end()
+        return text[:end]
+
+
+_default_counter: Optional[TokenCounter] = None
+
+
+def get_token_counter() -> TokenCounter:
+    """Shared estimator-backed counter"""
+    global _default_counter
+    if _default_counter is None:
+        _default_counter = TokenCounter()
+    return _default_counter
@@ -7,7 +7,6 @@ import asyncio
 import json
 import logging
 import sqlite3
-import aiosqlite
 from typing import Dict, Any, Optional, List, Union, Tuple
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
@@ -20,6 +19,8 @@ from .base_tool import BaseTool, ToolResponse
 from .llm_query_tool import LLMQueryTool
 from .vector_database_tool import VectorDatabaseTool
 from .sql_database_tool import SQLDatabaseTool
+from .sqlite_connection_pool import get_connection_pool
+from .request_scheduler import RequestPriority, request_priority, request_source
 
 class AgentState(Enum):
     """Agent operational states"""
@@ -185,6 +186,8 @@ class UnifiedAgentSystem(BaseTool):
         else:
             self.vector_db = None
             
+        # One pooled connection set shared with the SQL tool on the same file
+        self.db_pool = get_connection_pool(db_path)
         self.sql_db = SQLDatabaseTool(db_path)
         
         # Agent state and configuration
@@ -237,7 +240,7 @@ class UnifiedAgentSystem(BaseTool):
     
     async def _init_database(self) -> Any:
         """Initialize enhanced database schema"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db_pool.write() as db:
             # Enhanced contacts table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS enhanced_contacts (
@@ -332,14 +335,12 @@ class UnifiedAgentSystem(BaseTool):
                     context TEXT
                 )
             """)
-            
-            await db.commit()
     
     async def _load_existing_data(self) -> Any:
         """Load existing data from database"""
         try:
             # Load contacts
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db_pool.read() as db:
                 async with db.execute("SELECT * FROM enhanced_contacts") as cursor:
                     async for row in cursor:
                         contact_data = dict(zip([col[0] for col in cursor.description], row))
@@ -918,6 +919,9 @@ class UnifiedAgentSystem(BaseTool):
     
     async def _background_learning_loop(self) -> Any:
         """Background learning loop for continuous improvement"""
+        # This task runs in its own context copy, so the tags stay local to it
+        request_priority.set(RequestPriority.BACKGROUND)
+        request_source.set("background_learning")
         while True:
             try:
                 # Analyze recent interactions
@@ -976,7 +980,7 @@ class UnifiedAgentSystem(BaseTool):
     async def _save_memory(self, memory: EnhancedMemory):
     
         """Save memory to database"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db_pool.write() as db:
             await db.execute("""
                 INSERT OR REPLACE INTO enhanced_memories 
                 (id, content, memory_type, importance, emotional_valence, context, associations, 
@@ -988,12 +992,11 @@ class UnifiedAgentSystem(BaseTool):
                 memory.created_at.isoformat(), memory.last_accessed.isoformat(),
                 memory.access_count
             ))
-            await db.commit()
     
     async def _save_conversation(self, conversation: EnhancedConversation):
     
         """Save conversation to database"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db_pool.write() as db:
             await db.execute("""
                 INSERT OR REPLACE INTO enhanced_conversations 
                 (id, user_message, agent_response, conversation_type, context, 
@@ -1006,7 +1009,6 @@ class UnifiedAgentSystem(BaseTool):
                 conversation.sentiment, conversation.satisfaction_score,
                 conversation.created_at.isoformat()
             ))
-            await db.commit()
     
     async def _update_tool_metrics(self, tool_id: str, success: bool):
     
@@ -1023,13 +1025,12 @@ class UnifiedAgentSystem(BaseTool):
                 tool.success_rate = (tool.success_rate * (tool.usage_count - 1)) / tool.usage_count
             
             # Save to database
-            async with aiosqlite.connect(self.db_path) as db:
+            async with self.db_pool.write() as db:
                 await db.execute("""
                     UPDATE enhanced_tools 
                     SET usage_count = ?, success_rate = ?, last_used = ?
                     WHERE id = ?
                 """, (tool.usage_count, tool.success_rate, tool.last_used.isoformat(), tool_id))
-                await db.commit()
     
     async def _handle_error(self, error: Exception, operation: str) -> ToolResponse:
         """Handle errors in unified agent operations"""
@@ -1119,6 +1120,10 @@ class UnifiedAgentSystem(BaseTool):
         """Get current performance metrics"""
         return self.performance_metrics.copy()
     
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Get connection pool metrics for the agent database"""
+        return self.db_pool.get_metrics()
+    
     def get_agent_state(self) -> AgentState:
         """Get current agent state"""
         return self.current_state
@@ -1139,7 +1144,7 @@ class UnifiedAgentSystem(BaseTool):
     async def _save_contact(self, contact: EnhancedContact):
     
         """Save contact to database"""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self.db_pool.write() as db:
             await db.execute("""
                 INSERT OR REPLACE INTO enhanced_contacts 
                 (id, name, email, phone, role, organization, relationship_strength,
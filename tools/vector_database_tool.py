@@ -10,6 +10,7 @@ from typing import Dict, Any, Optional, List, Union
 from dataclasses import dataclass
 from datetime import datetime
 import os
+import uuid
 
 try:
     from qdrant_client import QdrantClient
@@ -171,6 +172,7 @@ class VectorDatabaseTool(BaseTool):
         try:
             texts = kwargs.get("texts", [])
             metadata = kwargs.get("metadata", [])
+            ids = kwargs.get("ids") or [str(uuid.uuid4()) for _ in texts]
         
             if not texts:
                 return ToolResponse(
@@ -194,7 +196,7 @@ class VectorDatabaseTool(BaseTool):
                 meta = metadata[i] if i < len(metadata) else {}
                 
                 point = PointStruct(
-                    id=i,
+                    id=ids[i],
                     vector=embedding,
                     payload={
                         "text": text,
@@ -213,6 +215,7 @@ class VectorDatabaseTool(BaseTool):
             return ToolResponse(
                 success=True,
                 data={
+                    "ids": ids[:len(points)],
                     "stored_count": len(texts),
                     "collection": self.collection_name,
                     "embeddings_generated": len(embeddings_data)